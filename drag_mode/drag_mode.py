@@ -3,7 +3,6 @@ from talon.screen import Screen
 from talon.canvas import Canvas
 from talon.skia.canvas import Canvas as SkiaCanvas
 from talon.types import Rect, Point2d
-from itertools import islice
 
 mod, ctx, ctx_drag_mode = Module(), Context(), Context()
 mod.mode("drag_mode", "Drag mode. Defaults to LMB drag")
@@ -158,19 +157,6 @@ def get_pos_for_target(target: str) -> Point2d:
                 return Point2d(x * tile_size + tile_size_half, y * tile_size + tile_size_half)
     return Point2d(0, 0)
 
-def next_pos(target: str, drag: bool=False):
-    pos = grid_pos_map[target]
-
-    def callback(ev):
-        if drag and ev.type == "stop":
-            actions.mouse_click(button=0, up=True)
-
-    return actions.user.mouse_move_smooth_to(pos.x, pos.y, callback_tick=callback)
-
-def next_target(target: str, drag: bool=False):
-    pos = grid_pos_map[target]
-    return lambda: next_pos(target, drag)
-
 builder = None
 drag_mode_enabled = False
 
@@ -271,21 +257,9 @@ class Actions:
     def drag_mode_move_to_target_loop(targets: list[list[str]]):
         """Move the mouse to the grid position"""
         actual_targets = targets[0]
-        pos = grid_pos_map[actual_targets[0]]
-        actions.user.mouse_move_smooth_to(pos.x, pos.y)
-        for target in islice(actual_targets, 1, None):
-            actions.user.mouse_move_smooth_queue(next_target(target))
-
-    # def drag_mode_drag_to_target_loop(targets: list[list[str]], button: int = 0):
-    #     """Move the mouse to the grid position"""
-    #     actual_targets = targets[0]
-    #     pos = grid_pos_map[actual_targets[0]]
-    #     actions.user.mouse_move_smooth_to(pos.x, pos.y, callback_tick=lambda ev: ctrl.mouse_click(button=button, down=True) if ev.type == "stop" else None)
-    #     for i, target in enumerate(islice(actual_targets, 1, None)):
-    #         if i == len(actual_targets) - 1:
-    #             actions.user.mouse_move_smooth_queue(next_target(target, True))
-    #         else:
-    #             actions.user.mouse_move_smooth_queue(next_target(target))
+        points = [(grid_pos_map[target].x, grid_pos_map[target].y) for target in actual_targets]
+        # one continuous motion through every target, instead of stopping at each
+        actions.user.mouse_move_smooth_path(points, path_type="catmull_rom")
 
     def drag_mode_drag_and_drop(target_one: str, target_two: str, button: int = None):
         """Drag and drop from target one to target two"""
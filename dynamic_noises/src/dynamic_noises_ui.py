@@ -45,17 +45,17 @@ def events_init():
     actions.user.ui_elements_register_on_lifecycle(on_ui_lifecycle)
 
 def dynamic_noises_ui_element():
-    (div, text) = actions.user.ui_elements(["div", "text"])
+    (div, text, style) = actions.user.ui_elements(["div", "text", "style"])
     events_init()
 
-    noise_css = {
-        "flex_direction": "row",
-        "width": 150,
-        "padding": 8,
-        "border_width": 1,
-        "border_color": "FFFFFF33",
-        "border_radius": 4
-    }
+    noise_css = style(
+        flex_direction="row",
+        width=150,
+        padding=8,
+        border_width=1,
+        border_color="FFFFFF33",
+        border_radius=4,
+    )
 
     return div(id=NOISE_UI_ID, flex_direction="column", gap=8)[
         div(noise_css, id="pop")[
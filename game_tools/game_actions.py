@@ -13,12 +13,17 @@ from .src.game_core import (
     game_arrows_hold_up_horizontal,
     game_state_switch_horizontal,
     game_calibrate_90_y,
+    game_mouse_calibrate_clear,
+    game_mouse_calibrate_save,
     game_mouse_calibrate_x_360,
+    game_mouse_calibrate_x_360_adjust_last,
+    game_mouse_calibrate_y_90_adjust_last,
     mouse_click,
     mouse_hold,
     mouse_move_continuous,
     mouse_move_continuous_stop,
     mouse_move_deg,
+    mouse_move_deg_path,
     mouse_release,
     mouse_release_all,
     mouse_reset_center_y,
@@ -111,6 +116,7 @@ class Actions:
     def game_mouse_move_deg_down_45(mouse_button: int = None): """Look down 45 degrees"""; mouse_move_deg(0, 45)
     def game_mouse_move_deg_down_90(mouse_button: int = None): """Look down 90 degrees"""; mouse_move_deg(0, 90)
     def game_mouse_move_deg_down(deg: int = 20, mouse_button: int = None): """Look down y degrees"""; mouse_move_deg(0, deg, mouse_button)
+    def game_mouse_move_deg_path(points: list, mouse_button: int = None): """Sweep the camera through a list of (x, y) degree offsets in one continuous motion e.g. [(-45, 0), (45, 0), (0, 0)]"""; mouse_move_deg_path(points, mouse_button)
     def game_mouse_move_continuous_right(speed: int = 20, mouse_button: int = None): """Turn right continuously at speed x; Optionally specify mouse button 0=left, 1=right, 2=middle to hold"""; mouse_move_continuous(1, 0, speed, mouse_button)
     def game_mouse_move_continuous_right_5(mouse_button: int = None): """Turn right continuously speed 5; Optionally specify mouse button 0=left, 1=right, 2=middle to hold"""; mouse_move_continuous(1, 0, 5, mouse_button)
     def game_mouse_move_continuous_right_10(mouse_button: int = None): """Turn right continuously speed 10; Optionally specify mouse button 0=left, 1=right, 2=middle to hold"""; mouse_move_continuous(1, 0, 10, mouse_button)
@@ -133,6 +139,10 @@ class Actions:
     def game_mouse_move_continuous_down_30(mouse_button: int = None): """Look down continuously speed 30"""; mouse_move_continuous(0, 1, 30, mouse_button)
     def game_mouse_move_continuous_stop(): """Stop looking continuously"""; mouse_move_continuous_stop(150)
     def game_mouse_move_reset_center_y(mouse_button: int = None): """Reset the mouse to the center of the screen"""; mouse_reset_center_y()
-    def game_mouse_calibrate_x_360(num: int, mouse_button: int = None): """Calibrate x by testing a 360"""; game_mouse_calibrate_x_360(num)
-    def game_mouse_calibrate_y_90(num: int, mouse_button: int = None): """Calibrate y by testing ground to center"""; game_calibrate_90_y(num)
+    def game_mouse_calibrate_x_360(num: int, mouse_button: int = None, duration_ms: int = 1000): """Calibrate x by testing a 360"""; game_mouse_calibrate_x_360(num, duration_ms)
+    def game_mouse_calibrate_x_360_adjust(num: int): """Add or subtract to the last x calibration until the 360 lines up"""; game_mouse_calibrate_x_360_adjust_last(num)
+    def game_mouse_calibrate_y_90(num: int, mouse_button: int = None, duration_ms: int = 100): """Calibrate y by testing ground to center"""; game_calibrate_90_y(num, duration_ms)
+    def game_mouse_calibrate_y_90_adjust(num: int): """Add or subtract to the last y calibration until it lines up with center"""; game_mouse_calibrate_y_90_adjust_last(num)
+    def game_mouse_calibrate_save(): """Save the calibration for the active game, fitting mouse acceleration if sweeps were done at different speeds"""; game_mouse_calibrate_save()
+    def game_mouse_calibrate_clear(): """Forget the calibration for the active game"""; game_mouse_calibrate_clear()
     def game_state_switch_horizontal(): """Switch state value of horizontal"""; game_state_switch_horizontal()
\ No newline at end of file
@@ -0,0 +1,201 @@
+"""
+Per game camera calibration
+
+A sweep is a known angle e.g. a 360 on x, made of one or more mouse
+moves (the first move plus small adjustments until the view lines up).
+From the sweeps we fit, per axis:
+
+degrees = degrees_per_px * px + accel * sum(px per frame ** 2)
+
+accel is 0 without mouse acceleration in the game. It is only fitted
+once there are sweeps at different speeds. The model is then inverted
+to find the px for a camera snap, so it lands in a single motion.
+
+Models are cached per game (active app name) in game_calibration.json.
+"""
+from talon import actions, settings, ui
+from dataclasses import dataclass, field
+from pathlib import Path
+import json
+import math
+
+CALIBRATION_FILE = Path(__file__).parent.parent / "game_calibration.json"
+AXIS_DEGREES = {"x": 360, "y": 90}
+
+@dataclass
+class CalibrationSweep:
+    degrees: float
+    # [px, sum of px per frame squared] per move, signed so that a
+    # correction back past the target is negative
+    moves: list[list[float]] = field(default_factory=list)
+
+    @property
+    def px(self) -> float:
+        return sum(move[0] for move in self.moves)
+
+    @property
+    def speed_sq(self) -> float:
+        return sum(move[1] for move in self.moves)
+
+@dataclass
+class AxisModel:
+    degrees_per_px: float
+    accel: float = 0.0
+    sweeps: list[CalibrationSweep] = field(default_factory=list)
+
+    def degrees(self, px: float, speed_sq: float = 0) -> float:
+        return self.degrees_per_px * px + self.accel * speed_sq
+
+    def pixels(self, degrees: float, profile_sq: float = 0) -> float:
+        """
+        px needed to turn degrees. profile_sq = sum of squared per frame
+        fractions of the move, so speed_sq = profile_sq * px ** 2.
+        """
+        sign = math.copysign(1, degrees)
+        degrees = abs(degrees)
+        a = self.accel * profile_sq
+        if not a:
+            return sign * degrees / self.degrees_per_px
+        discriminant = self.degrees_per_px ** 2 + 4 * a * degrees
+        if discriminant < 0:
+            return sign * degrees / self.degrees_per_px
+        return sign * (-self.degrees_per_px + math.sqrt(discriminant)) / (2 * a)
+
+    def to_json(self) -> dict:
+        return {
+            "degrees_per_px": self.degrees_per_px,
+            "accel": self.accel,
+            "sweeps": [{"degrees": s.degrees, "moves": s.moves} for s in self.sweeps],
+        }
+
+    @staticmethod
+    def from_json(data: dict) -> "AxisModel":
+        return AxisModel(
+            data["degrees_per_px"],
+            data.get("accel", 0.0),
+            [CalibrationSweep(s["degrees"], s["moves"]) for s in data.get("sweeps", [])],
+        )
+
+def fit_axis_model(sweeps: list[CalibrationSweep]) -> AxisModel:
+    """Least squares fit through the origin. Linear unless sweeps have different speeds."""
+    sweeps = [s for s in sweeps if s.px]
+    if not sweeps:
+        return None
+    sum_pp = sum(s.px ** 2 for s in sweeps)
+    sum_dp = sum(s.degrees * s.px for s in sweeps)
+    linear = AxisModel(sum_dp / sum_pp, 0.0, sweeps)
+    if len(sweeps) < 2:
+        return linear
+
+    sum_pq = sum(s.px * s.speed_sq for s in sweeps)
+    sum_qq = sum(s.speed_sq ** 2 for s in sweeps)
+    sum_dq = sum(s.degrees * s.speed_sq for s in sweeps)
+    determinant = sum_pp * sum_qq - sum_pq ** 2
+    # same speed profile for every sweep, acceleration can't be told apart
+    if abs(determinant) <= 1e-9 * sum_pp * sum_qq:
+        return linear
+    degrees_per_px = (sum_dp * sum_qq - sum_dq * sum_pq) / determinant
+    accel = (sum_pp * sum_dq - sum_pq * sum_dp) / determinant
+    if degrees_per_px <= 0:
+        return linear
+    return AxisModel(degrees_per_px, accel, sweeps)
+
+_models: dict[str, dict[str, AxisModel]] = None
+_pending_sweeps: dict[str, CalibrationSweep] = {}
+# sign of the first move of each pending sweep
+_pending_directions: dict[str, float] = {}
+_profile_sq_cache: dict[int, float] = {}
+
+def get_game_name() -> str:
+    return ui.active_app().name
+
+def load_models() -> dict[str, dict[str, AxisModel]]:
+    global _models
+    if _models is None:
+        _models = {}
+        if CALIBRATION_FILE.exists():
+            try:
+                data = json.loads(CALIBRATION_FILE.read_text())
+                _models = {
+                    game: {axis: AxisModel.from_json(model) for axis, model in axes.items()}
+                    for game, axes in data.items()
+                }
+            except (ValueError, KeyError) as e:
+                print(f"Could not read {CALIBRATION_FILE}: {e}")
+    return _models
+
+def save_models():
+    data = {
+        game: {axis: model.to_json() for axis, model in axes.items()}
+        for game, axes in load_models().items()
+    }
+    CALIBRATION_FILE.write_text(json.dumps(data, indent=2))
+
+def get_axis_model(axis: str, game: str = None) -> AxisModel:
+    return load_models().get(game or get_game_name(), {}).get(axis)
+
+def get_default_axis_model(axis: str) -> AxisModel:
+    """Linear model from the game_mouse_calibrate_x_360 and game_mouse_calibrate_y_90 settings."""
+    if axis == "x":
+        return AxisModel(360 / settings.get("user.game_mouse_calibrate_x_360"))
+    return AxisModel(90 / settings.get("user.game_mouse_calibrate_y_90"))
+
+def profile_sq(duration_ms: int) -> float:
+    """Sum of squared per frame fractions of a smooth move with this duration."""
+    if duration_ms not in _profile_sq_cache:
+        frames = actions.user.mouse_move_smooth_profile(1, 0, duration_ms)
+        _profile_sq_cache[duration_ms] = sum(dx ** 2 for dx, _ in frames)
+    return _profile_sq_cache[duration_ms]
+
+def calibrated_pixels(axis: str, degrees: float, duration_ms: int = None) -> float:
+    """px to turn degrees on axis, using the calibrated model for the active game if there is one."""
+    if not degrees:
+        return 0
+    model = get_axis_model(axis)
+    if not model:
+        return get_default_axis_model(axis).pixels(degrees)
+    if not model.accel or duration_ms is None:
+        return model.pixels(degrees)
+    return model.pixels(degrees, profile_sq(duration_ms))
+
+def calibration_sweep_start(axis: str, px: float, duration_ms: int):
+    """Start a new sweep of AXIS_DEGREES[axis] with its first move."""
+    _pending_sweeps[axis] = CalibrationSweep(AXIS_DEGREES[axis])
+    _pending_directions[axis] = math.copysign(1, px)
+    calibration_sweep_add_move(axis, px, duration_ms)
+
+def calibration_sweep_add_move(axis: str, px: float, duration_ms: int):
+    """
+    Record a move of the pending sweep, e.g. an adjustment. px is the
+    signed move itself, in the same direction as the first move to go
+    further, or the opposite to come back.
+    """
+    sweep = _pending_sweeps.get(axis)
+    if not sweep:
+        return
+    px *= _pending_directions[axis]
+    speed_sq = profile_sq(duration_ms) * px ** 2
+    sweep.moves.append([px, math.copysign(speed_sq, px)])
+
+def calibration_sweep_save(axis: str = None) -> dict[str, AxisModel]:
+    """Add pending sweeps to the active game's models, refit, and save to the cache file."""
+    game = get_game_name()
+    game_models = load_models().setdefault(game, {})
+    for sweep_axis in [axis] if axis else list(_pending_sweeps):
+        sweep = _pending_sweeps.pop(sweep_axis, None)
+        if not sweep:
+            continue
+        model = game_models.get(sweep_axis)
+        sweeps = [*(model.sweeps if model else []), sweep]
+        model = fit_axis_model(sweeps)
+        if model:
+            game_models[sweep_axis] = model
+    save_models()
+    return game_models
+
+def calibration_clear(game: str = None):
+    """Forget calibration for the active game."""
+    load_models().pop(game or get_game_name(), None)
+    _pending_sweeps.clear()
+    _pending_directions.clear()
+    save_models()
@@ -1,9 +1,17 @@
 from talon import Module, Context, actions, cron, ctrl, clip, settings
+from .game_calibration import (
+    calibrated_pixels,
+    calibration_clear,
+    calibration_sweep_add_move,
+    calibration_sweep_save,
+    calibration_sweep_start,
+)
 from .game_events import (
     event_on_game_mode,
     event_on_key,
     event_on_mouse,
 )
+import math
 
 mod = Module()
 ctx = Context()
@@ -13,8 +21,6 @@ _move_dir_last_horizontal = "d"
 _horizontal_keys = { "right", "left", "a", "d" }
 _step_dir = None
 _step_job = None
-_last_calibrate_value_x = 0
-_last_calibrate_value_y = 0
 _curve_dir = None
 _curve_type = "inward"
 _curve_speed = None
@@ -267,46 +273,43 @@ def mouse_reset_center_y():
     """Reset the mouse to the center of the screen."""
 
     game_mouse_move_degrees(0, 180, 100)
-    actions.user.mouse_move_smooth_queue(lambda: game_mouse_move_degrees(0, -90, 100))
-
-def on_calibrate_x_360_tick(value):
-    actions.skip()
-#     global _last_calibrate_value_x
-#     actions.user.game_ui_calibrate_update(_last_calibrate_value_x + value.dx)
-#     if value.type == "stop":
-#         _last_calibrate_value_x += value.dx
-
-def on_calibrate_y_90_tick(value):
-    actions.skip()
-#     global _last_calibrate_value_y
-#     actions.user.game_ui_calibrate_update(_last_calibrate_value_y - value.dy)
-#     if value.type == "stop":
-#         _last_calibrate_value_y -= value.dy
-
-def game_mouse_calibrate_x_360(dx360: int):
-    actions.skip()
-#     """Calibrate a 360 spin"""
-#     global _last_calibrate_value_x
-#     _last_calibrate_value_x = 0
-#     actions.user.mouse_move_smooth_delta(dx360, 0, 1000, on_calibrate_x_360_tick, mouse_api_type="windows")
+    dx, dy = game_mouse_degrees_to_delta(0, -90, 100)
+    # continues in the same frame loop, no stop/start between the two
+    actions.user.mouse_move_smooth_queue_delta(dx, dy, 100)
+
+def game_mouse_calibrate_x_360(dx360: int, duration_ms: int = 1000):
+    """Calibrate a 360 spin. Sweeps at different durations let acceleration be fitted."""
+    calibration_sweep_start("x", dx360, duration_ms)
+    actions.user.mouse_move_smooth_delta(dx360, 0, duration_ms)
 
 def game_mouse_calibrate_x_360_adjust_last(dx: int):
-    actions.skip()
-#     """Add or subtract to the last x calibration."""
-#     actions.user.mouse_move_smooth_delta(dx, 0, 500, on_calibrate_x_360_tick, mouse_api_type="windows")
+    """Add or subtract to the last x calibration."""
+    calibration_sweep_add_move("x", dx, 500)
+    actions.user.mouse_move_smooth_delta(dx, 0, 500)
 
 def game_mouse_calibrate_y_90_adjust_last(dy: int):
-    actions.skip()
-#     """Add or subtract to the last x calibration."""
-#     actions.user.mouse_move_smooth_delta(0, dy, 500, on_calibrate_y_90_tick, mouse_api_type="windows")
-
-def game_calibrate_90_y(dy_90: int):
-    actions.skip()
-#     """Calibrate looking down to the ground and looking up to center."""
-#     global _last_calibrate_value_y
-#     _last_calibrate_value_y = 0
-#     actions.user.mouse_move_smooth_delta(0, dy_90 * 2, 100, mouse_api_type="windows")
-#     actions.user.mouse_move_smooth_queue(lambda: actions.user.mouse_move_smooth_delta(0, -dy_90, 100, on_calibrate_y_90_tick, mouse_api_type="windows"))
+    """Add or subtract to the last y calibration."""
+    # the y sweep is measured on the way back up, so down is negative
+    calibration_sweep_add_move("y", -dy, 500)
+    actions.user.mouse_move_smooth_delta(0, dy, 500)
+
+def game_calibrate_90_y(dy_90: int, duration_ms: int = 100):
+    """Calibrate looking down to the ground and looking up to center."""
+    calibration_sweep_start("y", dy_90, duration_ms)
+    # same speed down as back up, so acceleration doesn't change the starting pose
+    actions.user.mouse_move_smooth_delta(0, dy_90 * 2, duration_ms)
+    actions.user.mouse_move_smooth_queue_delta(0, -dy_90, duration_ms)
+
+def game_mouse_calibrate_save():
+    """Save the calibration sweeps for the active game and refit its model."""
+    models = calibration_sweep_save()
+    for axis, model in models.items():
+        accel = f", acceleration {model.accel:.3g}" if model.accel else ""
+        print(f"Calibrated {axis}: {model.pixels(360 if axis == 'x' else 90):.0f}px{accel} from {len(model.sweeps)} sweeps")
+
+def game_mouse_calibrate_clear():
+    """Forget the calibration for the active game."""
+    calibration_clear()
 
 def game_key_release(key):
     global _key_up_pending_jobs
@@ -369,13 +372,44 @@ def get_held_mouse_buttons():
     """Get the held mouse buttons"""
     return _held_mouse_buttons
 
+def game_mouse_degrees_to_delta(dx_degrees: int, dy_degrees: int, duration_ms: int = None):
+    """
+    Degrees to px using the calibrated model for the active game, or the
+    game_mouse_calibrate_x_360/y_90 settings if it isn't calibrated.
+    duration_ms accounts for in game mouse acceleration if calibrated.
+    """
+    return (
+        calibrated_pixels("x", dx_degrees, duration_ms),
+        calibrated_pixels("y", dy_degrees, duration_ms),
+    )
+
 def game_mouse_move_degrees(dx_degrees: int, dy_degrees: int, duration_ms = None, callback_stop = None):
-    dx_360 = settings.get("user.game_mouse_calibrate_x_360")
-    dy_90 = settings.get("user.game_mouse_calibrate_y_90")
-    dx_total = dx_360 / 360 * dx_degrees
-    dy_total = dy_90 / 90 * dy_degrees
+    duration_ms = duration_ms or settings.get("user.mouse_move_smooth_duration")
+    dx_total, dy_total = game_mouse_degrees_to_delta(dx_degrees, dy_degrees, duration_ms)
     actions.user.mouse_move_smooth_delta(dx_total, dy_total, duration_ms, callback_stop=callback_stop)
 
+def game_mouse_move_degrees_path(points_degrees: list, duration_ms = None, callback_stop = None):
+    """
+    Sweep the camera through (x, y) degree offsets from the current view in one motion.
+    With calibrated acceleration, each segment is converted as a move of its
+    share of duration_ms, which approximates acceleration across the path.
+    """
+    duration_ms = duration_ms or settings.get("user.mouse_move_smooth_duration")
+    segments = []
+    last_x, last_y = 0, 0
+    for x, y in points_degrees:
+        segments.append((x - last_x, y - last_y))
+        last_x, last_y = x, y
+    path_degrees = sum(math.hypot(dx, dy) for dx, dy in segments)
+    points = []
+    px_x, px_y = 0, 0
+    for dx, dy in segments:
+        segment_ms = duration_ms * math.hypot(dx, dy) / path_degrees if path_degrees else duration_ms
+        segment_px_x, segment_px_y = game_mouse_degrees_to_delta(dx, dy, segment_ms)
+        px_x, px_y = px_x + segment_px_x, px_y + segment_px_y
+        points.append((px_x, px_y))
+    actions.user.mouse_move_smooth_path(points, duration_ms, callback_stop=callback_stop, path_type="catmull_rom", relative=True)
+
 def mouse_move_deg(deg_x: int, deg_y: int, mouse_button: int = None):
     if mouse_button is not None:
         mouse_hold(mouse_button)
@@ -387,6 +421,17 @@ def mouse_move_deg(deg_x: int, deg_y: int, mouse_button: int = None):
     else:
         game_mouse_move_degrees(deg_x, deg_y)
 
+def mouse_move_deg_path(points_degrees: list, mouse_button: int = None):
+    if mouse_button is not None:
+        mouse_hold(mouse_button)
+
+        def on_stop():
+            mouse_release(mouse_button)
+
+        game_mouse_move_degrees_path(points_degrees, callback_stop=on_stop)
+    else:
+        game_mouse_move_degrees_path(points_degrees)
+
 def mouse_move_continuous(x: int, y: int, speed: int, mouse_button: int = None):
     if mouse_button is not None:
         mouse_hold(mouse_button)
@@ -16,6 +16,11 @@ GREEN = "88d61a"
 RED = "d61a1a"
 BLUE = "1a1ad6"
 YELLOW = "d6d61a"
+# fades run on ui_elements' shared animation ticker
+FLASH_MS = 250
+FADE_MS = 150
+# stick and dpad direction ids highlighted here, so held input only sends changes
+highlighted_dirs = set()
 
 def get_first_list_key(list_name: str):
     list_key_values = list(registry.lists[list_name])[0]
@@ -96,12 +101,12 @@ def xbox_stick_ui(
     size : int = 30,
     accent_color: str = None,
 ):
-    (div, text) = actions.user.ui_elements(["div", "text"])
+    (div, text, style) = actions.user.ui_elements(["div", "text", "style"])
     accent_color = accent_color or accent_color_default
     label = label or list_names[subject]
     gear = settings.get(f"user.game_xbox_{subject}_default_gear") or 5
 
-    key_css = {
+    key_css = style({
         "padding": 8,
         "flex_direction": "row",
         "justify_content": "center",
@@ -109,7 +114,7 @@ def xbox_stick_ui(
         "border_radius": size,
         "width": size,
         "height": size
-    }
+    })
 
     def key(key_name, text_content, width=size):
         return div(key_css, id=key_name, width=width, background_color="333333cc")[
@@ -141,9 +146,9 @@ def xbox_stick_ui(
     ]
 
 def xbox_primary_buttons_ui(label: str, size : int = 30):
-    (div, text) = actions.user.ui_elements(["div", "text"])
+    (div, text, style) = actions.user.ui_elements(["div", "text", "style"])
 
-    key_css = {
+    key_css = style({
         "padding": 8,
         "flex_direction": "row",
         "justify_content": "center",
@@ -151,7 +156,7 @@ def xbox_primary_buttons_ui(label: str, size : int = 30):
         "margin": 1,
         "width": size,
         "height": size
-    }
+    })
 
     def button(key_name, text_content, color, width=size):
         return div(
@@ -209,17 +214,17 @@ def xbox_center_buttons_ui(size : int):
     ]
 
 def xbox_dpad_ui(label: str, size : int = 30):
-    (div, text) = actions.user.ui_elements(["div", "text"])
+    (div, text, style) = actions.user.ui_elements(["div", "text", "style"])
     label = label or list_names["dpad"]
 
-    key_css = {
+    key_css = style({
         "padding": 8,
         "flex_direction": "row",
         "justify_content": "center",
         "align_items": "center",
         "width": size,
         "height": size
-    }
+    })
 
     def key(key_name, text_content, width=size):
         return div(key_css, id=key_name, width=width, background_color="333333dd")[
@@ -293,20 +298,33 @@ def on_button(button, state):
         actions.user.ui_elements_unhighlight(button)
 
 
+def highlight_dirs(active: dict[str, bool]):
+    """
+    Highlight ids that became active and fade out ids that stopped being
+    active, in one redraw. Ids that didn't change are left alone, so a fade
+    started on release isn't restarted by the next event.
+    """
+    changes = []
+    for id, is_active in active.items():
+        if is_active and id not in highlighted_dirs:
+            highlighted_dirs.add(id)
+            changes.append(["highlight", id])
+        elif not is_active and id in highlighted_dirs:
+            highlighted_dirs.discard(id)
+            changes.append(["unhighlight", id, FADE_MS])
+    if changes:
+        actions.user.ui_elements_batch(changes)
+
 def on_stick_dir(subject, coords):
     x, y = coords
+    active = {
+        "left": x < 0,
+        "right": x > 0,
+        "down": y < 0,
+        "up": y > 0,
+    }
 
-    for direction in ["up", "down", "left", "right"]:
-        actions.user.ui_elements_unhighlight(f"{subject}_{direction}")
-
-    if x < 0:
-        actions.user.ui_elements_highlight(f"{subject}_left")
-    if x > 0:
-        actions.user.ui_elements_highlight(f"{subject}_right")
-    if y < 0:
-        actions.user.ui_elements_highlight(f"{subject}_down")
-    if y > 0:
-        actions.user.ui_elements_highlight(f"{subject}_up")
+    highlight_dirs({f"{subject}_{direction}": is_active for direction, is_active in active.items()})
 
 def on_stick(event):
     if event.type == "gear_change":
@@ -316,14 +334,11 @@ def on_stick(event):
         on_stick_dir(event.subject, event.value)
 
 def on_dpad_dir(dir):
-    for direction in ["up", "down", "left", "right"]:
-        actions.user.ui_elements_unhighlight(f"dpad_{direction}")
-
-    actions.user.ui_elements_highlight(f"dpad_{dir}")
+    highlight_dirs({f"dpad_{direction}": direction == dir for direction in ["up", "down", "left", "right"]})
 
 def on_key(key, state):
     if state == "press":
-        actions.user.ui_elements_highlight_briefly(key)
+        actions.user.ui_elements_flash(key, None, FLASH_MS)
     elif state == "hold":
         actions.user.ui_elements_highlight(key)
     elif state == "release":
@@ -341,10 +356,12 @@ def on_trigger(event):
 def on_xbox_event(event):
     # print(f"on_xbox_event: {event}")
     if event.type == "preferred_dir_mode_change":
-        actions.user.ui_elements_unhighlight("left_stick_preferred")
-        actions.user.ui_elements_unhighlight("right_stick_preferred")
-        actions.user.ui_elements_unhighlight("dpad_preferred")
-        actions.user.ui_elements_highlight(f"{event.subject}_preferred", f"{GREEN}55")
+        actions.user.ui_elements_batch([
+            ["unhighlight", "left_stick_preferred"],
+            ["unhighlight", "right_stick_preferred"],
+            ["unhighlight", "dpad_preferred"],
+            ["highlight", f"{event.subject}_preferred", f"{GREEN}55"],
+        ])
     elif event.subject == "right_stick" or event.subject == "left_stick":
         on_stick(event)
     elif event.subject == "left_trigger" or event.subject == "right_trigger":
@@ -389,6 +406,7 @@ def on_ui_lifecycle(event):
             if preferred_dir_mode_subject:
                 actions.user.ui_elements_highlight(f"{preferred_dir_mode_subject}_preferred", f"{GREEN}55")
     elif event.type == "unmount":
+        highlighted_dirs.clear()
         if keys and include_key_events and game_event_register_on_keys_init:
             game_event_register_on_keys_init = False
             include_key_events = False
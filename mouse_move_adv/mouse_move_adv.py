@@ -7,26 +7,53 @@ Tick = Move the mouse a short distance in a direction
 from talon import Module, actions, ctrl, cron, settings
 from typing import Callable, Literal, Union
 from dataclasses import dataclass
-import platform
+from .src.mouse_move_backends import (
+    MouseMoveBackend,
+    get_mouse_move_backend,
+    mouse_move_backend_register,
+    set_mouse_move_trace,
+)
+from .src.mouse_move_continuous import (
+    TICK_MS,
+    ContinuousVelocity,
+    benchmark_continuous_accuracy,
+    benchmark_continuous_report,
+)
+from .src.mouse_move_easing import (
+    easing_register,
+    easing_register_bezier,
+    easing_register_points,
+)
+from .src.mouse_move_events import MouseMoveCallbackEvent, MouseMoveEvents, MouseMoveEventTypes
+from .src.mouse_move_path import MousePath, PathTypes
+from .src.mouse_move_queue import MotionItem, MotionQueue, MotionTrack, next_motion_id
+from .src.mouse_move_subpixel import subpixel_batch_benchmark
+from .src.mouse_move_trace import MouseMoveTrace, TRACE_CAPACITY, trace_report
 import math
 import time
 
 mod = Module()
-mod.setting("mouse_move_api", default="talon", type=str, desc="Mouse API to use for mouse movement - talon or windows")
+mod.setting("mouse_move_api", default="talon", type=str, desc="Mouse API to use for mouse movement - talon, windows, or uinput (Linux)")
 mod.setting("mouse_move_continuous_speed_default", default=2, type=int, desc="Default speed for continuous mouse movement")
+mod.setting("mouse_move_continuous_ramp_ms", default=0, type=int, desc="Time to ramp up to the continuous speed. 0 for instant")
+mod.setting("mouse_move_continuous_ramp_easing", default="linear", type=str, desc="Easing type of the continuous ramp up e.g. linear, ease_in, ease_out_cubic")
+mod.setting("mouse_move_continuous_max_speed", default=0, type=int, desc="Max speed for continuous mouse movement. 0 for no limit")
+mod.setting("mouse_move_continuous_deceleration_ms", default=0, type=int, desc="Time constant of the exponential slow down on continuous stop. 0 to stop immediately")
 mod.setting("mouse_move_tick_distance", default=50, type=int, desc="Distance for mouse_move_tick_last_direction")
 mod.setting("mouse_move_smooth_duration", default=200, type=int, desc="Speed for mouse_move_smooth_delta")
 
 _mouse_job = None
 _last_mouse_job_type = None
-_mouse_movement_queue = []
+_mouse_movement_queue = MotionQueue()
 _mouse_continuous_start_ts = None
 _mouse_continuous_stop_ts = None
 _mouse_continuous_dir = None
 _mouse_continuous_speed_default = 2
 _mouse_continuous_speed = _mouse_continuous_speed_default
+_mouse_continuous_velocity: ContinuousVelocity = None
 dir_change_event_subscribers = []
-mouse_move_event_subscribers = []
+mouse_move_events = MouseMoveEvents()
+_mouse_move_trace: MouseMoveTrace = None
 
 @dataclass
 class UnitVector:
@@ -35,74 +62,68 @@ class UnitVector:
 
 _last_unit_vector = UnitVector(0, 0)
 
-@dataclass
-class MouseMoveCallbackEvent:
-    dx: float
-    dy: float
-    type: Literal["start", "tick", "stop"]
-
-easing_types = {
-    "linear": lambda x: x,
-    "ease_in_out": lambda x: math.sin(x * math.pi / 2),
-    "ease_in": lambda x: 1 - math.cos(x * math.pi / 2),
-    "ease_out": lambda x: math.sin(x * math.pi / 2),
-    "instant": lambda x: 1 if x >= 1 else 0,
-}
+def get_backend(mouse_api_type: str = None) -> MouseMoveBackend:
+    return get_mouse_move_backend(mouse_api_type or settings.get("user.mouse_move_api"))
 
 def mouse_move_talon(dx: int, dy: int):
-    (x, y) = ctrl.mouse_pos()
-    ctrl.mouse_move(x + dx, y + dy)
+    get_mouse_move_backend("talon").emit(dx, dy)
 
 def mouse_move_windows(dx: int, dy: int):
-    pass
+    get_mouse_move_backend("windows").emit(dx, dy)
 
 def mouse_move(dx: int, dy: int):
-    if settings.get("user.mouse_move_api") == "windows":
-        mouse_move_windows(dx, dy)
-    else:
-        mouse_move_talon(dx, dy)
-
-if platform.system() == "Windows":
-    import win32api, win32con
-    def mouse_move_windows(dx: int, dy: int):
-        win32api.mouse_event(win32con.MOUSEEVENTF_MOVE, dx, dy)
-    # def mouse_move(dx: int, dy: int):
-    #     mouse_move_windows(dx, dy)
+    get_backend().emit(dx, dy)
 
-def mouse_move_smooth_queue(fn: callable):
-    """Add to movement _mouse_movement_queue, executed after next mouse_stop."""
-    global _mouse_movement_queue
-    _mouse_movement_queue.append(fn)
+def mouse_move_smooth_queue(fn: callable) -> int:
+    """Add to movement _mouse_movement_queue, executed after next mouse_stop. Returns the motion id."""
+    return _mouse_movement_queue.push(MotionItem("callable", fn=fn))
 
-CurveTypes = Literal["linear", "ease_in_out", "ease_in", "ease_out"]
-
-class SubpixelAdjuster:
+def mouse_move_smooth_queue_delta(
+    dx: Union[int, float],
+    dy: Union[int, float],
+    duration_ms: int = None,
+    easing_type: str = "ease_in_out",
+    blend_ms: int = 0,
+    callback_tick: Callable[[MouseMoveCallbackEvent], None] = None,
+    callback_stop: Callable[[], None] = None,
+    mouse_api_type: str = None) -> int:
     """
-    Some apis require ints, but that will throw off our calculations
-    over time. This class helps us keep track of the fractional part
-    of the delta so we can keep track of the accumulated error and
-    adjust the int part accordingly.
+    Queue a delta motion. It continues straight from the current movement
+    in the same frame loop. With blend_ms, it starts that long before the
+    current movement ends, and the two are added together.
+    Returns the motion id.
     """
-    def __init__(self):
-        self.dx_frac = 0.0
-        self.dy_frac = 0.0
-
-    def update_pos(self, dx: Union[int, float], dy: Union[int, float]):
-        dx_int = int(dx)
-        dy_int = int(dy)
-
-        self.dx_frac += dx - dx_int
-        self.dy_frac += dy - dy_int
-
-        if abs(self.dx_frac) >= 0.5:
-            dx_int += int(math.copysign(1, self.dx_frac))
-            self.dx_frac -= int(math.copysign(1, self.dx_frac))
-
-        if abs(self.dy_frac) >= 0.5:
-            dy_int += int(math.copysign(1, self.dy_frac))
-            self.dy_frac -= int(math.copysign(1, self.dy_frac))
-
-        return dx_int, dy_int
+    return _mouse_movement_queue.push(MotionItem(
+        "delta",
+        dx=dx,
+        dy=dy,
+        duration_ms=duration_ms or settings.get("user.mouse_move_smooth_duration"),
+        easing_type=easing_type,
+        blend_ms=blend_ms,
+        callback_tick=callback_tick,
+        callback_stop=callback_stop,
+        mouse_api_type=mouse_api_type,
+    ))
+
+CurveTypes = Literal[
+    "linear",
+    "ease_in_out",
+    "ease_in",
+    "ease_out",
+    "ease_in_cubic",
+    "ease_out_cubic",
+    "ease_in_out_cubic",
+    "ease_in_quintic",
+    "ease_out_quintic",
+    "ease_in_out_quintic",
+    "bezier_ease",
+    "bezier_ease_in",
+    "bezier_ease_out",
+    "bezier_ease_in_out",
+    "spring",
+    "instant",
+]
+MouseApiTypes = Literal["talon", "windows", "uinput", "stub"]
 
 def convert_to_unit_vector(dx: int, dy: int):
     """Convert a delta to a unit vector (length of 1) """
@@ -115,8 +136,8 @@ def mouse_move_smooth_delta(
     duration_ms: int = None,
     callback_tick: Callable[[MouseMoveCallbackEvent], None] = None,
     callback_stop: Callable[[], None] = None,
-    easing_type: Literal["linear", "ease_in_out", "ease_in", "ease_out"] = "ease_in_out",
-    mouse_api_type: Literal["talon", "windows"] = None):
+    easing_type: CurveTypes = "ease_in_out",
+    mouse_api_type: MouseApiTypes = None):
     """
     Move the mouse in a natural way over a duration.
     Examples:
@@ -132,66 +153,156 @@ def mouse_move_smooth_delta(
     mouse_move_smooth_delta(100, 0, 100, callback_tick)
     ```
     """
-    global _mouse_job, _last_mouse_job_type, _last_unit_vector
     duration_ms = duration_ms or settings.get("user.mouse_move_smooth_duration")
     mouse_stop(start_next_queue=False)
-
+    mouse_move_motion_start(MotionItem(
+        "delta",
+        dx=dx_total,
+        dy=dy_total,
+        duration_ms=duration_ms,
+        easing_type=easing_type,
+        callback_tick=callback_tick,
+        callback_stop=callback_stop,
+        mouse_api_type=mouse_api_type,
+    ))
+
+def mouse_move_smooth_profile(
+    dx: Union[int, float],
+    dy: Union[int, float],
+    duration_ms: int = None,
+    easing_type: CurveTypes = "ease_in_out") -> list[tuple[float, float]]:
+    """Per frame deltas that mouse_move_smooth_delta would send, without moving the mouse."""
+    track = MotionTrack(MotionItem(
+        "delta",
+        dx=dx,
+        dy=dy,
+        duration_ms=duration_ms or settings.get("user.mouse_move_smooth_duration"),
+        easing_type=easing_type,
+    ))
+    return [track.step() for _ in range(track.steps)]
+
+def mouse_move_motion_start(item: MotionItem):
+    """
+    Run a delta motion. Queued delta motions with the same mouse api are
+    picked up by the same frame loop, so there is no stop and restart
+    between them.
+    """
+    global _mouse_job, _last_mouse_job_type
     _last_mouse_job_type = "natural"
-    update_interval_ms = 16
-    steps = max(1, duration_ms // update_interval_ms)
-    step_count = 0
-    last_x, last_y = 0, 0
-    _last_unit_vector = convert_to_unit_vector(dx_total, dy_total)
-    mouse_move_dir_change_event_trigger(_last_unit_vector.x, _last_unit_vector.y)
-    convert_linear_to_curve = easing_types[easing_type]
-    subpixel_adjuster = SubpixelAdjuster()
+    backend = get_backend(item.mouse_api_type)
+    tracks: list[MotionTrack] = []
 
-    mouse_move_fn = mouse_move
-
-    if not mouse_api_type:
-        mouse_api_type = settings.get("user.mouse_move_api")
-
-    if mouse_api_type == "windows":
-        mouse_move_fn = mouse_move_windows
-    elif mouse_api_type == "talon":
-        mouse_move_fn = mouse_move_talon
+    def start_track(item: MotionItem):
+        global _last_unit_vector
+        track = MotionTrack(item)
+        tracks.append(track)
+        backend.begin_motion(item.id, item.dx, item.dy, item.duration_ms)
+        _last_unit_vector = convert_to_unit_vector(*item.start_direction)
+        mouse_move_dir_change_event_trigger(_last_unit_vector.x, _last_unit_vector.y)
+        if mouse_move_events.has_subscribers("start"):
+            mouse_move_events.trigger(track.event.set(item.dx, item.dy, "start"))
+        if item.callback_tick:
+            item.callback_tick(track.event.set(0, 0, "start"))
+
+    def stop_track(track: MotionTrack):
+        item = track.item
+        tracks.remove(track)
+        if mouse_move_events.has_subscribers("stop"):
+            mouse_move_events.trigger(track.event.set(item.dx, item.dy, "stop"))
+        if item.callback_tick:
+            item.callback_tick(track.event.set(item.dx, item.dy, "stop"))
+        if item.callback_stop:
+            item.callback_stop()
+
+    def next_chained_item() -> MotionItem:
+        next_item = _mouse_movement_queue.peek()
+        if next_item and next_item.kind == "delta" and next_item.mouse_api_type == item.mouse_api_type:
+            return next_item
+        return None
 
     def update_position():
-        nonlocal step_count, last_x, last_y, mouse_move_fn
-
-        step_count += 1
-        if step_count > steps:
-            mouse_stop()
-            if mouse_move_event_subscribers:
-                mouse_move_event_trigger(MouseMoveCallbackEvent(dx_total, dy_total, "stop"))
-            if callback_tick:
-                callback_tick(MouseMoveCallbackEvent(dx_total, dy_total, "stop"))
-            if callback_stop:
-                callback_stop()
+        # pick up the next queued motion once we are within its blend window
+        next_item = next_chained_item()
+        while next_item and (not tracks or tracks[-1].remaining_steps <= next_item.blend_steps):
+            start_track(_mouse_movement_queue.pop())
+            next_item = next_chained_item()
+
+        tick_subscribers = mouse_move_events.has_subscribers("tick")
+        for track in tracks:
+            track_dx, track_dy = track.step()
+            backend.move(track_dx, track_dy, track.item.id)
+            if track.item.callback_tick or tick_subscribers:
+                event = track.event.set(track.x, track.y, "tick")
+                if track.item.callback_tick:
+                    track.item.callback_tick(event)
+                if tick_subscribers:
+                    mouse_move_events.trigger(event)
+
+        backend.flush()
+
+        job = _mouse_job
+        for track in [track for track in tracks if track.done]:
+            stop_track(track)
+
+        # a stop callback started a new movement, which owns the mouse now
+        if _mouse_job is not job:
             return
-        progress = step_count / steps
-        curve_progress = convert_linear_to_curve(progress)
-
-        current_x = dx_total * curve_progress
-        current_y = dy_total * curve_progress
-
-        dx_step = current_x - last_x
-        dy_step = current_y - last_y
+        if not tracks and not next_chained_item():
+            mouse_stop()
 
-        (int_dx_step, int_dy_step) = subpixel_adjuster.update_pos(dx_step, dy_step)
+    start_track(item)
+    _mouse_job = cron.interval(f"{TICK_MS}ms", update_position)
+    update_position()
 
-        mouse_move_fn(int_dx_step, int_dy_step)
+def mouse_move_smooth_path(
+    points: list,
+    duration_ms: int = None,
+    callback_tick: Callable[[MouseMoveCallbackEvent], None] = None,
+    callback_stop: Callable[[], None] = None,
+    path_type: PathTypes = "polyline",
+    easing_type: CurveTypes = "ease_in_out",
+    relative: bool = False,
+    mouse_api_type: MouseApiTypes = None):
+    """
+    Move the mouse through waypoints in one continuous motion, at a
+    uniform speed along the path.
+    Points are screen positions, or offsets from the current position
+    if relative is True. The path starts at the current position.
+    Examples:
+    ```
+    mouse_move_smooth_path([(500, 100), (500, 500), (100, 500)], 600)
+    mouse_move_smooth_path([(500, 100), (500, 500)], path_type="catmull_rom")
+    mouse_move_smooth_path([(300, 0), (300, 100), (0, 100)], relative=True) # e.g. camera sweep
+    ```
+    """
+    duration_ms = duration_ms or settings.get("user.mouse_move_smooth_duration") * len(points)
+    mouse_stop(start_next_queue=False)
 
-        last_x, last_y = current_x, current_y
-        if callback_tick:
-            callback_tick(MouseMoveCallbackEvent(current_x, current_y, "tick"))
+    if relative:
+        waypoints = [(0, 0), *points]
+    else:
+        (cur_x, cur_y) = ctrl.mouse_pos()
+        waypoints = [(p[0] - cur_x, p[1] - cur_y) for p in [(cur_x, cur_y), *points]]
+    path = MousePath(waypoints, path_type)
+    if not path.length:
+        if callback_stop:
+            callback_stop()
+        return
 
-    update_position()
-    _mouse_job = cron.interval("16ms", update_position)
-    if mouse_move_event_subscribers:
-        mouse_move_event_trigger(MouseMoveCallbackEvent(dx_total, dy_total, "start"))
-    if callback_tick:
-        callback_tick(MouseMoveCallbackEvent(0, 0, "start"))
+    dx_total, dy_total = path.end
+    mouse_move_motion_start(MotionItem(
+        "delta",
+        dx=dx_total,
+        dy=dy_total,
+        duration_ms=duration_ms,
+        easing_type=easing_type,
+        callback_tick=callback_tick,
+        callback_stop=callback_stop,
+        mouse_api_type=mouse_api_type,
+        path=path,
+    ))
+
+_mouse_stop_event = MouseMoveCallbackEvent(0, 0, "stop")
 
 def mouse_stop(start_next_queue: bool = True):
     """Stop current mouse movement, and start next in the _mouse_movement_queue if it exists."""
@@ -204,12 +315,25 @@ def mouse_stop(start_next_queue: bool = True):
         _mouse_continuous_dir = None
         _mouse_continuous_start_ts = None
         _mouse_continuous_stop_ts = None
-        if mouse_move_event_subscribers:
-            mouse_move_event_trigger(MouseMoveCallbackEvent(0, 0, "stop"))
+        if mouse_move_events.has_subscribers("stop"):
+            mouse_move_events.trigger(_mouse_stop_event.set(0, 0, "stop"))
         mouse_move_dir_change_event_trigger(0, 0)
-    if start_next_queue and len(_mouse_movement_queue) > 0:
-        fn = _mouse_movement_queue.pop(0)
-        fn()
+    if start_next_queue and _mouse_movement_queue:
+        item = _mouse_movement_queue.pop()
+        if item.kind == "delta":
+            mouse_move_motion_start(item)
+        else:
+            item.fn()
+
+_mouse_continuous_event = MouseMoveCallbackEvent()
+
+def create_continuous_velocity() -> ContinuousVelocity:
+    return ContinuousVelocity(
+        ramp_ms=settings.get("user.mouse_move_continuous_ramp_ms"),
+        ramp_easing=settings.get("user.mouse_move_continuous_ramp_easing"),
+        max_speed=settings.get("user.mouse_move_continuous_max_speed"),
+        deceleration_ms=settings.get("user.mouse_move_continuous_deceleration_ms"),
+    )
 
 def mouse_move_continuous(dx_unit: Union[int, float], dy_unit: Union[int, float], speed_initial: int = None):
     """
@@ -225,47 +349,66 @@ def mouse_move_continuous(dx_unit: Union[int, float], dy_unit: Union[int, float]
     global _mouse_job, _last_unit_vector, _mouse_continuous_start_ts, _mouse_continuous_stop_ts, _last_mouse_job_type, _mouse_continuous_speed
     speed_initial = speed_initial or settings.get("user.mouse_move_continuous_speed_default")
     _mouse_continuous_stop_ts = None
-    subpixel_adjuster = None
+    backend = get_backend()
     unit_vector = convert_to_unit_vector(dx_unit, dy_unit)
-    last_mouse_job_type = _last_mouse_job_type
+    if _mouse_job and _last_mouse_job_type == 'natural':
+        mouse_stop(start_next_queue=False)
     _last_mouse_job_type = "continuous"
+    event = _mouse_continuous_event
 
     def init(reset_speed=True):
-        nonlocal subpixel_adjuster
-        global _mouse_continuous_speed, _last_unit_vector, _mouse_continuous_start_ts
+        global _mouse_continuous_speed, _last_unit_vector, _mouse_continuous_start_ts, _mouse_continuous_velocity
         _mouse_continuous_speed = speed_initial if reset_speed else _mouse_continuous_speed
         _last_unit_vector = unit_vector
-        if mouse_move_event_subscribers:
-            mouse_move_event_trigger(MouseMoveCallbackEvent(dx_unit, dy_unit, "start"))
+        if mouse_move_events.has_subscribers("start"):
+            mouse_move_events.trigger(event.set(dx_unit, dy_unit, "start"))
         mouse_move_dir_change_event_trigger(_last_unit_vector.x, _last_unit_vector.y)
         _mouse_continuous_start_ts = time.perf_counter()
-        subpixel_adjuster = SubpixelAdjuster()
+        backend.begin_motion(next_motion_id())
+        if reset_speed:
+            _mouse_continuous_velocity = create_continuous_velocity()
+            # start one tick in the past so the first update moves right away
+            _mouse_continuous_velocity.start(_mouse_continuous_speed, _mouse_continuous_start_ts - TICK_MS / 1000)
 
     if _mouse_job:
-        if last_mouse_job_type == 'natural':
-            mouse_stop(start_next_queue=False)
+        if _mouse_continuous_velocity.decelerating:
+            # resume from the current velocity
+            _mouse_continuous_velocity.set_speed(_mouse_continuous_speed, time.perf_counter())
         if _last_unit_vector != unit_vector:
             init(reset_speed=False)
         # else already in progress
         return
 
     init()
+    moved_x, moved_y = 0.0, 0.0
 
     def update_position():
         global _mouse_continuous_stop_ts, _mouse_continuous_speed, _last_unit_vector
+        nonlocal moved_x, moved_y
         ts = time.perf_counter()
+        velocity = _mouse_continuous_velocity
 
         if _mouse_continuous_stop_ts and ts - _mouse_continuous_stop_ts > 0:
+            velocity.stop(_mouse_continuous_stop_ts)
+            _mouse_continuous_stop_ts = None
+        elif velocity.requested_speed != _mouse_continuous_speed and not velocity.decelerating:
+            velocity.set_speed(_mouse_continuous_speed, ts)
+
+        distance = velocity.advance(ts)
+        dx, dy = _last_unit_vector.x * distance, _last_unit_vector.y * distance
+        backend.move(dx, dy)
+        backend.flush()
+
+        if mouse_move_events.has_subscribers("tick"):
+            moved_x += dx
+            moved_y += dy
+            mouse_move_events.trigger(event.set(moved_x, moved_y, "tick"))
+
+        if velocity.done:
             mouse_stop()
-            return
-
-        dx_int, dy_int = subpixel_adjuster.update_pos(
-            _last_unit_vector.x * _mouse_continuous_speed,
-            _last_unit_vector.y * _mouse_continuous_speed)
-        mouse_move(dx_int, dy_int)
 
     update_position()
-    _mouse_job = cron.interval("16ms", update_position)
+    _mouse_job = cron.interval(f"{TICK_MS}ms", update_position)
 
 def mouse_move_continuous_towards(x: int, y: int, speed_initial: int = None):
     """
@@ -303,7 +446,7 @@ def mouse_move_smooth_from_to(
         duration_ms: int = None,
         callback_tick: Callable[[MouseMoveCallbackEvent], None] = None,
         callback_stop: Callable[[], None] = None,
-        mouse_api_type: Literal["talon", "windows"] = None):
+        mouse_api_type: MouseApiTypes = None):
     """
     Move the mouse from one point to another over a duration.
     Examples:
@@ -323,18 +466,19 @@ def mouse_move_event_dir_change_unregister(on_event: callable):
     dir_change_event_subscribers.remove(on_event)
 
 def mouse_move_dir_change_event_trigger(x: float, y: float):
+    if not dir_change_event_subscribers:
+        return
     for subscriber in dir_change_event_subscribers:
         subscriber(x, y)
 
-def mouse_move_event_register(on_event: callable):
-    mouse_move_event_subscribers.append(on_event)
+def mouse_move_event_register(on_event: callable, event_types: list[MouseMoveEventTypes] = None, hz: float = 0):
+    mouse_move_events.register(on_event, event_types or ("start", "stop"), hz)
 
 def mouse_move_event_unregister(on_event: callable):
-    mouse_move_event_subscribers.remove(on_event)
+    mouse_move_events.unregister(on_event)
 
 def mouse_move_event_trigger(event: MouseMoveCallbackEvent):
-    for subscriber in mouse_move_event_subscribers:
-        subscriber(event)
+    mouse_move_events.trigger(event)
 
 @mod.action_class
 class Actions:
@@ -344,8 +488,8 @@ class Actions:
         duration_ms: int = None,
         callback_tick: Callable[[MouseMoveCallbackEvent], None] = None,
         callback_stop: Callable[[], None] = None,
-        easing_type: Literal["linear", "ease_in_out", "ease_in", "ease_out"] = "ease_in_out",
-        mouse_api_type: Literal["talon", "windows"] = None):
+        easing_type: CurveTypes = "ease_in_out",
+        mouse_api_type: MouseApiTypes = None):
         """Move the mouse over a delta with control over the curve type, duration, mouse api type, and callback."""
         mouse_move_smooth_delta(dx, dy, duration_ms, callback_tick, callback_stop, easing_type, mouse_api_type=mouse_api_type)
 
@@ -358,7 +502,7 @@ class Actions:
         callback_tick: Callable[[MouseMoveCallbackEvent], None] = None,
         callback_stop: Callable[[], None] = None,
         easing_type: CurveTypes = "ease_in_out",
-        mouse_api_type: Literal["talon", "windows"] = "talon"):
+        mouse_api_type: MouseApiTypes = "talon"):
         """Move the mouse from one point to another over a duration."""
         dx = x2 - x1
         dy = y2 - y1
@@ -373,7 +517,7 @@ class Actions:
         callback_tick: Callable[[MouseMoveCallbackEvent], None] = None,
         callback_stop: Callable[[], None] = None,
         easing_type: CurveTypes = "ease_in_out",
-        mouse_api_type: Literal["talon", "windows"] = None):
+        mouse_api_type: MouseApiTypes = None):
         """Move the mouse to a point over a duration."""
         (cur_x, cur_y) = ctrl.mouse_pos()
         dx = x - cur_x
@@ -387,16 +531,106 @@ class Actions:
         callback_tick: Callable[[MouseMoveCallbackEvent], None] = None,
         callback_stop: Callable[[], None] = None,
         easing_type: CurveTypes = "ease_in_out",
-        mouse_api_type: Literal["talon", "windows"] = None):
+        mouse_api_type: MouseApiTypes = None):
         """Move the mouse from a point over a duration."""
         (cur_x, cur_y) = ctrl.mouse_pos()
         dx = cur_x - x
         dy = cur_y - y
         actions.user.mouse_move_smooth_from_to(dx, dy, duration_ms, callback_tick, callback_stop, easing_type, mouse_api_type)
 
-    def mouse_move_smooth_queue(fn: callable):
-        """Add to movement queue, executed after next mouse_stop."""
-        mouse_move_smooth_queue(fn)
+    def mouse_move_smooth_queue(fn: callable) -> int:
+        """Add to movement queue, executed after next mouse_stop. Returns the motion id."""
+        return mouse_move_smooth_queue(fn)
+
+    def mouse_move_smooth_queue_delta(
+        dx: Union[int, float],
+        dy: Union[int, float],
+        duration_ms: int = None,
+        easing_type: CurveTypes = "ease_in_out",
+        blend_ms: int = 0,
+        callback_tick: Callable[[MouseMoveCallbackEvent], None] = None,
+        callback_stop: Callable[[], None] = None,
+        mouse_api_type: MouseApiTypes = None) -> int:
+        """
+        Queue a delta move that continues from the current movement without a gap.
+        Optionally blend into it blend_ms before the current movement ends.
+        Returns the motion id.
+
+        ```py
+        actions.user.mouse_move_smooth_delta(0, 500, 200)
+        actions.user.mouse_move_smooth_queue_delta(300, 0, 200, blend_ms=50)
+        ```
+        """
+        return mouse_move_smooth_queue_delta(dx, dy, duration_ms, easing_type, blend_ms, callback_tick, callback_stop, mouse_api_type)
+
+    def mouse_move_queue_cancel(motion_id: int) -> bool:
+        """Cancel a queued movement by id. Returns False if it already started."""
+        return _mouse_movement_queue.cancel(motion_id)
+
+    def mouse_move_queue_clear():
+        """Cancel all queued movements."""
+        _mouse_movement_queue.clear()
+
+    def mouse_move_queue_peek(count: int = 1) -> list:
+        """Get up to count upcoming queued movements without removing them."""
+        return _mouse_movement_queue.lookahead(count)
+
+    def mouse_move_smooth_profile(
+        dx: Union[int, float],
+        dy: Union[int, float],
+        duration_ms: int = None,
+        easing_type: CurveTypes = "ease_in_out") -> list:
+        """
+        Get the per frame (dx, dy) deltas that mouse_move_smooth_delta would send, without moving the mouse.
+        e.g. for modelling game mouse acceleration.
+        """
+        return mouse_move_smooth_profile(dx, dy, duration_ms, easing_type)
+
+    def mouse_move_smooth_path(
+        points: list,
+        duration_ms: int = None,
+        callback_tick: Callable[[MouseMoveCallbackEvent], None] = None,
+        callback_stop: Callable[[], None] = None,
+        path_type: PathTypes = "polyline",
+        easing_type: CurveTypes = "ease_in_out",
+        relative: bool = False,
+        mouse_api_type: MouseApiTypes = None):
+        """
+        Move the mouse through a list of (x, y) waypoints in one continuous motion.
+        path_type is "polyline", "catmull_rom", or "bezier".
+
+        ```py
+        actions.user.mouse_move_smooth_path([(500, 100), (500, 500)], 600, path_type="catmull_rom")
+        ```
+        """
+        mouse_move_smooth_path(points, duration_ms, callback_tick, callback_stop, path_type, easing_type, relative, mouse_api_type)
+
+    def mouse_move_easing_register(name: str, fn: Callable[[float], float]):
+        """
+        Register a custom easing function by name for `easing_type`.
+        Precomputed into a lookup table once.
+
+        ```py
+        actions.user.mouse_move_easing_register("ease_in_quad", lambda x: x * x)
+        ```
+        """
+        easing_register(name, fn)
+
+    def mouse_move_easing_register_points(name: str, points: list):
+        """
+        Register a custom easing curve by name from sampled points.
+        Either evenly spaced values or (x, y) pairs from 0 to 1.
+
+        ```py
+        actions.user.mouse_move_easing_register_points("fast_start", [0, 0.6, 0.8, 0.9, 1])
+        actions.user.mouse_move_easing_register_points("slow_start", [(0, 0), (0.5, 0.2), (1, 1)])
+        ```
+        """
+        easing_register_points(name, points)
+
+    def mouse_move_easing_register_bezier(name: str, x1: float, y1: float, x2: float, y2: float):
+        """Register a custom CSS style cubic-bezier easing curve by name."""
+        easing_register_bezier(name, x1, y1, x2, y2)
 
     def mouse_move_continuous(dx_unit: Union[int, float], dy_unit: Union[int, float], speed: int = None):
         """
@@ -491,6 +725,20 @@ class Actions:
         global _mouse_continuous_speed
         _mouse_continuous_speed /= multipler
 
+    def mouse_move_backend_register(name: str, factory: Callable[[], MouseMoveBackend]):
+        """
+        Register a custom mouse move backend, selectable with
+        `user.mouse_move_api` or `mouse_api_type`.
+
+        ```py
+        class MyBackend(MouseMoveBackend):
+            def emit(self, dx: int, dy: int):
+                ...
+        actions.user.mouse_move_backend_register("my_backend", MyBackend)
+        ```
+        """
+        mouse_move_backend_register(name, factory)
+
     def mouse_move_info():
         """Get mouse movement info"""
         return {
@@ -498,18 +746,69 @@ class Actions:
             "continuous_active": _mouse_continuous_start_ts,
         }
 
-    def mouse_move_event_register(on_event: callable):
+    def mouse_move_continuous_benchmark(speed: Union[int, float] = 5, duration_ms: int = 2000, ramp_ms: int = 0):
+        """
+        Simulate continuous movement at different tick rates and print
+        expected vs achieved pixels per second. Does not move the mouse.
+        """
+        rows = benchmark_continuous_accuracy(speed, duration_ms, ramp_ms=ramp_ms)
+        print(benchmark_continuous_report(rows))
+        return rows
+
+    def mouse_move_subpixel_benchmark(steps: int = 1000000, pointers: int = 3) -> dict:
+        """
+        Compare steps per second of the scalar and batched sub-pixel
+        carry on random deltas, and check both give the same ints.
+        """
+        result = subpixel_batch_benchmark(steps, pointers)
+        print(
+            f"{result['steps']} steps x {result['pointers']} pointers, numpy: {result['numpy']}\n"
+            f"scalar: {result['scalar_steps_per_s']:,.0f} steps/s\n"
+            f"batch: {result['batch_steps_per_s']:,.0f} steps/s\n"
+            f"mismatches: {result['mismatches']}"
+        )
+        return result
+
+    def mouse_move_trace_start(capacity: int = TRACE_CAPACITY):
+        """
+        Start recording every mouse move frame for mouse_move_trace_report.
+        Replaces the current trace.
+        """
+        global _mouse_move_trace
+        _mouse_move_trace = MouseMoveTrace(capacity)
+        set_mouse_move_trace(_mouse_move_trace)
+
+    def mouse_move_trace_stop() -> MouseMoveTrace:
+        """Stop recording mouse move frames. The trace is kept for mouse_move_trace_report."""
+        set_mouse_move_trace(None)
+        return _mouse_move_trace
+
+    def mouse_move_trace_report() -> str:
+        """
+        Print duration error, pixel error, frame jitter and peak velocity
+        per recorded motion, with averages per mouse api.
+        """
+        if not _mouse_move_trace:
+            print("No mouse move trace. Use mouse_move_trace_start first.")
+            return ""
+        report = trace_report(_mouse_move_trace)
+        print(report)
+        return report
+
+    def mouse_move_event_register(on_event: callable, event_types: list[MouseMoveEventTypes] = None, hz: float = 0):
         """
         Register callback event for mouse movement.
-        Will trigger when movement starts or stops.
+        Will trigger when movement starts or stops, or for the given event types.
+        hz limits how often "tick" is sent. The event object is reused, copy values to keep them.
 
         ```py
         def on_event(event):
             print(event.type)
         actions.user.mouse_move_event_register(on_event)
+        actions.user.mouse_move_event_register(on_tick, ["tick"], hz=10)
         ```
         """
-        mouse_move_event_register(on_event)
+        mouse_move_event_register(on_event, event_types, hz)
 
     def mouse_move_event_unregister(on_event: callable):
         """
@@ -540,6 +839,5 @@ class Actions:
         """
         Unregister all events
         """
-        global dir_change_event_subscribers, mouse_move_event_subscribers
-        dir_change_event_subscribers = []
-        mouse_move_event_subscribers = []
+        dir_change_event_subscribers.clear()
+        mouse_move_events.clear()
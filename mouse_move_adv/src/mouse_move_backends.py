@@ -0,0 +1,251 @@
+"""
+Mouse move backends
+
+A backend receives fractional deltas during a frame with `move`, and
+sends them to the OS once per frame with `flush`. Sub-pixel error is
+carried between flushes so that ints sent to the OS add up to the
+requested total.
+The backend is shared by every motion using it, so the carry is kept
+per motion. Blended motions each round their own deltas, and starting
+a motion doesn't touch the carry of the others. A motion that isn't
+moved during a frame has ended, and its carry is dropped.
+
+talon   = absolute move with ctrl.mouse_move, from the position it last
+          sent while frames follow each other, ctrl.mouse_pos otherwise
+windows = relative move with win32api.mouse_event
+uinput  = relative move with a virtual REL_X/REL_Y device (Linux, libevdev)
+stub    = records moves without touching the mouse, for tests
+
+When a trace is set, every flushed frame is recorded once per motion
+that moved in it, with that motion's own deltas.
+"""
+try:
+    from talon import ctrl
+except ImportError:
+    # outside of Talon e.g. tests, where only the stub backend is used
+    ctrl = None
+from typing import Callable, Union
+from .mouse_move_subpixel import SubpixelAdjuster
+import platform
+import time
+
+# frames closer than this keep the cursor position the talon backend last sent
+POSITION_CACHE_MS = 50
+
+class MotionCarry:
+    """Pending delta and sub-pixel carry of one motion."""
+    __slots__ = ("subpixel_adjuster", "pending_dx", "pending_dy", "moved")
+
+    def __init__(self):
+        self.subpixel_adjuster = SubpixelAdjuster()
+        self.pending_dx = 0.0
+        self.pending_dy = 0.0
+        self.moved = False
+
+class MouseMoveBackend:
+    name: str = None
+    relative: bool = True
+    # shared by all backends, see set_mouse_move_trace
+    trace = None
+
+    def __init__(self):
+        self.motions: dict[int, MotionCarry] = {}
+        self.motion_id = 0
+
+    def begin_motion(
+            self,
+            motion_id: int,
+            dx_total: Union[int, float] = None,
+            dy_total: Union[int, float] = None,
+            duration_ms: int = None):
+        """Start a motion with its own carry. `move` defaults to the latest one."""
+        self.motion_id = motion_id
+        self.motions[motion_id] = MotionCarry()
+        if self.trace:
+            self.trace.begin_motion(motion_id, self.name, time.perf_counter(), dx_total, dy_total, duration_ms)
+
+    def move(self, dx: Union[int, float], dy: Union[int, float], motion_id: int = None):
+        """Accumulate a delta of a motion to be sent on the next flush."""
+        if motion_id is None:
+            motion_id = self.motion_id
+        motion = self.motions.get(motion_id)
+        if not motion:
+            motion = self.motions[motion_id] = MotionCarry()
+        motion.pending_dx += dx
+        motion.pending_dy += dy
+        motion.moved = True
+
+    def flush(self):
+        """Send the accumulated delta for this frame to the OS as ints."""
+        dx_int, dy_int = 0, 0
+        ts = time.perf_counter() if self.trace else None
+        ended = None
+        for motion_id, motion in self.motions.items():
+            if not motion.moved:
+                ended = ended or []
+                ended.append(motion_id)
+                continue
+            motion.moved = False
+            if not motion.pending_dx and not motion.pending_dy:
+                continue
+            motion_dx, motion_dy = motion.subpixel_adjuster.update_pos(motion.pending_dx, motion.pending_dy)
+            if self.trace:
+                self.trace.record(ts, motion_id, motion.pending_dx, motion.pending_dy, motion_dx, motion_dy)
+            motion.pending_dx = 0.0
+            motion.pending_dy = 0.0
+            dx_int += motion_dx
+            dy_int += motion_dy
+        if ended:
+            for motion_id in ended:
+                del self.motions[motion_id]
+        if dx_int or dy_int:
+            self.emit(dx_int, dy_int)
+        return dx_int, dy_int
+
+    def reset(self):
+        """Drop pending deltas and carried sub-pixel error of every motion."""
+        self.motions.clear()
+
+    def emit(self, dx: int, dy: int):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class TalonMouseMoveBackend(MouseMoveBackend):
+    name = "talon"
+    relative = False
+
+    def __init__(self):
+        super().__init__()
+        self.pos = None
+        self.pos_ts = 0.0
+
+    def begin_motion(self, motion_id: int, *args, **kwargs):
+        # the cursor may have been moved by hand since the last motion
+        self.pos = None
+        super().begin_motion(motion_id, *args, **kwargs)
+
+    def reset(self):
+        super().reset()
+        self.pos = None
+
+    def emit(self, dx: int, dy: int):
+        ts = time.perf_counter()
+        if self.pos is None or (ts - self.pos_ts) * 1000 > POSITION_CACHE_MS:
+            self.pos = ctrl.mouse_pos()
+        x, y = self.pos[0] + dx, self.pos[1] + dy
+        ctrl.mouse_move(x, y)
+        self.pos = (x, y)
+        self.pos_ts = ts
+
+class WindowsMouseMoveBackend(MouseMoveBackend):
+    name = "windows"
+
+    def __init__(self):
+        super().__init__()
+        self.mouse_event = None
+        if platform.system() == "Windows":
+            import win32api, win32con
+            move_flag = win32con.MOUSEEVENTF_MOVE
+            self.mouse_event = lambda dx, dy: win32api.mouse_event(move_flag, dx, dy)
+
+    def emit(self, dx: int, dy: int):
+        if self.mouse_event:
+            self.mouse_event(dx, dy)
+
+class UinputMouseMoveBackend(MouseMoveBackend):
+    name = "uinput"
+
+    def __init__(self):
+        super().__init__()
+        import libevdev
+        self.libevdev = libevdev
+        device = libevdev.Device()
+        device.name = "Talon Virtual Mouse"
+        device.enable(libevdev.EV_REL.REL_X)
+        device.enable(libevdev.EV_REL.REL_Y)
+        # buttons are required for the device to be treated as a mouse
+        device.enable(libevdev.EV_KEY.BTN_LEFT)
+        device.enable(libevdev.EV_KEY.BTN_RIGHT)
+        device.enable(libevdev.EV_KEY.BTN_MIDDLE)
+        self.uinput = device.create_uinput_device()
+        self.syn_event = libevdev.InputEvent(libevdev.EV_SYN.SYN_REPORT, 0)
+
+    def emit(self, dx: int, dy: int):
+        if not self.uinput:
+            return
+        events = []
+        if dx:
+            events.append(self.libevdev.InputEvent(self.libevdev.EV_REL.REL_X, dx))
+        if dy:
+            events.append(self.libevdev.InputEvent(self.libevdev.EV_REL.REL_Y, dy))
+        events.append(self.syn_event)
+        self.uinput.send_events(events)
+
+    def close(self):
+        self.uinput = None
+
+class StubMouseMoveBackend(MouseMoveBackend):
+    name = "stub"
+
+    def __init__(self):
+        super().__init__()
+        self.moves = []
+        self.x = 0
+        self.y = 0
+
+    def emit(self, dx: int, dy: int):
+        self.moves.append((dx, dy))
+        self.x += dx
+        self.y += dy
+
+    def clear(self):
+        self.moves = []
+        self.x = 0
+        self.y = 0
+
+_backend_factories: dict[str, Callable[[], MouseMoveBackend]] = {
+    "talon": TalonMouseMoveBackend,
+    "windows": WindowsMouseMoveBackend,
+    "uinput": UinputMouseMoveBackend,
+    "stub": StubMouseMoveBackend,
+}
+_backends: dict[str, MouseMoveBackend] = {}
+
+def set_mouse_move_trace(trace):
+    """Record flushed frames of every backend to trace, or None to stop."""
+    MouseMoveBackend.trace = trace
+
+def mouse_move_backend_register(name: str, factory: Callable[[], MouseMoveBackend]):
+    """
+    Register a backend factory by name. It can then be selected
+    with the `user.mouse_move_api` setting or `mouse_api_type`.
+    """
+    _backend_factories[name] = factory
+    old_backend = _backends.pop(name, None)
+    if old_backend:
+        old_backend.close()
+
+def get_mouse_move_backend(name: str) -> MouseMoveBackend:
+    """Get the backend instance by name, created once and reused."""
+    backend = _backends.get(name)
+    if backend:
+        return backend
+
+    factory = _backend_factories.get(name)
+    if not factory:
+        print(f"Unknown mouse move api '{name}'. Using 'talon' instead.")
+        return get_mouse_move_backend("talon")
+
+    try:
+        backend = factory()
+    except Exception as e:
+        if name == "talon":
+            raise
+        print(f"Failed to create mouse move api '{name}': {e}. Using 'talon' instead.")
+        # remember the fallback so we don't retry every frame
+        backend = get_mouse_move_backend("talon")
+
+    _backends[name] = backend
+    return backend
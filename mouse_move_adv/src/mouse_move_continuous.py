@@ -0,0 +1,216 @@
+"""
+Velocity model for continuous mouse movement.
+
+Speed is in pixels per 16ms tick, the same unit as
+`user.mouse_move_continuous_speed_default`, but movement is integrated
+against real elapsed time so the pixels per second don't depend on
+how often cron actually ticks.
+
+Ramp up = velocity goes from current to target speed over ramp_ms
+following an easing curve.
+Deceleration = on stop, velocity decays exponentially with a time
+constant of deceleration_ms until it is negligible.
+"""
+from array import array
+from typing import Union
+from .mouse_move_backends import StubMouseMoveBackend
+from .mouse_move_easing import EasingTable, get_easing
+import math
+import random
+
+TICK_MS = 16
+# below this speed (px per tick) a deceleration is considered finished
+MIN_SPEED = 0.05
+
+def speed_to_px_per_s(speed: Union[int, float]) -> float:
+    return speed * 1000 / TICK_MS
+
+def integrate_curve(curve: EasingTable) -> array:
+    """Cumulative integral of the curve table, using the trapezoid rule."""
+    integral = getattr(curve, "integral", None)
+    if integral:
+        return integral
+    values = curve.values
+    step = 1 / curve.last_index
+    integral = array("d", [0.0])
+    for i in range(1, len(values)):
+        integral.append(integral[i - 1] + (values[i - 1] + values[i]) * step / 2)
+    # cached on the table, computed once per curve
+    curve.integral = integral
+    return integral
+
+class ContinuousVelocity:
+    """
+    Frame rate independent velocity for continuous movement.
+    ```
+    velocity = ContinuousVelocity(ramp_ms=200, deceleration_ms=100)
+    velocity.start(5, now)
+    distance = velocity.advance(now) # px since last advance
+    velocity.stop(now)
+    velocity.done # True once deceleration is finished
+    ```
+    """
+    def __init__(
+            self,
+            ramp_ms: int = 0,
+            ramp_easing: str = "linear",
+            max_speed: Union[int, float] = 0,
+            deceleration_ms: int = 0):
+        self.ramp_s = ramp_ms / 1000
+        self.curve = get_easing(ramp_easing)
+        self.curve_integral = integrate_curve(self.curve)
+        self.max_speed = max_speed
+        self.deceleration_s = deceleration_ms / 1000
+        self.requested_speed = 0
+        self.target_speed = 0
+        self.decelerating = False
+        self.done = False
+        self.segment_ts = 0.0
+        self.segment_offset = 0.0
+        self.v_from = 0.0
+        self.v_to = 0.0
+        self.last_ts = 0.0
+        self.last_distance = 0.0
+
+    def curve_area(self, progress: float) -> float:
+        """Area under the ramp curve from 0 to progress (0-1)."""
+        if progress >= 1:
+            return self.curve_integral[-1]
+        pos = progress * self.curve.last_index
+        i = int(pos)
+        frac = pos - i
+        a = self.curve.values[i]
+        b = a + (self.curve.values[i + 1] - a) * frac
+        return self.curve_integral[i] + (a + b) * frac / self.curve.last_index / 2
+
+    def segment_velocity(self, elapsed: float) -> float:
+        if self.decelerating:
+            if not self.deceleration_s:
+                return 0.0
+            return self.v_from * math.exp(-elapsed / self.deceleration_s)
+        if not self.ramp_s or elapsed >= self.ramp_s:
+            return self.v_to
+        return self.v_from + (self.v_to - self.v_from) * self.curve(elapsed / self.ramp_s)
+
+    def segment_distance(self, elapsed: float) -> float:
+        """Distance in px travelled since the start of the current segment."""
+        if elapsed <= 0:
+            return 0.0
+        if self.decelerating:
+            if not self.deceleration_s:
+                return 0.0
+            return self.v_from * self.deceleration_s * (1 - math.exp(-elapsed / self.deceleration_s))
+        if not self.ramp_s:
+            return self.v_to * elapsed
+        ramp_elapsed = min(elapsed, self.ramp_s)
+        distance = self.v_from * ramp_elapsed + (self.v_to - self.v_from) * self.ramp_s * self.curve_area(ramp_elapsed / self.ramp_s)
+        if elapsed > self.ramp_s:
+            distance += self.v_to * (elapsed - self.ramp_s)
+        return distance
+
+    def distance_at(self, ts: float) -> float:
+        return self.segment_offset + self.segment_distance(ts - self.segment_ts)
+
+    def velocity_at(self, ts: float) -> float:
+        """Velocity in px per second."""
+        return self.segment_velocity(ts - self.segment_ts)
+
+    def start(self, speed: Union[int, float], ts: float, initial_speed: Union[int, float] = 0):
+        """Start moving, ramping from initial_speed up to speed."""
+        self.segment_ts = ts
+        self.segment_offset = 0.0
+        self.last_ts = ts
+        self.last_distance = 0.0
+        self.decelerating = False
+        self.done = False
+        self.v_from = self.v_to = speed_to_px_per_s(initial_speed)
+        self.set_speed(speed, ts)
+
+    def set_speed(self, speed: Union[int, float], ts: float):
+        """Change the target speed, ramping from the current velocity."""
+        self.requested_speed = speed
+        if self.max_speed:
+            speed = min(speed, self.max_speed)
+        self.target_speed = speed
+        self.segment_offset = self.distance_at(ts)
+        self.v_from = self.velocity_at(ts)
+        self.v_to = speed_to_px_per_s(speed)
+        self.segment_ts = ts
+        self.decelerating = False
+        self.done = False
+
+    def stop(self, ts: float):
+        """Start decelerating. Finished immediately if deceleration_ms is 0."""
+        if self.decelerating:
+            return
+        self.segment_offset = self.distance_at(ts)
+        self.v_from = self.velocity_at(ts)
+        self.segment_ts = ts
+        self.decelerating = True
+        if not self.deceleration_s:
+            self.done = True
+
+    def advance(self, ts: float) -> float:
+        """Distance in px travelled since the last advance."""
+        if ts <= self.last_ts:
+            return 0.0
+        distance = self.distance_at(ts)
+        delta = distance - self.last_distance
+        self.last_ts = ts
+        self.last_distance = distance
+        if self.decelerating and self.velocity_at(ts) < speed_to_px_per_s(MIN_SPEED):
+            self.done = True
+        return delta
+
+def benchmark_continuous_accuracy(
+        speed: Union[int, float] = 5,
+        duration_ms: int = 2000,
+        tick_rates_ms: tuple = (4, 8, 16, 33, 50),
+        jitter: float = 0.25,
+        ramp_ms: int = 0,
+        seed: int = 0) -> list[dict]:
+    """
+    Simulate continuous movement at different tick rates with a fake clock
+    and compare achieved pixels per second to the expected pixels per second.
+    `jitter` randomly varies each tick interval by up to that fraction, like
+    a busy cron would. "legacy" is the old fixed distance per tick model.
+    """
+    rng = random.Random(seed)
+    rows = []
+    for tick_ms in tick_rates_ms:
+        backend = StubMouseMoveBackend()
+        velocity = ContinuousVelocity(ramp_ms=ramp_ms)
+        legacy_px = 0
+        ts = 0.0
+        end_ts = duration_ms / 1000
+        velocity.start(speed, ts)
+        ticks = 0
+        while True:
+            interval = tick_ms / 1000 * (1 + rng.uniform(-jitter, jitter))
+            if ts + interval > end_ts:
+                break
+            ts += interval
+            ticks += 1
+            backend.move(velocity.advance(ts), 0)
+            backend.flush()
+            legacy_px += speed
+        # analytic distance, including the slower start during a ramp
+        ideal = velocity.distance_at(ts)
+        rows.append({
+            "tick_ms": tick_ms,
+            "ticks": ticks,
+            "expected_px_per_s": ideal / ts if ts else 0,
+            "achieved_px_per_s": backend.x / ts if ts else 0,
+            "error_px": backend.x - ideal,
+            "legacy_px_per_s": legacy_px / ts if ts else 0,
+        })
+    return rows
+
+def benchmark_continuous_report(rows: list[dict]) -> str:
+    lines = [f"{'tick ms':>8} {'ticks':>6} {'expected px/s':>14} {'achieved px/s':>14} {'error px':>9} {'legacy px/s':>12}"]
+    for row in rows:
+        lines.append(
+            f"{row['tick_ms']:>8} {row['ticks']:>6} {row['expected_px_per_s']:>14.1f} "
+            f"{row['achieved_px_per_s']:>14.1f} {row['error_px']:>9.2f} {row['legacy_px_per_s']:>12.1f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,164 @@
+"""
+Easing curves precomputed into fixed resolution lookup tables.
+
+Each curve is sampled once into an array and evaluated per tick with
+a single table lookup plus linear interpolation, instead of calling
+math.sin/math.cos every frame.
+"""
+from array import array
+from typing import Callable, Sequence, Union
+import bisect
+import math
+
+EASING_TABLE_RESOLUTION = 256
+
+class EasingTable:
+    """
+    Lookup table for an easing curve from progress 0-1.
+    ```
+    table = EasingTable(lambda x: x * x)
+    table(0.5) # 0.25
+    ```
+    """
+    def __init__(self, fn: Callable[[float], float] = None, resolution: int = EASING_TABLE_RESOLUTION, values: Sequence[float] = None):
+        if values is not None:
+            self.values = array("d", values)
+        else:
+            self.values = array("d", (fn(i / resolution) for i in range(resolution + 1)))
+        self.last_index = len(self.values) - 1
+
+    def __call__(self, x: float) -> float:
+        if x <= 0:
+            return self.values[0]
+        if x >= 1:
+            return self.values[self.last_index]
+        pos = x * self.last_index
+        i = int(pos)
+        a = self.values[i]
+        return a + (self.values[i + 1] - a) * (pos - i)
+
+class InstantEasing(EasingTable):
+    """Stays at 0 until the end, then jumps to 1. Not interpolated."""
+    def __init__(self):
+        super().__init__(values=[0, 1])
+
+    def __call__(self, x: float) -> float:
+        return 1.0 if x >= 1 else 0.0
+
+def cubic_bezier(x1: float, y1: float, x2: float, y2: float) -> Callable[[float], float]:
+    """
+    CSS style cubic-bezier with fixed end points (0, 0) and (1, 1).
+    Solves x(t) = x for t with newton iterations, falling back to bisection.
+    """
+    def bezier(t, p1, p2):
+        return 3 * (1 - t) ** 2 * t * p1 + 3 * (1 - t) * t ** 2 * p2 + t ** 3
+
+    def bezier_derivative(t, p1, p2):
+        return 3 * (1 - t) ** 2 * p1 + 6 * (1 - t) * t * (p2 - p1) + 3 * t ** 2 * (1 - p2)
+
+    def solve_t(x):
+        t = x
+        for _ in range(8):
+            error = bezier(t, x1, x2) - x
+            if abs(error) < 1e-7:
+                return t
+            derivative = bezier_derivative(t, x1, x2)
+            if abs(derivative) < 1e-6:
+                break
+            t -= error / derivative
+        low, high = 0.0, 1.0
+        t = x
+        for _ in range(30):
+            if bezier(t, x1, x2) < x:
+                low = t
+            else:
+                high = t
+            t = (low + high) / 2
+        return t
+
+    return lambda x: bezier(solve_t(x), y1, y2)
+
+def spring(damping: float = 0.5, frequency: float = 3) -> Callable[[float], float]:
+    """Damped spring that overshoots the target and settles at 1."""
+    omega = 2 * math.pi * frequency
+    decay = damping * omega
+    # scale so the curve lands exactly on 1 at x = 1
+    end_error = math.exp(-decay) * math.cos(omega)
+
+    def fn(x):
+        if x >= 1:
+            return 1.0
+        value = 1 - math.exp(-decay * x) * math.cos(omega * x)
+        return value + end_error * x
+
+    return fn
+
+def sampled_points(points: Sequence[Union[float, Sequence[float]]]) -> Callable[[float], float]:
+    """
+    Curve from sampled points. Either evenly spaced y values
+    e.g. [0, 0.1, 0.5, 1], or (x, y) pairs sorted by x.
+    """
+    if not points:
+        raise ValueError("Easing curve needs at least one point")
+    if not isinstance(points[0], (tuple, list)):
+        if len(points) == 1:
+            return lambda x: points[0]
+        points = [(i / (len(points) - 1), y) for i, y in enumerate(points)]
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+
+    def fn(x):
+        i = bisect.bisect_right(xs, x)
+        if i <= 0:
+            return ys[0]
+        if i >= len(xs):
+            return ys[-1]
+        x0, x1 = xs[i - 1], xs[i]
+        if x1 == x0:
+            return ys[i]
+        return ys[i - 1] + (ys[i] - ys[i - 1]) * (x - x0) / (x1 - x0)
+
+    return fn
+
+easing_types: dict[str, EasingTable] = {}
+
+def easing_register(name: str, fn: Callable[[float], float], resolution: int = EASING_TABLE_RESOLUTION):
+    """Register an easing function, precomputed into a lookup table."""
+    easing_types[name] = EasingTable(fn, resolution)
+
+def easing_register_points(name: str, points: Sequence[Union[float, Sequence[float]]], resolution: int = EASING_TABLE_RESOLUTION):
+    """
+    Register an easing curve from sampled points.
+    ```
+    easing_register_points("fast_start", [0, 0.6, 0.8, 0.9, 1])
+    easing_register_points("stepped", [(0, 0), (0.5, 0.2), (1, 1)])
+    ```
+    """
+    easing_register(name, sampled_points(points), resolution)
+
+def easing_register_bezier(name: str, x1: float, y1: float, x2: float, y2: float, resolution: int = EASING_TABLE_RESOLUTION):
+    """Register a CSS style cubic-bezier easing curve."""
+    easing_register(name, cubic_bezier(x1, y1, x2, y2), resolution)
+
+def get_easing(name: str) -> EasingTable:
+    if name not in easing_types:
+        valid_names = ", ".join(easing_types)
+        raise ValueError(f"Invalid easing type: {name}. Valid easing types are: {valid_names}")
+    return easing_types[name]
+
+easing_register("linear", lambda x: x, resolution=1)
+easing_register("ease_in", lambda x: 1 - math.cos(x * math.pi / 2))
+easing_register("ease_out", lambda x: math.sin(x * math.pi / 2))
+easing_register("ease_in_out", lambda x: -(math.cos(math.pi * x) - 1) / 2)
+easing_register("ease_in_cubic", lambda x: x ** 3)
+easing_register("ease_out_cubic", lambda x: 1 - (1 - x) ** 3)
+easing_register("ease_in_out_cubic", lambda x: 4 * x ** 3 if x < 0.5 else 1 - (-2 * x + 2) ** 3 / 2)
+easing_register("ease_in_quintic", lambda x: x ** 5)
+easing_register("ease_out_quintic", lambda x: 1 - (1 - x) ** 5)
+easing_register("ease_in_out_quintic", lambda x: 16 * x ** 5 if x < 0.5 else 1 - (-2 * x + 2) ** 5 / 2)
+easing_register_bezier("bezier_ease", 0.25, 0.1, 0.25, 1.0)
+easing_register_bezier("bezier_ease_in", 0.42, 0, 1.0, 1.0)
+easing_register_bezier("bezier_ease_out", 0, 0, 0.58, 1.0)
+easing_register_bezier("bezier_ease_in_out", 0.42, 0, 0.58, 1.0)
+easing_register("spring", spring())
+easing_types["instant"] = InstantEasing()
@@ -0,0 +1,96 @@
+"""
+Mouse move events
+
+Event objects are reused for the whole movement instead of allocating
+one per tick. If you need to keep the values of an event, copy them.
+
+Subscribers register for specific event types, and tick events can be
+sampled at a lower rate e.g. 10 Hz for a UI indicator. Dispatch is
+skipped entirely when nobody is subscribed to a type.
+"""
+from typing import Callable, Literal, Sequence
+import time
+
+MouseMoveEventTypes = Literal["start", "tick", "stop"]
+MOUSE_MOVE_EVENT_TYPES = ("start", "tick", "stop")
+
+class MouseMoveCallbackEvent:
+    """dx, dy = offset since the start of the movement"""
+    __slots__ = ("dx", "dy", "type")
+
+    def __init__(self, dx: float = 0, dy: float = 0, type: MouseMoveEventTypes = "start"):
+        self.dx = dx
+        self.dy = dy
+        self.type = type
+
+    def set(self, dx: float, dy: float, type: MouseMoveEventTypes) -> "MouseMoveCallbackEvent":
+        self.dx = dx
+        self.dy = dy
+        self.type = type
+        return self
+
+    def __repr__(self):
+        return f"MouseMoveCallbackEvent(dx={self.dx}, dy={self.dy}, type={self.type!r})"
+
+class MouseMoveEventSubscriber:
+    __slots__ = ("on_event", "interval", "last_ts")
+
+    def __init__(self, on_event: Callable[[MouseMoveCallbackEvent], None], hz: float = 0):
+        self.on_event = on_event
+        self.interval = 1 / hz if hz else 0
+        self.last_ts = 0.0
+
+class MouseMoveEvents:
+    """
+    Subscribers per event type.
+    ```
+    events = MouseMoveEvents()
+    events.register(on_event) # start and stop
+    events.register(on_tick, ["tick"], hz=10) # at most 10 ticks per second
+    if events.has_subscribers("tick"):
+        events.trigger(event.set(dx, dy, "tick"))
+    ```
+    """
+    def __init__(self):
+        self.subscribers: dict[str, list[MouseMoveEventSubscriber]] = {
+            event_type: [] for event_type in MOUSE_MOVE_EVENT_TYPES
+        }
+
+    def register(
+            self,
+            on_event: Callable[[MouseMoveCallbackEvent], None],
+            event_types: Sequence[MouseMoveEventTypes] = ("start", "stop"),
+            hz: float = 0):
+        for event_type in event_types:
+            if event_type not in self.subscribers:
+                valid_names = ", ".join(MOUSE_MOVE_EVENT_TYPES)
+                raise ValueError(f"Invalid event type: {event_type}. Valid event types are: {valid_names}")
+            # replace instead of append, so a trigger in progress isn't affected
+            self.subscribers[event_type] = [
+                *self.subscribers[event_type],
+                MouseMoveEventSubscriber(on_event, hz if event_type == "tick" else 0),
+            ]
+
+    def unregister(self, on_event: Callable[[MouseMoveCallbackEvent], None]):
+        for event_type, subscribers in self.subscribers.items():
+            self.subscribers[event_type] = [s for s in subscribers if s.on_event != on_event]
+
+    def clear(self):
+        for event_type in self.subscribers:
+            self.subscribers[event_type] = []
+
+    def has_subscribers(self, event_type: MouseMoveEventTypes) -> bool:
+        return bool(self.subscribers[event_type])
+
+    def trigger(self, event: MouseMoveCallbackEvent):
+        subscribers = self.subscribers[event.type]
+        if not subscribers:
+            return
+        ts = None
+        for subscriber in subscribers:
+            if subscriber.interval:
+                ts = ts or time.perf_counter()
+                if ts - subscriber.last_ts < subscriber.interval:
+                    continue
+                subscriber.last_ts = ts
+            subscriber.on_event(event)
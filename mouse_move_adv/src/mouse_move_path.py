@@ -0,0 +1,155 @@
+"""
+Paths for mouse movement through multiple waypoints.
+
+A path is sampled once into points and parameterized by arc length,
+so that moving through it by distance gives a uniform speed along the
+whole path regardless of how far apart the waypoints are.
+
+polyline    = straight lines between waypoints
+catmull_rom = smooth curve passing through every waypoint
+bezier      = waypoints are control points. Chains of cubic segments
+              when there are 3n + 1 points, otherwise a single curve
+"""
+from array import array
+from typing import Callable, Literal, Sequence
+import bisect
+import math
+
+PATH_SAMPLES_PER_SEGMENT = 16
+
+PathTypes = Literal["polyline", "catmull_rom", "bezier"]
+Point = Sequence[float]
+
+def polyline_points(points: Sequence[Point], samples_per_segment: int = PATH_SAMPLES_PER_SEGMENT) -> list[tuple[float, float]]:
+    """Straight lines don't need extra samples."""
+    return [(p[0], p[1]) for p in points]
+
+def catmull_rom_points(points: Sequence[Point], samples_per_segment: int = PATH_SAMPLES_PER_SEGMENT) -> list[tuple[float, float]]:
+    """Uniform Catmull-Rom spline through every point."""
+    if len(points) < 3:
+        return polyline_points(points)
+    # repeat the end points so the curve reaches them
+    padded = [points[0], *points, points[-1]]
+    result = [(points[0][0], points[0][1])]
+    for i in range(1, len(padded) - 2):
+        p0, p1, p2, p3 = padded[i - 1], padded[i], padded[i + 1], padded[i + 2]
+        for step in range(1, samples_per_segment + 1):
+            t = step / samples_per_segment
+            t2 = t * t
+            t3 = t2 * t
+            result.append(tuple(
+                0.5 * (
+                    2 * p1[axis]
+                    + (p2[axis] - p0[axis]) * t
+                    + (2 * p0[axis] - 5 * p1[axis] + 4 * p2[axis] - p3[axis]) * t2
+                    + (3 * p1[axis] - p0[axis] - 3 * p2[axis] + p3[axis]) * t3
+                )
+                for axis in (0, 1)
+            ))
+    return result
+
+def de_casteljau(points: Sequence[Point], t: float) -> tuple[float, float]:
+    current = [(p[0], p[1]) for p in points]
+    while len(current) > 1:
+        current = [
+            (a[0] + (b[0] - a[0]) * t, a[1] + (b[1] - a[1]) * t)
+            for a, b in zip(current, current[1:])
+        ]
+    return current[0]
+
+def bezier_points(points: Sequence[Point], samples_per_segment: int = PATH_SAMPLES_PER_SEGMENT) -> list[tuple[float, float]]:
+    """
+    Cubic bezier chain if there are 3n + 1 points e.g.
+    [start, control_1, control_2, end, control_1, control_2, end],
+    otherwise one bezier curve using all points as control points.
+    """
+    if len(points) < 3:
+        return polyline_points(points)
+    if len(points) > 4 and (len(points) - 1) % 3 == 0:
+        segments = [points[i:i + 4] for i in range(0, len(points) - 1, 3)]
+    else:
+        segments = [points]
+    result = [(points[0][0], points[0][1])]
+    for segment in segments:
+        samples = samples_per_segment * (len(segment) - 1)
+        for step in range(1, samples + 1):
+            result.append(de_casteljau(segment, step / samples))
+    return result
+
+path_types: dict[str, Callable[[Sequence[Point], int], list[tuple[float, float]]]] = {
+    "polyline": polyline_points,
+    "catmull_rom": catmull_rom_points,
+    "bezier": bezier_points,
+}
+
+class MousePath:
+    """
+    Path sampled once and parameterized by arc length.
+    ```
+    path = MousePath([(0, 0), (100, 0), (100, 100)], "catmull_rom")
+    path.length
+    path.point_at(50) # point 50px along the path
+    path.point_at_progress(0.5) # point halfway along the path
+    ```
+    """
+    def __init__(self, points: Sequence[Point], path_type: PathTypes = "polyline", samples_per_segment: int = PATH_SAMPLES_PER_SEGMENT):
+        if not points:
+            raise ValueError("Path needs at least one point")
+        if path_type not in path_types:
+            valid_names = ", ".join(path_types)
+            raise ValueError(f"Invalid path type: {path_type}. Valid path types are: {valid_names}")
+        sampled = path_types[path_type](points, samples_per_segment)
+        self.xs = array("d")
+        self.ys = array("d")
+        self.distances = array("d")
+        total = 0.0
+        for x, y in sampled:
+            if self.xs:
+                step = math.hypot(x - self.xs[-1], y - self.ys[-1])
+                if not step:
+                    continue
+                total += step
+            self.xs.append(x)
+            self.ys.append(y)
+            self.distances.append(total)
+        self.length = total
+
+    @property
+    def start(self) -> tuple[float, float]:
+        return self.xs[0], self.ys[0]
+
+    @property
+    def end(self) -> tuple[float, float]:
+        return self.xs[-1], self.ys[-1]
+
+    def point_at(self, distance: float) -> tuple[float, float]:
+        """Point at a distance in px along the path."""
+        if distance <= 0:
+            return self.start
+        if distance >= self.length:
+            return self.end
+        i = bisect.bisect_right(self.distances, distance)
+        d0 = self.distances[i - 1]
+        frac = (distance - d0) / (self.distances[i] - d0)
+        return (
+            self.xs[i - 1] + (self.xs[i] - self.xs[i - 1]) * frac,
+            self.ys[i - 1] + (self.ys[i] - self.ys[i - 1]) * frac,
+        )
+
+    def point_at_progress(self, progress: float) -> tuple[float, float]:
+        """Point at a progress from 0-1 along the path."""
+        return self.point_at(progress * self.length)
+
+    def deltas(self, steps: int, easing: Callable[[float], float] = None):
+        """
+        Per frame deltas for moving through the path in `steps` frames,
+        optionally eased. Deltas add up to end - start.
+        """
+        last_x, last_y = self.start
+        for step in range(1, steps + 1):
+            progress = step / steps
+            if easing:
+                progress = easing(progress)
+            x, y = self.point_at_progress(progress)
+            yield x - last_x, y - last_y
+            last_x, last_y = x, y
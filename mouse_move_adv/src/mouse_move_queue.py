@@ -0,0 +1,128 @@
+"""
+Motion queue for chaining mouse movements.
+
+Items are either an opaque callable, run when the previous movement
+stops, or a delta motion. Delta motions are stepped by the running
+movement itself, so chained moves continue in the same frame loop
+without stopping and restarting, and can blend the tail of one motion
+into the start of the next with blend_ms. A delta motion with a path
+follows the path instead of a straight line, and ends at path.end.
+"""
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Literal, Union
+from .mouse_move_continuous import TICK_MS
+from .mouse_move_easing import get_easing
+from .mouse_move_events import MouseMoveCallbackEvent
+from .mouse_move_path import MousePath
+import itertools
+
+_motion_ids = itertools.count(1)
+
+def next_motion_id() -> int:
+    return next(_motion_ids)
+
+@dataclass
+class MotionItem:
+    kind: Literal["callable", "delta"]
+    fn: Callable[[], None] = None
+    dx: Union[int, float] = 0
+    dy: Union[int, float] = 0
+    duration_ms: int = 0
+    easing_type: str = "ease_in_out"
+    blend_ms: int = 0
+    callback_tick: Callable = None
+    callback_stop: Callable[[], None] = None
+    mouse_api_type: str = None
+    path: MousePath = None
+    id: int = field(default_factory=next_motion_id)
+
+    @property
+    def blend_steps(self) -> int:
+        return self.blend_ms // TICK_MS
+
+    @property
+    def start_direction(self) -> tuple[float, float]:
+        """Direction the motion starts in."""
+        return self.path.point_at(1) if self.path else (self.dx, self.dy)
+
+class MotionTrack:
+    """
+    Progress of a delta motion, stepped once per frame.
+    ```
+    track = MotionTrack(MotionItem("delta", dx=100, dy=0, duration_ms=160))
+    while not track.done:
+        dx, dy = track.step()
+    ```
+    """
+    def __init__(self, item: MotionItem):
+        self.item = item
+        self.steps = max(1, item.duration_ms // TICK_MS)
+        self.step_count = 0
+        self.curve = get_easing(item.easing_type)
+        self.x = 0.0
+        self.y = 0.0
+        # reused for every event of this motion
+        self.event = MouseMoveCallbackEvent()
+
+    @property
+    def remaining_steps(self) -> int:
+        return self.steps - self.step_count
+
+    @property
+    def done(self) -> bool:
+        return self.step_count >= self.steps
+
+    def step(self) -> tuple[float, float]:
+        """Advance one frame and return the delta for it."""
+        self.step_count += 1
+        progress = self.curve(self.step_count / self.steps)
+        if self.item.path:
+            x, y = self.item.path.point_at_progress(progress)
+        else:
+            x = self.item.dx * progress
+            y = self.item.dy * progress
+        delta = (x - self.x, y - self.y)
+        self.x, self.y = x, y
+        return delta
+
+class MotionQueue:
+    """
+    FIFO of motion items with cancel by id and lookahead.
+    ```
+    queue = MotionQueue()
+    motion_id = queue.push(MotionItem("callable", fn=fn))
+    queue.peek() # next item without removing it
+    queue.cancel(motion_id)
+    ```
+    """
+    def __init__(self):
+        self.items: deque[MotionItem] = deque()
+
+    def __len__(self):
+        return len(self.items)
+
+    def push(self, item: MotionItem) -> int:
+        self.items.append(item)
+        return item.id
+
+    def pop(self) -> Union[MotionItem, None]:
+        return self.items.popleft() if self.items else None
+
+    def peek(self) -> Union[MotionItem, None]:
+        return self.items[0] if self.items else None
+
+    def lookahead(self, count: int = 1) -> list[MotionItem]:
+        """Up to count items from the front of the queue, without removing them."""
+        return list(itertools.islice(self.items, count))
+
+    def cancel(self, motion_id: int) -> bool:
+        """Remove a queued item by id. Returns False if it already ran or never existed."""
+        for item in self.items:
+            if item.id == motion_id:
+                self.items.remove(item)
+                return True
+        return False
+
+    def clear(self):
+        self.items.clear()
@@ -0,0 +1,181 @@
+"""
+Sub-pixel error carry for APIs that only accept ints.
+
+SubpixelAdjuster handles one (dx, dy) per frame. SubpixelBatch handles
+whole arrays of deltas for many independent pointers at once with
+NumPy, for precomputed paths, replay and offline simulation, and gives
+the same ints as the scalar version. Without NumPy it falls back to
+the scalar loop.
+"""
+from typing import Sequence, Union
+import math
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SUBPIXEL_BATCH_CHUNK = 4096
+# float error of the chunked cumulative sum is far below this. Decisions
+# closer than this to the 0.5 rounding boundary are replayed with the
+# scalar loop, so float summation order can't change the result.
+SUBPIXEL_BATCH_TOLERANCE = 1e-7
+
+class SubpixelAdjuster:
+    """
+    Some apis require ints, but that will throw off our calculations
+    over time. This class helps us keep track of the fractional part
+    of the delta so we can keep track of the accumulated error and
+    adjust the int part accordingly.
+    """
+    def __init__(self):
+        self.dx_frac = 0.0
+        self.dy_frac = 0.0
+
+    def update_pos(self, dx: Union[int, float], dy: Union[int, float]):
+        dx_int = int(dx)
+        dy_int = int(dy)
+
+        self.dx_frac += dx - dx_int
+        self.dy_frac += dy - dy_int
+
+        if abs(self.dx_frac) >= 0.5:
+            dx_int += int(math.copysign(1, self.dx_frac))
+            self.dx_frac -= int(math.copysign(1, self.dx_frac))
+
+        if abs(self.dy_frac) >= 0.5:
+            dy_int += int(math.copysign(1, self.dy_frac))
+            self.dy_frac -= int(math.copysign(1, self.dy_frac))
+
+        return dx_int, dy_int
+
+    def update_batch(self, deltas):
+        """
+        update_pos for a whole sequence of (dx, dy) at once.
+        Returns (steps, 2) ints and keeps the carry for the next call.
+        """
+        batch = SubpixelBatch(1)
+        batch.frac = [self.dx_frac, self.dy_frac]
+        if np is None:
+            ints = [step[0] for step in batch.update([[delta] for delta in deltas])]
+        else:
+            ints = batch.update(deltas).reshape(-1, 2)
+        self.dx_frac, self.dy_frac = batch.frac
+        return ints
+
+    def reset(self):
+        self.dx_frac = 0.0
+        self.dy_frac = 0.0
+
+def subpixel_update(frac: float, delta: Union[int, float]) -> tuple[int, float]:
+    """Same as one axis of SubpixelAdjuster.update_pos. Returns (int delta, new frac)."""
+    delta_int = int(delta)
+    frac += delta - delta_int
+    if abs(frac) >= 0.5:
+        delta_int += int(math.copysign(1, frac))
+        frac -= int(math.copysign(1, frac))
+    return delta_int, frac
+
+class SubpixelBatch:
+    """
+    Sub-pixel carry for a batch of steps and independent pointers,
+    e.g. the mouse plus two virtual sticks.
+    ```
+    batch = SubpixelBatch(pointers=3)
+    ints = batch.update(deltas) # deltas shape (steps, 3, 2) -> ints same shape
+    ```
+    The carry is kept between calls, like calling SubpixelAdjuster.update_pos
+    once per step for each pointer.
+    """
+    def __init__(self, pointers: int = 1):
+        self.pointers = pointers
+        self.frac = [0.0] * (pointers * 2)
+
+    def reset(self):
+        self.frac = [0.0] * (self.pointers * 2)
+
+    def update(self, deltas):
+        """
+        deltas = (steps, pointers, 2) array or nested sequence of dx, dy.
+        Returns ints in the same shape, as a NumPy array if available.
+        """
+        if np is None:
+            return self.update_scalar(deltas)
+        values = np.asarray(deltas, dtype=np.float64).reshape(-1, self.pointers * 2)
+        result = np.empty(values.shape, dtype=np.int64)
+        for start in range(0, len(values), SUBPIXEL_BATCH_CHUNK):
+            chunk = values[start:start + SUBPIXEL_BATCH_CHUNK]
+            result[start:start + len(chunk)] = self.update_chunk(chunk)
+        return result.reshape(-1, self.pointers, 2)
+
+    def update_chunk(self, chunk):
+        truncated = np.trunc(chunk)
+        # carry relative to the last whole pixel, so the cumulative sum stays small
+        cumulative = np.cumsum(chunk - truncated, axis=0) + np.asarray(self.frac)
+        corrections = np.rint(cumulative)
+        previous = np.vstack([np.zeros((1, chunk.shape[1])), corrections[:-1]])
+        before_correction = cumulative - previous
+        step = corrections - previous
+        margin = np.abs(np.abs(before_correction) - 0.5)
+        # ties and near ties depend on the order of float additions,
+        # and a step must match the scalar rule of abs(frac) >= 0.5
+        ambiguous = (margin <= SUBPIXEL_BATCH_TOLERANCE) | ((step != 0) != (np.abs(before_correction) >= 0.5))
+        ints = (truncated + step).astype(np.int64)
+        for column in np.flatnonzero(ambiguous.any(axis=0)):
+            frac = self.frac[column]
+            for i, delta in enumerate(chunk[:, column].tolist()):
+                ints[i, column], frac = subpixel_update(frac, delta)
+            self.frac[column] = frac
+        for column in np.flatnonzero(~ambiguous.any(axis=0)):
+            self.frac[column] = float(cumulative[-1, column] - corrections[-1, column])
+        return ints
+
+    def update_scalar(self, deltas: Sequence[Sequence[Sequence[float]]]) -> list:
+        result = []
+        for step in deltas:
+            step_ints = []
+            for pointer, (dx, dy) in enumerate(step):
+                dx_int, self.frac[pointer * 2] = subpixel_update(self.frac[pointer * 2], dx)
+                dy_int, self.frac[pointer * 2 + 1] = subpixel_update(self.frac[pointer * 2 + 1], dy)
+                step_ints.append((dx_int, dy_int))
+            result.append(step_ints)
+        return result
+
+def subpixel_batch_benchmark(steps: int = 1_000_000, pointers: int = 3, seed: int = 0) -> dict:
+    """
+    Compare steps per second of the scalar SubpixelAdjuster and
+    SubpixelBatch on random deltas, and check they give the same ints.
+    """
+    import random
+    import time
+    rng = random.Random(seed)
+    deltas = [[(rng.uniform(-20, 20), rng.uniform(-20, 20)) for _ in range(pointers)] for _ in range(steps)]
+    # exact halves and repeating fractions hit the rounding boundary
+    for i in range(0, steps, 7):
+        deltas[i][0] = (0.5, 0.1)
+
+    adjusters = [SubpixelAdjuster() for _ in range(pointers)]
+    start = time.perf_counter()
+    scalar = [[adjusters[p].update_pos(dx, dy) for p, (dx, dy) in enumerate(step)] for step in deltas]
+    scalar_s = time.perf_counter() - start
+
+    batch = SubpixelBatch(pointers)
+    start = time.perf_counter()
+    batched = batch.update(deltas)
+    batch_s = time.perf_counter() - start
+
+    batched = batched.tolist() if np is not None else batched
+    mismatches = sum(
+        1
+        for step_scalar, step_batched in zip(scalar, batched)
+        for a, b in zip(step_scalar, step_batched)
+        if tuple(a) != tuple(b)
+    )
+    return {
+        "steps": steps,
+        "pointers": pointers,
+        "numpy": np is not None,
+        "scalar_steps_per_s": steps * pointers / scalar_s if scalar_s else 0,
+        "batch_steps_per_s": steps * pointers / batch_s if batch_s else 0,
+        "mismatches": mismatches,
+    }
@@ -0,0 +1,199 @@
+"""
+Mouse move trace recorder and offline analyzer
+
+The recorder logs every flushed frame into preallocated arrays, so
+recording doesn't allocate during a movement:
+ts = perf_counter, motion id, requested fractional delta, emitted int delta
+A frame where motions blend is recorded once per motion, with the
+deltas and carry of that motion only.
+
+The analyzer then computes per motion:
+duration error, pixel error, frame time jitter, velocity profile, and
+the max sub-pixel carry. SubpixelAdjuster keeps the carry within 0.5px,
+so anything above that is a rounding regression.
+"""
+from array import array
+from dataclasses import dataclass
+from typing import Union
+from .mouse_move_continuous import TICK_MS
+import math
+import statistics
+
+TRACE_CAPACITY = 100_000
+SUBPIXEL_MAX_CARRY = 0.5
+
+@dataclass
+class TraceMotion:
+    motion_id: int
+    backend: str
+    start_ts: float
+    dx_total: float = None
+    dy_total: float = None
+    duration_ms: int = None
+    # range of trace indexes holding its frames, interleaved with others while blending
+    first_frame: int = None
+    end_frame: int = None
+
+class MouseMoveTrace:
+    """
+    Fixed size trace of flushed frames. Frames past capacity are counted
+    in `dropped` instead of growing the buffer.
+    ```
+    trace = MouseMoveTrace()
+    trace.begin_motion(1, "talon", ts, 100, 0, 200)
+    trace.record(ts, 1, 3.2, 0, 3, 0)
+    analyze_trace(trace)
+    ```
+    """
+    def __init__(self, capacity: int = TRACE_CAPACITY):
+        self.capacity = capacity
+        self.ts = array("d", bytes(8 * capacity))
+        self.motion_ids = array("q", bytes(8 * capacity))
+        self.requested_dx = array("d", bytes(8 * capacity))
+        self.requested_dy = array("d", bytes(8 * capacity))
+        self.dx = array("q", bytes(8 * capacity))
+        self.dy = array("q", bytes(8 * capacity))
+        self.count = 0
+        self.dropped = 0
+        self.motions: dict[int, TraceMotion] = {}
+
+    def begin_motion(
+            self,
+            motion_id: int,
+            backend: str,
+            ts: float,
+            dx_total: Union[int, float] = None,
+            dy_total: Union[int, float] = None,
+            duration_ms: int = None):
+        """Expected totals and duration are optional e.g. for continuous movement."""
+        self.motions[motion_id] = TraceMotion(motion_id, backend, ts, dx_total, dy_total, duration_ms)
+
+    def record(self, ts: float, motion_id: int, requested_dx: float, requested_dy: float, dx: int, dy: int):
+        i = self.count
+        if i >= self.capacity:
+            self.dropped += 1
+            return
+        self.ts[i] = ts
+        self.motion_ids[i] = motion_id
+        self.requested_dx[i] = requested_dx
+        self.requested_dy[i] = requested_dy
+        self.dx[i] = dx
+        self.dy[i] = dy
+        self.count = i + 1
+        motion = self.motions.get(motion_id)
+        if motion:
+            if motion.first_frame is None:
+                motion.first_frame = i
+            motion.end_frame = i + 1
+
+    def clear(self):
+        self.count = 0
+        self.dropped = 0
+        self.motions = {}
+
+    def frames(self, motion_id: int) -> list[int]:
+        """Indexes of the frames recorded for a motion."""
+        motion = self.motions.get(motion_id)
+        if not motion or motion.first_frame is None:
+            return []
+        motion_ids = self.motion_ids
+        return [i for i in range(motion.first_frame, motion.end_frame) if motion_ids[i] == motion_id]
+
+def analyze_motion(trace: MouseMoveTrace, motion: TraceMotion) -> dict:
+    frames = trace.frames(motion.motion_id)
+    if not frames:
+        return None
+    emitted_x = emitted_y = 0
+    requested_x = requested_y = 0.0
+    max_carry = 0.0
+    velocity_profile = []
+    intervals_ms = []
+    # the first frame is sent right away, so count it as one tick
+    last_ts = None
+    for i in frames:
+        requested_x += trace.requested_dx[i]
+        requested_y += trace.requested_dy[i]
+        emitted_x += trace.dx[i]
+        emitted_y += trace.dy[i]
+        max_carry = max(max_carry, abs(requested_x - emitted_x), abs(requested_y - emitted_y))
+        if last_ts is None:
+            interval = TICK_MS / 1000
+        else:
+            interval = trace.ts[i] - last_ts
+            intervals_ms.append(interval * 1000)
+        if interval > 0:
+            velocity_profile.append(math.hypot(trace.dx[i], trace.dy[i]) / interval)
+        last_ts = trace.ts[i]
+
+    expected_x = motion.dx_total if motion.dx_total is not None else requested_x
+    expected_y = motion.dy_total if motion.dy_total is not None else requested_y
+    actual_duration_ms = (trace.ts[frames[-1]] - motion.start_ts) * 1000 + TICK_MS
+    return {
+        "motion_id": motion.motion_id,
+        "backend": motion.backend,
+        "frames": len(frames),
+        "expected_duration_ms": motion.duration_ms,
+        "actual_duration_ms": actual_duration_ms,
+        "duration_error_ms": actual_duration_ms - motion.duration_ms if motion.duration_ms else None,
+        "pixel_error_x": emitted_x - expected_x,
+        "pixel_error_y": emitted_y - expected_y,
+        "pixel_error": math.hypot(emitted_x - expected_x, emitted_y - expected_y),
+        "max_subpixel_carry": max_carry,
+        "frame_ms_mean": statistics.fmean(intervals_ms) if intervals_ms else 0,
+        "frame_ms_jitter": statistics.pstdev(intervals_ms) if len(intervals_ms) > 1 else 0,
+        "frame_ms_max": max(intervals_ms, default=0),
+        "velocity_profile": velocity_profile,
+        "velocity_peak": max(velocity_profile, default=0),
+    }
+
+def analyze_trace(trace: MouseMoveTrace) -> list[dict]:
+    """One row per recorded motion, in the order they started."""
+    rows = []
+    for motion in trace.motions.values():
+        row = analyze_motion(trace, motion)
+        if row:
+            rows.append(row)
+    return rows
+
+def summarize_by_backend(rows: list[dict]) -> dict[str, dict]:
+    """Averages per backend, to compare e.g. talon and windows."""
+    summary = {}
+    for backend in dict.fromkeys(row["backend"] for row in rows):
+        backend_rows = [row for row in rows if row["backend"] == backend]
+        duration_errors = [abs(row["duration_error_ms"]) for row in backend_rows if row["duration_error_ms"] is not None]
+        summary[backend] = {
+            "motions": len(backend_rows),
+            "pixel_error_mean": statistics.fmean(row["pixel_error"] for row in backend_rows),
+            "duration_error_ms_mean": statistics.fmean(duration_errors) if duration_errors else 0,
+            "frame_ms_jitter_mean": statistics.fmean(row["frame_ms_jitter"] for row in backend_rows),
+            "frame_ms_max": max(row["frame_ms_max"] for row in backend_rows),
+        }
+    return summary
+
+def subpixel_regressions(rows: list[dict]) -> list[dict]:
+    """Motions where the rounding carry went past what SubpixelAdjuster allows."""
+    return [row for row in rows if row["max_subpixel_carry"] > SUBPIXEL_MAX_CARRY + 1e-9]
+
+def trace_report(trace: MouseMoveTrace) -> str:
+    rows = analyze_trace(trace)
+    lines = [f"{'id':>6} {'backend':>8} {'frames':>6} {'duration ms':>11} {'error ms':>8} {'error px':>8} {'carry':>6} {'jitter ms':>9} {'peak px/s':>9}"]
+    for row in rows:
+        duration_error = row["duration_error_ms"]
+        lines.append(
+            f"{row['motion_id']:>6} {row['backend']:>8} {row['frames']:>6} {row['actual_duration_ms']:>11.1f} "
+            f"{duration_error if duration_error is not None else 0:>8.1f} {row['pixel_error']:>8.2f} "
+            f"{row['max_subpixel_carry']:>6.2f} {row['frame_ms_jitter']:>9.2f} {row['velocity_peak']:>9.0f}"
+        )
+    for backend, summary in summarize_by_backend(rows).items():
+        lines.append(
+            f"{backend}: {summary['motions']} motions, mean error {summary['pixel_error_mean']:.2f}px, "
+            f"mean duration error {summary['duration_error_ms_mean']:.1f}ms, "
+            f"mean jitter {summary['frame_ms_jitter_mean']:.2f}ms, worst frame {summary['frame_ms_max']:.1f}ms"
+        )
+    regressions = subpixel_regressions(rows)
+    if regressions:
+        ids = ", ".join(str(row["motion_id"]) for row in regressions)
+        lines.append(f"Sub-pixel carry above {SUBPIXEL_MAX_CARRY}px in motions: {ids}")
+    if trace.dropped:
+        lines.append(f"{trace.dropped} frames dropped, trace capacity is {trace.capacity}")
+    return "\n".join(lines)
@@ -0,0 +1,54 @@
+"""
+Backend flush and sub-pixel carry, on the stub backend.
+
+Run outside of Talon, from the repo root:
+python -m pytest mouse_move_adv/tests
+
+Imports are inside the tests, since Talon loads this file too.
+"""
+
+def test_stub_flush_sends_ints_adding_up_to_the_total():
+    from mouse_move_adv.src.mouse_move_backends import StubMouseMoveBackend
+
+    backend = StubMouseMoveBackend()
+    backend.begin_motion(1, 10, -5, 100)
+    for frame in range(1, 7):
+        backend.move(10 / 6, -5 / 6)
+        backend.flush()
+        # sent ints stay within the sub-pixel carry of what was requested so far
+        assert abs(backend.x - 10 * frame / 6) <= 0.5
+        assert abs(backend.y + 5 * frame / 6) <= 0.5
+
+    assert len(backend.moves) == 6
+    assert all(isinstance(dx, int) and isinstance(dy, int) for dx, dy in backend.moves)
+    assert (backend.x, backend.y) == (10, -5)
+
+def test_stub_blended_motions_carry_separately():
+    from mouse_move_adv.src.mouse_move_backends import StubMouseMoveBackend
+
+    backend = StubMouseMoveBackend()
+    backend.begin_motion(1, 3, 0, 100)
+    backend.begin_motion(2, 0, 3, 100)
+    for _ in range(10):
+        backend.move(0.3, 0, 1)
+        backend.move(0, 0.3, 2)
+        backend.flush()
+
+    assert (backend.x, backend.y) == (3, 3)
+    # one OS move per frame that had a whole pixel, never more
+    assert len(backend.moves) <= 10
+    assert sum(dx for dx, _ in backend.moves) == 3
+    assert sum(dy for _, dy in backend.moves) == 3
+
+def test_stub_drops_carry_of_ended_motions():
+    from mouse_move_adv.src.mouse_move_backends import StubMouseMoveBackend
+
+    backend = StubMouseMoveBackend()
+    backend.begin_motion(1)
+    backend.move(0.4, 0)
+    backend.flush()
+    # not moved this frame, so motion 1 has ended
+    backend.flush()
+
+    assert backend.motions == {}
+    assert backend.moves == []
@@ -4,13 +4,12 @@ ui_commands = None
 ui_keys = None
 accent_color = "87ceeb"
 
-def show_commands(parrot_config, options = {}):
-    global ui_commands
+def commands_ui(parrot_config, options = {}):
     (commands, acts) = actions.user.parrot_config_format_display(parrot_config)
     (div, text, screen) = actions.user.ui_elements(["div", "text", "screen"])
     background_color = options.get("background_color") or "000000"
 
-    ui_commands = screen(align_items="flex_end", justify_content="flex_start")[
+    return screen(align_items="flex_end", justify_content="flex_start")[
         div(background_color=f"{background_color}66", margin=16, margin_right=32, padding=16)[
             div(flex_direction="row", gap=16)[
                 div(gap=8)[
@@ -24,6 +23,10 @@ def show_commands(parrot_config, options = {}):
             ],
         ],
     ]
+
+def show_commands(parrot_config, options = {}):
+    global ui_commands
+    ui_commands = commands_ui(parrot_config, options)
     ui_commands.show()
 
 def hide_commands():
@@ -117,5 +120,8 @@ def hide_full_ui():
     hide_keys()
 
 def refresh_full_ui(parrot_config, options = {}):
-    hide_commands()
-    show_commands(parrot_config, options)
\ No newline at end of file
+    if ui_commands and ui_commands.static_canvas:
+        # patch in place instead of hide and show, so it doesn't flash
+        ui_commands.update(commands_ui(parrot_config, options))
+    else:
+        show_commands(parrot_config, options)
\ No newline at end of file
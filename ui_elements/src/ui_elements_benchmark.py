@@ -0,0 +1,235 @@
+"""
+Layout benchmarks and golden display lists
+
+Run outside of Talon, from the repo root:
+python -m ui_elements.src.ui_elements_benchmark [--update-goldens]
+
+ui_elements then draws with the headless backend. Each synthetic tree
+size is timed cold (new tree, empty measure cache) and warm (layout
+cached, nothing changed):
+build, virtual_render, render, and show = the full static + dynamic +
+highlight draw.
+
+Golden display lists are committed in ui_elements/goldens, and each
+run reports any draw call that changed e.g. a layout regression. A
+missing golden fails too. Use --update-goldens to create one for a new
+case, or after an intended change.
+"""
+from .ui_elements_profiler import count_nodes
+from pathlib import Path
+from typing import Callable
+import argparse
+import json
+import random
+import statistics
+import time
+
+BENCHMARK_SIZES = (10, 100, 1000, 5000)
+BENCHMARK_REPEAT = 5
+GOLDEN_DIR = Path(__file__).parent.parent / "goldens"
+LABELS = ["LT", "RT", "LB", "RB", "A", "B", "X", "Y", "jump", "crouch", "sprint", "reload", "inventory", "map"]
+COLORS = ["333333", "444444", "225588", "882255", "FFFFFF33"]
+
+def synthetic_tree(node_count: int, seed: int = 0):
+    """A HUD like tree of about node_count nodes: rows of texts, stateful texts, boxes and buttons."""
+    from ..ui_elements import screen, div, text, button
+
+    rng = random.Random(seed)
+    rows = []
+    count = 2
+    while count < node_count:
+        children = []
+        count += 1
+        for _ in range(min(8, max(1, node_count - count))):
+            kind = rng.random()
+            label = rng.choice(LABELS)
+            if kind < 0.55:
+                children.append(text(label, font_size=rng.choice((12, 14, 16))))
+                count += 1
+            elif kind < 0.7:
+                children.append(text(label, id=f"text_{count}"))
+                count += 1
+            elif kind < 0.9:
+                children.append(div(
+                    background_color=rng.choice(COLORS),
+                    border_width=1,
+                    border_color="FFFFFF",
+                    border_radius=rng.choice((0, 4)),
+                    padding=4,
+                )[text(label, font_weight="bold")])
+                count += 2
+            else:
+                children.append(button(label, on_click=lambda: None, padding=4))
+                count += 1
+        rows.append(div(flex_direction="row", gap=4, padding=2)[children])
+    return screen(id=f"benchmark_{node_count}", align_items="flex_end", justify_content="flex_start")[
+        div(background_color="222222DD", padding=8, border_radius=4, gap=4)[rows]
+    ]
+
+def time_ms(fn: Callable) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+def benchmark_size(node_count: int, repeat: int = BENCHMARK_REPEAT) -> dict:
+    from ..ui_elements import Cursor, get_screen
+    from .ui_elements_headless import SkiaCanvas, cron, reset
+    from .ui_elements_measure import text_measure_cache
+
+    timings = {phase: [] for phase in ("build", "virtual_render", "render", "warm_virtual_render", "show")}
+    nodes = 0
+    for i in range(repeat):
+        reset()
+        text_measure_cache.clear()
+        trees = []
+        timings["build"].append(time_ms(lambda: trees.append(synthetic_tree(node_count, seed=i))))
+        builder = trees[0]
+        nodes = count_nodes(builder)
+        screen = get_screen(builder.screen)
+        c = SkiaCanvas(screen.rect)
+        timings["virtual_render"].append(time_ms(lambda: builder.virtual_render(c, builder.cursor)))
+        timings["render"].append(time_ms(lambda: builder.render(c, builder.cursor, builder.builder_options)))
+        builder.cursor = Cursor(screen)
+        timings["warm_virtual_render"].append(time_ms(lambda: builder.virtual_render(c, builder.cursor)))
+
+        builder.cursor = Cursor(screen)
+        timings["show"].append(time_ms(lambda: builder.show()))
+        builder.hide()
+        cron.run_pending()
+    return {
+        "size": node_count,
+        "nodes": nodes,
+        "measure": text_measure_cache.stats(),
+        **{phase: statistics.median(values) for phase, values in timings.items()},
+    }
+
+def run_benchmarks(sizes: tuple[int] = BENCHMARK_SIZES, repeat: int = BENCHMARK_REPEAT) -> list[dict]:
+    return [benchmark_size(size, repeat) for size in sizes]
+
+def benchmark_report(rows: list[dict]) -> str:
+    lines = [f"{'nodes':>6} {'build ms':>9} {'layout ms':>9} {'render ms':>9} {'warm ms':>8} {'show ms':>8} {'measure hit':>11}"]
+    for row in rows:
+        lines.append(
+            f"{row['nodes']:>6} {row['build']:>9.2f} {row['virtual_render']:>9.2f} {row['render']:>9.2f} "
+            f"{row['warm_virtual_render']:>8.2f} {row['show']:>8.2f} {row['measure']['hit_rate']:>11.0%}"
+        )
+    return "\n".join(lines)
+
+def golden_cases() -> dict[str, Callable]:
+    from ..ui_elements import screen, div, text
+
+    def hud():
+        builder = screen(id="golden_hud", align_items="flex_end", justify_content="center")[
+            div(background_color="333333", border_radius=8, border_width=2, border_color="FFFFFF", padding=12, gap=8)[
+                text("Controller", font_size=20, font_weight="bold"),
+                div(flex_direction="row", gap=8)[
+                    div(id="lt", padding=6, background_color="444444")[text("LT")],
+                    div(id="rt", padding=6, background_color="444444", border_radius=4)[text("RT")],
+                    div(flex=1)[text("status", id="status")],
+                ],
+                div(border_left=4, border_color="FF0000", padding_left=8)[text("left border")],
+            ]
+        ]
+        builder.show()
+        builder.highlight("lt")
+        builder.set_text("status", "walking")
+        return builder
+
+    def flex():
+        row = lambda **options: div(flex_direction="row", width=300, background_color="222222", **options)
+        box = lambda color, **options: div(background_color=color, height=20, **options)
+        return screen(id="golden_flex")[
+            div(gap=8, padding=8)[
+                # wrap
+                row(flex_wrap="wrap", gap=4)[[box(COLORS[i % 4], width=70) for i in range(9)]],
+                # shrink, with a min size and with text that can't shrink
+                row()[box("225588", width=200, flex_shrink=1), box("882255", width=200, flex_shrink=1, min_width=170)],
+                div(flex_direction="row", width=100, background_color="222222")[
+                    div(flex_shrink=1, background_color="444444")[text("hello world")],
+                    div(flex_shrink=1, background_color="225588")[text("another one")],
+                ],
+                # min and max sizes of flex children
+                row()[box("225588", flex=1, max_width=50), box("882255", flex=1)],
+                row()[box("225588", flex=1, min_width=250), box("882255", flex=1)],
+                row()[box("225588", flex=1, max_width=50), box("882255", flex=2, max_width=100), box("444444", flex=1)],
+                # space distribution
+                row(justify_content="space_between")[box("225588", width=50), box("882255", width=50), box("444444", width=50)],
+                row(justify_content="space_around")[box("225588", width=50), box("882255", width=50), box("444444", width=50)],
+                row(justify_content="space_evenly")[box("225588", width=50), box("882255", width=50), box("444444", width=50)],
+            ]
+        ]
+
+    return {
+        "synthetic_10": lambda: synthetic_tree(10),
+        "synthetic_100": lambda: synthetic_tree(100),
+        "hud": hud,
+        "flex": flex,
+    }
+
+def display_list_snapshot(builder) -> dict[str, list]:
+    """Draw calls per canvas of a shown builder, rounded so they are stable as json."""
+    def canvas_ops(canvas) -> list:
+        if not canvas:
+            return []
+        return [[round(arg, 2) if isinstance(arg, float) else arg for arg in op] for op in canvas.display_list]
+
+    return {
+        "static": canvas_ops(builder.static_canvas),
+        # stateful texts, on the dynamic canvas or their own
+        "dynamic": canvas_ops(builder.dynamic_canvas) + [op for id in builder.text_ids for op in canvas_ops(builder.text_canvases.get(id))],
+        "highlight": canvas_ops(builder.highlight_canvas),
+    }
+
+def check_golden(name: str, snapshot: dict[str, list], update: bool = False) -> list[str]:
+    """Differences with the saved golden. The golden is only written on update."""
+    path = GOLDEN_DIR / f"{name}.json"
+    if update:
+        GOLDEN_DIR.mkdir(exist_ok=True)
+        path.write_text(json.dumps(snapshot, indent=1))
+        return []
+    if not path.exists():
+        return [f"{name}: no golden at {path}, run with --update-goldens to create it"]
+    golden = json.loads(path.read_text())
+    diffs = []
+    for canvas_name in snapshot:
+        expected, actual = golden.get(canvas_name, []), snapshot[canvas_name]
+        for i in range(max(len(expected), len(actual))):
+            expected_op = expected[i] if i < len(expected) else None
+            actual_op = actual[i] if i < len(actual) else None
+            if expected_op != actual_op:
+                diffs.append(f"{name} {canvas_name}[{i}]: expected {expected_op}, got {actual_op}")
+    return diffs
+
+def run_goldens(update: bool = False) -> list[str]:
+    from .ui_elements_headless import cron, reset
+
+    diffs = []
+    for name, build in golden_cases().items():
+        reset()
+        builder = build()
+        builder.show()
+        cron.run_pending()
+        diffs.extend(check_golden(name, display_list_snapshot(builder), update))
+        builder.hide()
+    return diffs
+
+def main():
+    parser = argparse.ArgumentParser(description="ui_elements headless layout benchmarks and golden display lists")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(BENCHMARK_SIZES))
+    parser.add_argument("--repeat", type=int, default=BENCHMARK_REPEAT)
+    parser.add_argument("--update-goldens", action="store_true")
+    parser.add_argument("--skip-benchmarks", action="store_true")
+    args = parser.parse_args()
+
+    if not args.skip_benchmarks:
+        print(benchmark_report(run_benchmarks(tuple(args.sizes), args.repeat)))
+    diffs = run_goldens(args.update_goldens)
+    for diff in diffs[:50]:
+        print(diff)
+    if diffs:
+        print(f"{len(diffs)} differences with the goldens in {GOLDEN_DIR}")
+        raise SystemExit(1)
+    print("goldens ok")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Headless canvas backend
+
+Stand-ins for the parts of Talon that ui_elements uses, so layout and
+paint can run outside of Talon e.g. for benchmarks and layout regression
+checks on Linux. ui_elements.py falls back to these when talon can't be
+imported.
+
+Draw calls are recorded into a display list instead of being drawn.
+Text is measured with a fixed width per character, so display lists are
+the same on every machine, but don't match Talon's fonts. With Pillow
+installed, a display list can also be rasterized to an image.
+"""
+from dataclasses import dataclass
+from typing import Callable
+
+HEADLESS_SCREEN_WIDTH = 1920
+HEADLESS_SCREEN_HEIGHT = 1080
+# average advance and cap height, relative to the font size
+CHAR_WIDTH_RATIO = 0.55
+CAP_HEIGHT_RATIO = 0.7
+
+try:
+    from PIL import Image, ImageDraw, ImageColor
+except ImportError:
+    Image = None
+
+@dataclass
+class Point2d:
+    x: float
+    y: float
+
+@dataclass
+class Rect:
+    x: float
+    y: float
+    width: float
+    height: float
+
+    def contains(self, point: Point2d) -> bool:
+        return self.x <= point.x < self.x + self.width and self.y <= point.y < self.y + self.height
+
+@dataclass
+class RoundRect:
+    rect: Rect
+    x: float
+    y: float
+
+    @staticmethod
+    def from_rect(rect: Rect, x: float = 0, y: float = 0) -> "RoundRect":
+        return RoundRect(rect, x, y)
+
+@dataclass
+class Screen:
+    x: float = 0
+    y: float = 0
+    width: float = HEADLESS_SCREEN_WIDTH
+    height: float = HEADLESS_SCREEN_HEIGHT
+
+    @property
+    def rect(self) -> Rect:
+        return Rect(self.x, self.y, self.width, self.height)
+
+class ui:
+    screen = Screen()
+
+    @staticmethod
+    def main_screen() -> Screen:
+        return ui.screen
+
+    @staticmethod
+    def screens() -> list[Screen]:
+        return [ui.screen]
+
+class cron:
+    """
+    Jobs are queued instead of timed. Call run_pending() to run them,
+    as if their delay had passed, and run_intervals() for one tick of
+    each interval.
+    """
+    jobs: list[list] = []
+    intervals: list[list] = []
+
+    @staticmethod
+    def after(spec: str, callback: Callable):
+        job = [callback]
+        cron.jobs.append(job)
+        return job
+
+    @staticmethod
+    def interval(spec: str, callback: Callable):
+        job = [callback]
+        cron.intervals.append(job)
+        return job
+
+    @staticmethod
+    def cancel(job):
+        if job in cron.jobs:
+            cron.jobs.remove(job)
+        if job in cron.intervals:
+            cron.intervals.remove(job)
+
+    @staticmethod
+    def run_pending(max_rounds: int = 100):
+        """Run queued jobs, including ones queued by those jobs."""
+        for _ in range(max_rounds):
+            if not cron.jobs:
+                return
+            jobs, cron.jobs = cron.jobs, []
+            for job in jobs:
+                job[0]()
+
+    @staticmethod
+    def run_intervals():
+        for job in list(cron.intervals):
+            job[0]()
+
+class Font:
+    def __init__(self):
+        self.embolden = False
+
+class Paint:
+    class Style:
+        FILL = "fill"
+        STROKE = "stroke"
+
+    def __init__(self):
+        self.color = "000000"
+        self.style = Paint.Style.FILL
+        self.stroke_width = 1
+        self.textsize = 16
+        self.font = Font()
+        self.typeface = None
+
+    def measure_text(self, text: str) -> tuple[None, Rect]:
+        width = len(text) * self.textsize * CHAR_WIDTH_RATIO
+        height = self.textsize * CAP_HEIGHT_RATIO
+        return None, Rect(0, -height, width, height)
+
+class SkiaCanvas:
+    """
+    Records draw calls with the paint state they were drawn with.
+    ```
+    c = SkiaCanvas(rect)
+    c.draw_rect(Rect(0, 0, 10, 10))
+    c.display_list # [("rect", "000000", "fill", 1, 0, 0, 10, 10)]
+    ```
+    """
+    def __init__(self, rect: Rect = None):
+        self.rect = rect
+        self.paint = Paint()
+        self.display_list: list[tuple] = []
+
+    def record(self, op: str, *args):
+        paint = self.paint
+        self.display_list.append((op, paint.color, paint.style, paint.stroke_width, *args))
+
+    def draw_rect(self, rect: Rect):
+        self.record("rect", rect.x, rect.y, rect.width, rect.height)
+
+    def draw_rrect(self, rrect: RoundRect):
+        rect = rrect.rect
+        self.record("rrect", rect.x, rect.y, rect.width, rect.height, rrect.x)
+
+    def draw_text(self, text: str, x: float, y: float):
+        self.record("text", x, y, text, self.paint.textsize, self.paint.font.embolden)
+
+    def draw_line(self, x1: float, y1: float, x2: float, y2: float):
+        self.record("line", x1, y1, x2, y2)
+
+    def draw_circle(self, x: float, y: float, radius: float):
+        self.record("circle", x, y, radius)
+
+class Canvas:
+    """
+    Like Talon, the display list is cleared and the draw callbacks run
+    again on every freeze.
+    """
+    canvases: list["Canvas"] = []
+
+    def __init__(self, rect: Rect):
+        self.rect = rect
+        self.callbacks: dict[str, list[Callable]] = {}
+        self.display_list: list[tuple] = []
+        self.blocks_mouse = False
+        self.visible = True
+        self.freezes = 0
+        Canvas.canvases.append(self)
+
+    @staticmethod
+    def from_screen(screen: Screen) -> "Canvas":
+        return Canvas(screen.rect)
+
+    @staticmethod
+    def from_rect(rect: Rect) -> "Canvas":
+        return Canvas(rect)
+
+    def register(self, event: str, callback: Callable):
+        self.callbacks.setdefault(event, []).append(callback)
+
+    def unregister(self, event: str, callback: Callable):
+        if callback in self.callbacks.get(event, []):
+            self.callbacks[event].remove(callback)
+
+    def freeze(self):
+        self.freezes += 1
+        c = SkiaCanvas(self.rect)
+        for callback in list(self.callbacks.get("draw", [])):
+            callback(c)
+        self.display_list = c.display_list
+
+    def hide(self):
+        self.visible = False
+
+    def close(self):
+        self.visible = False
+        self.callbacks.clear()
+        if self in Canvas.canvases:
+            Canvas.canvases.remove(self)
+
+class DarkThemeLabels:
+    def __init__(self, **theme):
+        self.theme = theme
+
+class TextArea:
+    def __init__(self):
+        self.value = ""
+        self.rect = None
+        self.theme = None
+        self.visible = False
+        self.callbacks: dict[str, list[Callable]] = {}
+
+    def register(self, event: str, callback: Callable):
+        self.callbacks.setdefault(event, []).append(callback)
+
+    def show(self):
+        self.visible = True
+
+    def hide(self):
+        self.visible = False
+
+def reset():
+    """Forget queued jobs and canvases, e.g. between benchmark runs."""
+    cron.jobs.clear()
+    cron.intervals.clear()
+    Canvas.canvases.clear()
+
+def rasterize(display_list: list[tuple], width: int = HEADLESS_SCREEN_WIDTH, height: int = HEADLESS_SCREEN_HEIGHT, background: str = "000000") -> "Image.Image":
+    """Draw a display list with Pillow, to look at a layout without Talon."""
+    if Image is None:
+        raise ImportError("Pillow is required to rasterize display lists: pip install pillow")
+    image = Image.new("RGBA", (width, height), to_rgba(background))
+    draw = ImageDraw.Draw(image, "RGBA")
+    for op, color, style, stroke_width, *args in display_list:
+        fill = to_rgba(color) if style == Paint.Style.FILL else None
+        outline = to_rgba(color) if style == Paint.Style.STROKE else None
+        stroke_width = max(1, round(stroke_width))
+        if op == "rect":
+            x, y, w, h = args
+            draw.rectangle((x, y, x + w, y + h), fill=fill, outline=outline, width=stroke_width)
+        elif op == "rrect":
+            x, y, w, h, radius = args
+            draw.rounded_rectangle((x, y, x + w, y + h), radius, fill=fill, outline=outline, width=stroke_width)
+        elif op == "text":
+            x, y, text, textsize, _ = args
+            # y is the baseline
+            draw.text((x, y - textsize * CAP_HEIGHT_RATIO), text, fill=to_rgba(color))
+        elif op == "line":
+            draw.line(args, fill=to_rgba(color), width=stroke_width)
+        elif op == "circle":
+            x, y, radius = args
+            draw.ellipse((x - radius, y - radius, x + radius, y + radius), fill=fill, outline=outline, width=stroke_width)
+    return image
+
+def to_rgba(color: str) -> tuple[int, int, int, int]:
+    """ui_elements colors are hex without the #, e.g. "FFFFFF" or "FFFFFF88", or a name e.g. "red"."""
+    if len(color) in (6, 8) and all(ch in "0123456789abcdefABCDEF" for ch in color):
+        alpha = int(color[6:8], 16) if len(color) == 8 else 255
+        return (int(color[0:2], 16), int(color[2:4], 16), int(color[4:6], 16), alpha)
+    rgba = ImageColor.getrgb(color)
+    return rgba if len(rgba) == 4 else (*rgba, 255)
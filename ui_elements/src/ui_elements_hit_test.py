@@ -0,0 +1,47 @@
+"""
+Uniform grid for hit testing
+
+Rects are bucketed into fixed size cells when the layout is committed,
+so a point query only checks the few rects in one cell instead of every
+button of every builder.
+"""
+from typing import Optional
+
+HIT_TEST_CELL_SIZE = 64
+
+class HitTestGrid:
+    """
+    ```
+    grid = HitTestGrid()
+    grid.insert("button_1", rect)
+    grid.query(x, y) # "button_1" or None
+    ```
+    """
+    def __init__(self, cell_size: int = HIT_TEST_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells: dict[tuple[int, int], list[tuple[str, float, float, float, float]]] = {}
+        self.count = 0
+
+    def insert(self, id: str, rect):
+        x1, y1 = rect.x, rect.y
+        x2, y2 = rect.x + rect.width, rect.y + rect.height
+        entry = (id, x1, y1, x2, y2)
+        size = self.cell_size
+        for cell_x in range(int(x1 // size), int(x2 // size) + 1):
+            for cell_y in range(int(y1 // size), int(y2 // size) + 1):
+                self.cells.setdefault((cell_x, cell_y), []).append(entry)
+        self.count += 1
+
+    def query(self, x: float, y: float) -> Optional[str]:
+        """Id of the last inserted rect containing the point, i.e. the one drawn on top."""
+        entries = self.cells.get((int(x // self.cell_size), int(y // self.cell_size)))
+        if not entries:
+            return None
+        for id, x1, y1, x2, y2 in reversed(entries):
+            if x1 <= x < x2 and y1 <= y < y2:
+                return id
+        return None
+
+    def clear(self):
+        self.cells.clear()
+        self.count = 0
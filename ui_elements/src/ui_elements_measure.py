@@ -0,0 +1,78 @@
+"""
+Text measurement cache
+
+measure_text is the most expensive part of layout, and HUDs repeat the
+same labels many times e.g. "LT", "RB" or key names. Widths are cached
+process wide in an LRU keyed by (text, font_size, font_weight,
+typeface). Line height only depends on the font, so it is measured once
+per font configuration.
+"""
+from collections import OrderedDict
+
+TEXT_MEASURE_CACHE_SIZE = 4096
+
+class TextMeasureCache:
+    """
+    ```
+    width, line_height = text_measure_cache.measure(c.paint, "LT", 16, "bold")
+    text_measure_cache.stats()
+    ```
+    """
+    def __init__(self, maxsize: int = TEXT_MEASURE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.widths: OrderedDict[tuple, float] = OrderedDict()
+        self.line_heights: dict[tuple, float] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def set_font(self, paint, font_size: int, font_weight: str):
+        paint.textsize = font_size
+        paint.font.embolden = font_weight == "bold"
+
+    def font_key(self, paint, font_size: int, font_weight: str) -> tuple:
+        typeface = getattr(paint, "typeface", None)
+        return (font_size, font_weight, str(typeface) if typeface is not None else None)
+
+    def line_height(self, paint, font_size: int, font_weight: str, font_key: tuple = None) -> float:
+        font_key = font_key or self.font_key(paint, font_size, font_weight)
+        line_height = self.line_heights.get(font_key)
+        if line_height is None:
+            self.set_font(paint, font_size, font_weight)
+            line_height = paint.measure_text("E")[1].height
+            self.line_heights[font_key] = line_height
+        return line_height
+
+    def measure(self, paint, text: str, font_size: int, font_weight: str) -> tuple[float, float]:
+        """(width, line height) of text. The paint is only touched on a miss."""
+        font_key = self.font_key(paint, font_size, font_weight)
+        key = (text, *font_key)
+        width = self.widths.get(key)
+        if width is None:
+            self.misses += 1
+            self.set_font(paint, font_size, font_weight)
+            width = paint.measure_text(text)[1].width
+            self.widths[key] = width
+            if len(self.widths) > self.maxsize:
+                self.widths.popitem(last=False)
+        else:
+            self.hits += 1
+            self.widths.move_to_end(key)
+        return width, self.line_height(paint, font_size, font_weight, font_key)
+
+    def clear(self):
+        self.widths.clear()
+        self.line_heights.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0,
+            "size": len(self.widths),
+            "fonts": len(self.line_heights),
+        }
+
+text_measure_cache = TextMeasureCache()
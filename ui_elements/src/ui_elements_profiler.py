@@ -0,0 +1,182 @@
+"""
+Render phase profiler
+
+Opt in timing of where ui_elements spends frame time, per builder:
+virtual_render (layout), render (static paint), dynamic, text,
+highlight and blockable (blockable canvas setup). Also per subtree
+(any element with an id) for layout and paint, with node counts and
+measure_text calls.
+
+Disabled by default, and then only costs a flag check per phase and
+per child element.
+"""
+from contextlib import nullcontext
+from .ui_elements_measure import text_measure_cache
+import time
+
+PROFILER_PHASES = ("virtual_render", "render", "dynamic", "text", "highlight", "blockable")
+
+class PhaseStats:
+    __slots__ = ("count", "total_ms", "max_ms", "last_ms", "nodes", "laid_out", "measure_calls", "measure_misses")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+        self.nodes = 0
+        self.laid_out = 0
+        self.measure_calls = 0
+        self.measure_misses = 0
+
+    def add(self, ms: float):
+        self.count += 1
+        self.total_ms += ms
+        self.last_ms = ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_ms": self.total_ms,
+            "avg_ms": self.total_ms / self.count if self.count else 0,
+            "max_ms": self.max_ms,
+            "last_ms": self.last_ms,
+            "nodes": self.nodes,
+            "laid_out": self.laid_out,
+            "measure_calls": self.measure_calls,
+            "measure_misses": self.measure_misses,
+        }
+
+class PhaseTimer:
+    def __init__(self, profiler: "RenderProfiler", builder_id: str, phase: str, root = None):
+        self.profiler = profiler
+        self.builder_id = builder_id
+        self.phase = phase
+        self.root = root
+
+    def __enter__(self):
+        profiler = self.profiler
+        self.outer_builder_id = profiler.current_builder_id
+        profiler.current_builder_id = self.builder_id
+        self.laid_out = profiler.laid_out
+        self.hits = text_measure_cache.hits
+        self.misses = text_measure_cache.misses
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        ms = (time.perf_counter() - self.start) * 1000
+        profiler = self.profiler
+        profiler.current_builder_id = self.outer_builder_id
+        stats = profiler.builder_stats(self.builder_id, self.phase)
+        stats.add(ms)
+        stats.laid_out = profiler.laid_out - self.laid_out
+        misses = text_measure_cache.misses - self.misses
+        stats.measure_misses = misses
+        stats.measure_calls = text_measure_cache.hits - self.hits + misses
+        if self.root is not None:
+            stats.nodes = count_nodes(self.root)
+        return False
+
+class RenderProfiler:
+    """
+    ```
+    render_profiler.start()
+    with render_profiler.phase(builder.id, "render", builder):
+        builder.render(c, cursor, builder_options)
+    render_profiler.stats()
+    ```
+    """
+    def __init__(self):
+        self.enabled = False
+        self.current_builder_id = None
+        # incremented by nodes that are actually laid out, not cached
+        self.laid_out = 0
+        self.builders: dict[str, dict[str, PhaseStats]] = {}
+        self.subtrees: dict[str, dict[str, dict[str, PhaseStats]]] = {}
+        self.ignored_builder_ids: set[str] = set()
+
+    def start(self):
+        self.reset()
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+
+    def reset(self):
+        self.builders.clear()
+        self.subtrees.clear()
+        self.laid_out = 0
+
+    def ignore(self, builder_id: str):
+        """Don't profile a builder, e.g. the profiler overlay itself."""
+        self.ignored_builder_ids.add(str(builder_id))
+
+    def phase(self, builder_id, phase: str, root = None):
+        """Time a phase of a builder. root is walked for a node count."""
+        if not self.enabled or str(builder_id) in self.ignored_builder_ids:
+            return nullcontext()
+        return PhaseTimer(self, str(builder_id), phase, root)
+
+    def subtree(self, node, phase: str):
+        """Time a child element with an id, within the current builder phase."""
+        if not self.enabled or not node.id or self.current_builder_id is None:
+            return nullcontext()
+        return SubtreeTimer(self, self.current_builder_id, str(node.id), phase)
+
+    def builder_stats(self, builder_id: str, phase: str) -> PhaseStats:
+        phases = self.builders.setdefault(builder_id, {})
+        if phase not in phases:
+            phases[phase] = PhaseStats()
+        return phases[phase]
+
+    def subtree_stats(self, builder_id: str, id: str, phase: str) -> PhaseStats:
+        phases = self.subtrees.setdefault(builder_id, {}).setdefault(id, {})
+        if phase not in phases:
+            phases[phase] = PhaseStats()
+        return phases[phase]
+
+    def stats(self, builder_id: str = None) -> dict:
+        """Phase stats per builder, and per subtree id of each builder."""
+        builder_ids = [str(builder_id)] if builder_id is not None else list(self.builders)
+        return {
+            id: {
+                "phases": {phase: stats.to_dict() for phase, stats in self.builders.get(id, {}).items()},
+                "subtrees": {
+                    subtree_id: {phase: stats.to_dict() for phase, stats in phases.items()}
+                    for subtree_id, phases in self.subtrees.get(id, {}).items()
+                },
+            }
+            for id in builder_ids
+        }
+
+    def frame_ms(self, builder_id: str) -> float:
+        """Last time of every phase of a builder added up."""
+        return sum(stats.last_ms for stats in self.builders.get(builder_id, {}).values())
+
+class SubtreeTimer:
+    def __init__(self, profiler: RenderProfiler, builder_id: str, id: str, phase: str):
+        self.profiler = profiler
+        self.builder_id = builder_id
+        self.id = id
+        self.phase = phase
+
+    def __enter__(self):
+        self.laid_out = self.profiler.laid_out
+        self.misses = text_measure_cache.misses
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        ms = (time.perf_counter() - self.start) * 1000
+        stats = self.profiler.subtree_stats(self.builder_id, self.id, self.phase)
+        stats.add(ms)
+        stats.laid_out = self.profiler.laid_out - self.laid_out
+        stats.measure_misses = text_measure_cache.misses - self.misses
+        return False
+
+def count_nodes(node) -> int:
+    return 1 + sum(count_nodes(child) for child in getattr(node, "children", ()))
+
+render_profiler = RenderProfiler()
@@ -0,0 +1,70 @@
+"""
+Profiler overlay
+
+A ui_elements panel with the last frame time of each builder, its
+phases, and the slowest subtrees. Refreshed in place with update while
+the profiler runs. The overlay itself is not profiled.
+"""
+from talon import cron
+from ..ui_elements import screen, div, text
+from .ui_elements_profiler import render_profiler, PROFILER_PHASES
+
+PROFILER_OVERLAY_ID = "ui_elements_profiler"
+PROFILER_OVERLAY_REFRESH = "500ms"
+PROFILER_OVERLAY_SUBTREES = 5
+
+_overlay = None
+_refresh_job = None
+
+def profiler_overlay_tree():
+    stats = render_profiler.stats()
+    rows = []
+    for builder_id, builder_stats in stats.items():
+        phases = builder_stats["phases"]
+        rows.append(text(f"{builder_id}  {render_profiler.frame_ms(builder_id):.2f}ms", font_weight="bold", color="FFCC00"))
+        for phase in PROFILER_PHASES:
+            if phase not in phases:
+                continue
+            phase_stats = phases[phase]
+            detail = f"{phase}: {phase_stats['last_ms']:.2f}ms avg {phase_stats['avg_ms']:.2f} max {phase_stats['max_ms']:.2f} x{phase_stats['count']}"
+            if phase == "virtual_render":
+                detail += f"  nodes {phase_stats['laid_out']}/{phase_stats['nodes']} measures {phase_stats['measure_misses']}/{phase_stats['measure_calls']}"
+            rows.append(text(detail, font_size=14))
+        subtrees = sorted(
+            ((subtree_id, sum(phase["total_ms"] for phase in subtree.values())) for subtree_id, subtree in builder_stats["subtrees"].items()),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+        for subtree_id, total_ms in subtrees[:PROFILER_OVERLAY_SUBTREES]:
+            rows.append(text(f"  #{subtree_id}: {total_ms:.2f}ms total", font_size=14, color="AAAAAA"))
+    if not rows:
+        rows.append(text("No renders yet", font_size=14))
+
+    return screen(id=PROFILER_OVERLAY_ID, align_items="flex_start", justify_content="flex_end")[
+        div(background_color="000000CC", padding=12, border_radius=8, gap=4, margin=16)[
+            text("ui_elements profiler", font_weight="bold"),
+            *rows,
+        ]
+    ]
+
+def refresh_profiler_overlay():
+    if _overlay:
+        _overlay.update(profiler_overlay_tree())
+
+def show_profiler_overlay():
+    global _overlay, _refresh_job
+    render_profiler.ignore(PROFILER_OVERLAY_ID)
+    if not _overlay:
+        _overlay = profiler_overlay_tree()
+        _overlay.show()
+    if not _refresh_job:
+        _refresh_job = cron.interval(PROFILER_OVERLAY_REFRESH, refresh_profiler_overlay)
+
+def hide_profiler_overlay():
+    global _overlay, _refresh_job
+    if _refresh_job:
+        cron.cancel(_refresh_job)
+        _refresh_job = None
+    if _overlay:
+        _overlay.hide()
+        _overlay = None
@@ -0,0 +1,152 @@
+"""
+Frame budgeted render scheduler
+
+Each builder has one scheduler for its canvases. State changes mark a
+canvas dirty instead of freezing it right away, and all changes within
+a frame are coalesced into at most one redraw per canvas.
+
+The first change after an idle frame redraws immediately, so a single
+set_text or highlight has no added latency. Changes that land within
+frame_ms of the last redraw wait for the end of the frame.
+
+Within a batch, changes only mark canvases dirty, and every dirty canvas
+of every builder is redrawn once when the batch ends.
+"""
+try:
+    from talon import cron
+except ImportError:
+    from .ui_elements_headless import cron
+from typing import Callable
+import time
+
+RENDER_FRAME_MS = 16
+
+class RenderStats:
+    __slots__ = ("requested", "redraws")
+
+    def __init__(self):
+        self.requested = 0
+        self.redraws = 0
+
+    @property
+    def saved(self) -> int:
+        return self.requested - self.redraws
+
+    def to_dict(self) -> dict:
+        return {"requested": self.requested, "redraws": self.redraws, "saved": self.saved}
+
+class RenderBatch:
+    """
+    ```
+    with render_batch as batch:
+        builder.set_text("a", "1")
+        builder.highlight("b")
+    batch.stats() # {"requested": 2, "redraws": 2, "saved": 0}
+    ```
+    Batches can be nested, only the outermost one redraws.
+    """
+    def __init__(self):
+        self.depth = 0
+        # schedulers with changes in this batch, in order
+        self.schedulers: dict["RenderScheduler", None] = {}
+        self.requested = 0
+        self.redraws = 0
+
+    def __enter__(self):
+        if self.depth == 0:
+            self.requested = 0
+            self.redraws = 0
+        self.depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self.depth -= 1
+        if self.depth == 0:
+            self.commit()
+        return False
+
+    def add(self, scheduler: "RenderScheduler"):
+        self.requested += 1
+        self.schedulers[scheduler] = None
+
+    def commit(self):
+        schedulers, self.schedulers = self.schedulers, {}
+        for scheduler in schedulers:
+            self.redraws += scheduler.flush_batch()
+
+    @property
+    def saved(self) -> int:
+        return self.requested - self.redraws
+
+    def stats(self) -> dict:
+        return {"requested": self.requested, "redraws": self.redraws, "saved": self.saved}
+
+render_batch = RenderBatch()
+
+class RenderScheduler:
+    """
+    Dirty flags per canvas, flushed at most once per frame.
+    ```
+    scheduler = RenderScheduler({"dynamic": lambda: canvas.freeze()})
+    scheduler.request("dynamic")
+    scheduler.request("dynamic") # coalesced into the same redraw
+    scheduler.stats()["dynamic"]["saved"]
+    ```
+    """
+    def __init__(self, canvases: dict[str, Callable[[], None]], frame_ms: int = RENDER_FRAME_MS):
+        self.canvases = canvases
+        self.frame_ms = frame_ms
+        self.dirty: dict[str, bool] = {}
+        self.counters = {name: RenderStats() for name in canvases}
+        self.last_redraw_ts = {name: 0.0 for name in canvases}
+        self.job = None
+
+    def request(self, name: str):
+        """Mark a canvas dirty. It is redrawn now if idle, otherwise at the end of the frame."""
+        self.counters[name].requested += 1
+        if render_batch.depth:
+            render_batch.add(self)
+            self.dirty[name] = True
+            return
+        if self.dirty.get(name):
+            return
+        elapsed_ms = (time.perf_counter() - self.last_redraw_ts[name]) * 1000
+        if elapsed_ms >= self.frame_ms and not self.job:
+            self.redraw(name)
+            return
+        self.dirty[name] = True
+        if not self.job:
+            self.job = cron.after(f"{max(1, int(self.frame_ms - elapsed_ms))}ms", self.flush)
+
+    def redraw(self, name: str):
+        self.dirty[name] = False
+        self.counters[name].redraws += 1
+        self.last_redraw_ts[name] = time.perf_counter()
+        self.canvases[name]()
+
+    def flush(self):
+        """Redraw every dirty canvas once."""
+        self.job = None
+        for name, is_dirty in list(self.dirty.items()):
+            if is_dirty:
+                self.redraw(name)
+
+    def flush_batch(self) -> int:
+        """Redraw every dirty canvas now, at the end of a batch. Returns the number of redraws."""
+        if self.job:
+            cron.cancel(self.job)
+            self.job = None
+        names = [name for name, is_dirty in self.dirty.items() if is_dirty]
+        self.flush()
+        return len(names)
+
+    def cancel(self):
+        """Drop pending redraws e.g. when the canvases are being destroyed."""
+        if self.job:
+            cron.cancel(self.job)
+            self.job = None
+        self.dirty.clear()
+
+    def stats(self) -> dict[str, dict]:
+        """requested, redraws and saved = requested - redraws, per canvas."""
+        return {name: counter.to_dict() for name, counter in self.counters.items()}
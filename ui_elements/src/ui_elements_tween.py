@@ -0,0 +1,150 @@
+"""
+Tween engine
+
+Animates element properties by id: highlight (color), background_color,
+opacity, offset (x, y translation) and width. All tweens share one frame
+ticker, started by the first tween and stopped as soon as nothing is
+animating. Each tick applies every tween, then asks each builder to
+redraw only the canvases its tweens touched, once.
+"""
+try:
+    from talon import cron
+except ImportError:
+    from .ui_elements_headless import cron
+from typing import Callable, Optional
+import time
+
+TWEEN_FRAME_MS = 16
+TWEEN_PROPERTIES = ("highlight", "background_color", "opacity", "offset", "width")
+
+EASINGS: dict[str, Callable[[float], float]] = {
+    "linear": lambda t: t,
+    "ease_in": lambda t: t * t,
+    "ease_out": lambda t: 1 - (1 - t) * (1 - t),
+    "ease_in_out": lambda t: 2 * t * t if t < 0.5 else 1 - (-2 * t + 2) ** 2 / 2,
+}
+
+def parse_color(color: str) -> Optional[tuple[int, int, int, int]]:
+    """"FFFFFF" or "FFFFFF88" to (r, g, b, a), or None if it isn't hex."""
+    if not isinstance(color, str) or len(color) not in (6, 8):
+        return None
+    try:
+        alpha = int(color[6:8], 16) if len(color) == 8 else 255
+        return (int(color[0:2], 16), int(color[2:4], 16), int(color[4:6], 16), alpha)
+    except ValueError:
+        return None
+
+def format_color(rgba: tuple) -> str:
+    return "".join(format(max(0, min(255, round(channel))), "02X") for channel in rgba)
+
+def with_alpha(color: str, alpha: float) -> str:
+    """Color with its alpha replaced, alpha from 0.0 to 1.0."""
+    return color[:6] + format(int(round(alpha * 255)), "02X")
+
+def scale_alpha(color: str, scale: float) -> str:
+    """Color with its alpha multiplied, e.g. by an opacity. Non hex colors are kept."""
+    rgba = parse_color(color)
+    return format_color((*rgba[:3], rgba[3] * scale)) if rgba else color
+
+def interpolate(start, end, t: float):
+    """Numbers, (x, y) tuples and hex colors. Anything else switches to end at the end."""
+    if isinstance(start, (int, float)) and isinstance(end, (int, float)):
+        return start + (end - start) * t
+    if isinstance(start, tuple) and isinstance(end, tuple):
+        return tuple(a + (b - a) * t for a, b in zip(start, end))
+    start_rgba, end_rgba = parse_color(start), parse_color(end)
+    if start_rgba and end_rgba:
+        return format_color(tuple(a + (b - a) * t for a, b in zip(start_rgba, end_rgba)))
+    return end if t >= 1 else start
+
+class Tween:
+    __slots__ = ("builder", "id", "prop", "start", "end", "duration_ms", "easing", "started", "on_done")
+
+    def __init__(self, builder, id: str, prop: str, start, end, duration_ms: int, easing: str, started: float, on_done: Callable = None):
+        self.builder = builder
+        self.id = id
+        self.prop = prop
+        self.start = start
+        self.end = end
+        self.duration_ms = duration_ms
+        self.easing = EASINGS[easing]
+        self.started = started
+        self.on_done = on_done
+
+    def value_at(self, now: float) -> tuple[any, bool]:
+        """Value at a time, and whether the tween is done."""
+        progress = (now - self.started) * 1000 / self.duration_ms if self.duration_ms > 0 else 1
+        if progress >= 1:
+            return self.end, True
+        return interpolate(self.start, self.end, self.easing(max(0, progress))), False
+
+class TweenTicker:
+    """
+    ```
+    tween_ticker.start(Tween(builder, "box", "opacity", 1.0, 0.0, 300, "ease_out", tween_ticker.now()))
+    ```
+    A newer tween of the same builder, id and property replaces the old one.
+    """
+    def __init__(self, frame_ms: int = TWEEN_FRAME_MS, clock: Callable[[], float] = time.perf_counter):
+        self.frame_ms = frame_ms
+        self.clock = clock
+        self.tweens: dict[tuple, Tween] = {}
+        self.job = None
+        self.ticks = 0
+
+    def now(self) -> float:
+        return self.clock()
+
+    def start(self, tween: Tween):
+        self.tweens[(tween.builder.id, tween.id, tween.prop)] = tween
+        if not self.job:
+            self.job = cron.interval(f"{self.frame_ms}ms", self.tick)
+
+    def cancel(self, builder_id, id: str = None, prop: str = None):
+        """Stop tweens of a builder, optionally only of an id and property, where they are."""
+        for key in list(self.tweens):
+            if key[0] == builder_id and (id is None or key[1] == id) and (prop is None or key[2] == prop):
+                del self.tweens[key]
+        self.stop_if_idle()
+
+    def is_animating(self, builder_id, id: str = None, prop: str = None) -> bool:
+        return any(
+            key[0] == builder_id and (id is None or key[1] == id) and (prop is None or key[2] == prop)
+            for key in self.tweens
+        )
+
+    def stop_if_idle(self):
+        if not self.tweens and self.job:
+            cron.cancel(self.job)
+            self.job = None
+
+    def tick(self):
+        self.ticks += 1
+        now = self.now()
+        dirty: dict[any, dict[str, None]] = {}
+        done = []
+        for key, tween in list(self.tweens.items()):
+            value, finished = tween.value_at(now)
+            canvases = tween.builder.apply_tween(tween.id, tween.prop, value)
+            if canvases is None:
+                # element or builder is gone
+                self.tweens.pop(key, None)
+                continue
+            builder_dirty = dirty.setdefault(tween.builder, {})
+            for name in canvases:
+                builder_dirty[name] = None
+            if finished:
+                self.tweens.pop(key, None)
+                done.append(tween)
+
+        for builder, names in dirty.items():
+            builder.redraw_tweened(names)
+        self.stop_if_idle()
+        for tween in done:
+            if tween.on_done:
+                tween.on_done()
+
+    def stats(self) -> dict:
+        return {"active": len(self.tweens), "ticking": self.job is not None, "ticks": self.ticks}
+
+tween_ticker = TweenTicker()
@@ -0,0 +1,95 @@
+"""
+ui_elements_batch applies all changes or none, on the headless backend.
+
+Run outside of Talon, from the repo root:
+python -m pytest ui_elements/tests
+
+Imports are inside the tests, since Talon loads this file too.
+"""
+
+def show_hud():
+    from ui_elements.ui_elements import screen, div, text
+    from ui_elements.src.ui_elements_headless import cron
+
+    ui = screen(id="batch_hud")[
+        div(padding=8)[
+            text("1", id="batch_gear"),
+            div(id="batch_left", padding=4)[text("left")],
+            div(id="batch_right", padding=4)[text("right")],
+        ]
+    ]
+    ui.show()
+    cron.run_pending()
+    return ui
+
+def freezes(ui) -> dict:
+    canvases = {
+        "static": ui.static_canvas,
+        "dynamic": ui.dynamic_canvas,
+        "highlight": ui.highlight_canvas,
+        **ui.text_canvases,
+    }
+    return {name: canvas.freezes for name, canvas in canvases.items() if canvas}
+
+def assert_batch_rejected(changes):
+    import pytest
+    from ui_elements.ui_elements import apply_batch
+    from ui_elements.src.ui_elements_headless import cron
+
+    ui = show_hud()
+    try:
+        before = freezes(ui)
+        with pytest.raises(ValueError):
+            apply_batch(changes)
+        cron.run_pending()
+
+        assert ui.text_state.get("batch_gear") == "1"
+        assert ui.highlighted == {}
+        assert freezes(ui) == before
+    finally:
+        ui.hide()
+
+def test_batch_with_unknown_action_in_the_middle_changes_nothing():
+    assert_batch_rejected([
+        ["set_text", "batch_gear", "3"],
+        ["highlight", "batch_left"],
+        ["explode", "batch_right"],
+        ["highlight", "batch_right"],
+    ])
+
+def test_batch_with_wrong_arguments_in_the_middle_changes_nothing():
+    assert_batch_rejected([
+        ["set_text", "batch_gear", "3"],
+        ["set_text", "batch_gear"],
+        ["highlight", "batch_left"],
+    ])
+    assert_batch_rejected([
+        ["highlight", "batch_left"],
+        ["highlight"],
+    ])
+    assert_batch_rejected([
+        ["highlight", "batch_left", "FF0000", "extra"],
+        ["set_text", "batch_gear", "3"],
+    ])
+
+def test_valid_batch_redraws_once():
+    from ui_elements.ui_elements import apply_batch
+    from ui_elements.src.ui_elements_headless import cron
+
+    ui = show_hud()
+    try:
+        before = freezes(ui)
+        stats = apply_batch([
+            ["set_text", "batch_gear", "3"],
+            ["highlight", "batch_left"],
+            ["highlight", "batch_right"],
+        ])
+        cron.run_pending()
+
+        assert ui.text_state["batch_gear"] == "3"
+        assert set(ui.highlighted) == {"batch_left", "batch_right"}
+        after = freezes(ui)
+        assert after["highlight"] == before["highlight"] + 1
+        assert stats["saved"] >= 1
+    finally:
+        ui.hide()
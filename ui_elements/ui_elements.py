@@ -1,16 +1,25 @@
-from talon import cron, ui
-from talon.skia.canvas import Canvas as SkiaCanvas
-from talon.canvas import Canvas
-from talon.screen import Screen
-from talon.skia import RoundRect
-from talon.types import Rect, Point2d
-from typing import TypedDict, Optional, get_origin, get_args
+try:
+    from talon import cron, ui
+    from talon.skia.canvas import Canvas as SkiaCanvas
+    from talon.canvas import Canvas
+    from talon.screen import Screen
+    from talon.skia import RoundRect
+    from talon.types import Rect, Point2d
+    from talon.experimental.textarea import DarkThemeLabels, TextArea
+except ImportError:
+    # outside of Talon e.g. benchmarks, draw into recorded display lists
+    from .src.ui_elements_headless import cron, ui, SkiaCanvas, Canvas, Screen, RoundRect, Rect, Point2d, DarkThemeLabels, TextArea
+from typing import TypedDict, Optional, Callable, Sequence, Mapping, get_origin, get_args
+from types import MappingProxyType
 from itertools import cycle
 from dataclasses import dataclass, fields
-from talon.experimental.textarea import DarkThemeLabels, TextArea
+from .src.ui_elements_hit_test import HitTestGrid
+from .src.ui_elements_measure import text_measure_cache
+from .src.ui_elements_profiler import render_profiler
+from .src.ui_elements_scheduler import RenderScheduler, RenderBatch, render_batch
+from .src.ui_elements_tween import tween_ticker, Tween, TWEEN_PROPERTIES, EASINGS, with_alpha, scale_alpha
+import inspect
 import uuid
-import hashlib
-import pickle
 
 debug_enabled = False
 debug_draw_step_by_step = False
@@ -19,15 +28,21 @@ debug_numbers = False
 debug_current_step = 0
 debug_start_step = 10
 render_step = 0
-ids = {}
 builders_core = {}
-state = {
-    "highlighted": {},
-    "text": {},
-}
-buttons = {}
-inputs = {}
+# element id -> builder id. Elements themselves are stored per builder
+id_builder_map = {}
 hash_id_map = {}
+# style name -> UIStyle, see style()
+style_classes = {}
+# options that only change how an element is painted, not its layout
+PAINT_OPTIONS = ("background_color", "border_color", "color")
+# box model options are resolved into spacing when a node is built
+BOX_MODEL_OPTIONS = ("border_width", "border_top", "border_right", "border_bottom", "border_left")
+# stateful texts that change get their own canvas, up to this many per
+# builder. The others are drawn together on the dynamic canvas
+TEXT_CANVAS_LIMIT = 8
+# builder methods that ui_elements_batch can call by id
+BATCH_ACTIONS = ("set_text", "highlight", "unhighlight", "highlight_briefly", "flash", "set_style", "animate", "stop_animation")
 
 @dataclass
 class BoxModelSpacing:
@@ -61,9 +76,33 @@ class BoxModelLayout:
         self.content_rect = Rect(content_x, content_y, content_width, content_height)
         self.content_children_rect = Rect(self.content_rect.x, self.content_rect.y, 0, 0)
 
+    def move_to(self, x: int, y: int):
+        """Move a cached layout to a new origin without changing its size."""
+        dx = x - self.margin_rect.x
+        dy = y - self.margin_rect.y
+        if not dx and not dy:
+            return
+        for rect in (self.margin_rect, self.border_rect, self.padding_rect, self.content_rect, self.content_children_rect):
+            rect.x += dx
+            rect.y += dy
+
     def accumulate_dimensions(self, rect: Rect):
         grow_rect(self.content_children_rect, rect)
         grow_rect(self.content_rect, rect)
+        self.resize_from_content()
+
+    def clamp(self, min_width: int = None, max_width: int = None, min_height: int = None, max_height: int = None):
+        """Clamp the border box to min and max sizes, by resizing the content box."""
+        border_width, border_height = self.border_rect.width, self.border_rect.height
+        width = clamp_length(border_width, min_width, max_width)
+        height = clamp_length(border_height, min_height, max_height)
+        if width == border_width and height == border_height:
+            return
+        self.content_rect.width += width - border_width
+        self.content_rect.height += height - border_height
+        self.resize_from_content()
+
+    def resize_from_content(self):
         self.padding_rect.width = self.content_rect.width + self.padding_spacing.left + self.padding_spacing.right
         self.padding_rect.height = self.content_rect.height + self.padding_spacing.top + self.padding_spacing.bottom
         self.border_rect.width = self.padding_rect.width + self.border_spacing.left + self.border_spacing.right
@@ -130,8 +169,9 @@ class LifecycleEvent:
         self.type = event_type
         self.builder_id = builder_id
         self.children_ids = []
-        if builder_id:
-            self.children_ids = [id for id in ids if ids[id]["builder_id"] == builder_id]
+        builder = builders_core.get(builder_id) if builder_id else None
+        if builder:
+            self.children_ids = list(builder.ids)
 
 def event_register_on_lifecycle(callback):
     if callback not in _event_subscribers["lifecycle"]:
@@ -151,6 +191,31 @@ def event_unregister_on_lifecycle(callback):
     if callback in _event_subscribers["lifecycle"]:
         _event_subscribers["lifecycle"].remove(callback)
 
+def register_element(builder_options: dict[str, any], id: str, box_model: "BoxModelLayout", options: "UIOptions", node: "UILayoutNode" = None):
+    """Store an element in its builder, and index which builder it belongs to."""
+    builder_options["ids"][id] = {
+        "box_model": box_model,
+        "options": options,
+        "node": node,
+        "builder_id": builder_options["id"]
+    }
+    id_builder_map[id] = builder_options["id"]
+
+def get_builder_for_id(id: str) -> Optional["UIBuilder"]:
+    builder_id = id_builder_map.get(id)
+    return builders_core.get(builder_id) if builder_id is not None else None
+
+def get_input(id: str) -> Optional[TextArea]:
+    builder = get_builder_for_id(id)
+    return builder.inputs.get(id) if builder else None
+
+def clamp_length(length: float, minimum: Optional[int], maximum: Optional[int]) -> float:
+    if maximum is not None and length > maximum:
+        length = maximum
+    if minimum is not None and length < minimum:
+        length = minimum
+    return length
+
 def grow_rect(orig_rect: Rect, new_rect: Rect):
     if new_rect.x < orig_rect.x:
         orig_rect.width += orig_rect.x - new_rect.x
@@ -199,6 +264,8 @@ class UIOptionsDict(TypedDict):
     color: str
     flex: int
     flex_direction: str
+    flex_shrink: int
+    flex_wrap: str
     justify_content: str
     highlight_color: str
     align_items: str
@@ -206,6 +273,10 @@ class UIOptionsDict(TypedDict):
     justify: str
     left: int
     margin: Margin
+    max_height: int
+    max_width: int
+    min_height: int
+    min_width: int
     opacity: float
     padding: Padding
     right: int
@@ -218,6 +289,9 @@ class UITextOptionsDict(UIOptionsDict):
     font_size: int
     font_weight: str
 
+class UIListViewOptionsDict(UITextOptionsDict):
+    visible_rows: int
+
 class UIInputTextOptionsDict(UIOptionsDict):
     id: str
     font_size: int
@@ -231,6 +305,8 @@ VALID_PROPS = (
 )
 
 class UIOptions:
+    # props resolved into other options in __init__, so a style can't just set them on a copy
+    DERIVED_PROPS = ("opacity",)
     id: str = None
     align: str = "start"
     background_color: str = None
@@ -245,6 +321,8 @@ class UIOptions:
     color: str = "FFFFFF"
     flex: int = None
     flex_direction: str = "column"
+    flex_shrink: int = 0
+    flex_wrap: str = "nowrap"
     gap: int = None
     height: int = 0
     highlight_color: str = None
@@ -253,6 +331,10 @@ class UIOptions:
     align_items: str = "flex_start"
     type: str = None
     margin: Margin = Margin(0, 0, 0, 0)
+    max_height: int = None
+    max_width: int = None
+    min_height: int = None
+    min_width: int = None
     opacity: float = None
     padding: Padding = Padding(0, 0, 0, 0)
     width: int = 0
@@ -291,6 +373,7 @@ class UITextOptions(UIOptions):
 
 @dataclass
 class UIInputTextOptions(UIOptions):
+    DERIVED_PROPS = ("opacity", "border_radius")
     id: str = None
     font_size: int = 16
     value: str = ""
@@ -307,6 +390,17 @@ class UIInputTextOptions(UIOptions):
         ) + max(8, kwargs.get('border_radius', 0))
         super().__init__(**kwargs)
 
+@dataclass
+class UIListViewOptions(UIOptions):
+    id: str = None
+    # for rows rendered as plain strings
+    font_size: int = 16
+    font_weight: str = "normal"
+    visible_rows: int = 10
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
 class Cursor:
     def __init__(self, screen: Screen):
         self.x = screen.x
@@ -327,7 +421,90 @@ class Cursor:
     def __str__(self):
         return f"Cursor Position: ({self.x}, {self.y}, {self.virtual_x}, {self.virtual_y})"
 
-class UIWithChildren:
+class UILayoutNode:
+    """
+    Caches the box model from virtual_render. It is reused until the
+    node's options or text change, or the size given to it by its
+    parent (flex) changes. Invalidating a node only invalidates its
+    ancestor chain, so unchanged siblings and subtrees are not
+    measured again.
+
+    Also keeps a structural hash of the node's options and its
+    children's hashes, updated as the tree is built, so a builder's
+    hash is ready by the time it is shown.
+    """
+    parent = None
+    layout_dirty = True
+    layout_size = None
+    options_hash = None
+    structure_hash = None
+    # main axis size given by the parent's flex layout, overrides options
+    flex_width = None
+    flex_height = None
+    # size without flex, to skip measuring again while the node is clean
+    intrinsic_size = None
+    # from the parent's content box, set by the parent's layout
+    layout_offset = (0, 0)
+    # translation from an offset animation, siblings don't move
+    render_offset = (0, 0)
+
+    def hash_options(self):
+        items = []
+        for key, value in sorted(vars(self.options).items()):
+            if callable(value):
+                continue
+            if isinstance(value, BoxModelSpacing):
+                value = (type(value).__name__, value.top, value.right, value.bottom, value.left)
+            try:
+                items.append(hash((key, value)))
+            except TypeError:
+                items.append(hash((key, repr(value))))
+        self.options_hash = hash(tuple(items))
+
+    def update_structure_hash(self):
+        """Rehash this node from its options and children, then its ancestors."""
+        if self.options_hash is None:
+            self.hash_options()
+        node = self
+        while node is not None:
+            children = getattr(node, "children", ())
+            node.structure_hash = hash((node.options_hash, tuple(child.structure_hash for child in children)))
+            node = node.parent
+
+    def invalidate_layout(self):
+        node = self
+        while node is not None and not node.layout_dirty:
+            node.layout_dirty = True
+            node = node.parent
+
+    def layout_dimensions(self) -> tuple[int, int]:
+        """Width and height to lay out with, from the parent's flex layout or the options."""
+        return (
+            self.flex_width if self.flex_width is not None else self.options.width,
+            self.flex_height if self.flex_height is not None else self.options.height,
+        )
+
+    def cached_layout(self, cursor: Cursor) -> Optional[Rect]:
+        if self.layout_dirty or self.box_model is None or self.layout_size != self.layout_dimensions():
+            return None
+        self.box_model.move_to(cursor.virtual_x, cursor.virtual_y)
+        return self.box_model.margin_rect
+
+    def commit_layout(self):
+        if render_profiler.enabled:
+            render_profiler.laid_out += 1
+        self.layout_dirty = False
+        self.layout_size = self.layout_dimensions()
+
+    def update_options(self, **kwargs):
+        """Change options in place and lay out this node again on the next draw."""
+        for key, value in kwargs.items():
+            setattr(self.options, key, value)
+        self.hash_options()
+        self.update_structure_hash()
+        self.invalidate_layout()
+
+class UIWithChildren(UILayoutNode):
     def __init__(self, options: UIOptions = None):
         self.options = options
         self.children = []
@@ -343,10 +520,13 @@ class UIWithChildren:
             for c in child:
                 if c:
                     self.check_invalid_child(c)
+                    c.parent = self
                     self.children.append(c)
         elif child:
             self.check_invalid_child(child)
+            child.parent = self
             self.children.append(child)
+        self.invalidate_layout()
 
     def __getitem__(self, children=None):
         if children is None:
@@ -355,6 +535,7 @@ class UIWithChildren:
             children = [children]
         for child in children:
             self.add_child(child)
+        self.update_structure_hash()
         return self
 
     def add_div(self, **kwargs: UIOptionsDict):
@@ -364,13 +545,15 @@ class UIWithChildren:
         container_options = UIOptions(**kwargs)
         container = UIBox(container_options)
         container.cursor = Point2d(self.cursor.x, self.cursor.y)
-        self.children.append(container)
+        self.add_child(container)
+        self.update_structure_hash()
         return container
 
     def add_text(self, text, **kwargs: UITextOptionsDict):
         text_options = UITextOptions(**kwargs)
         text = UIText(text, text_options)
-        self.children.append(text)
+        self.add_child(text)
+        self.update_structure_hash()
         return text
 
 class UIBox(UIWithChildren):
@@ -384,52 +567,232 @@ class UIBox(UIWithChildren):
         self.debug_number = 0
         self.debug_color = "red"
         self.debug_colors = iter(cycle(["red", "green", "blue", "yellow", "purple", "orange", "cyan", "magenta"]))
-
-    def virtual_render_child(self, c: SkiaCanvas, cursor: Cursor, child: UIWithChildren, i: int, move_after_last_child = True):
-        gap = self.options.gap or 0
-        if self.options.gap is None and child.type == "text" and self.children[i - 1].type == "text":
-            gap = 16
-        a_cursor = Point2d(cursor.virtual_x, cursor.virtual_y)
-        rect = child.virtual_render(c, cursor)
-        cursor.virtual_move_to(a_cursor.x, a_cursor.y)
-        if move_after_last_child or i != len(self.children) - 1:
-            if self.options.flex_direction == "column":
-                cursor.virtual_move_to(cursor.virtual_x, cursor.virtual_y + rect.height + gap)
-            elif self.options.flex_direction == "row":
-                cursor.virtual_move_to(cursor.virtual_x + rect.width + gap, cursor.virtual_y)
-        self.box_model.accumulate_dimensions(rect)
+        self.update_structure_hash()
 
     def virtual_render(self, c: SkiaCanvas, cursor: Cursor):
-        self.box_model = BoxModelLayout(cursor.virtual_x, cursor.virtual_y, self.options.margin, self.options.padding, self.options.border, self.options.width, self.options.height)
-        cursor.virtual_move_to(self.box_model.content_children_rect.x, self.box_model.content_children_rect.y)
+        if rect := self.cached_layout(cursor):
+            return rect
+        width, height = self.layout_dimensions()
+        self.box_model = BoxModelLayout(cursor.virtual_x, cursor.virtual_y, self.options.margin, self.options.padding, self.options.border, width, height)
         last_cursor = Point2d(cursor.virtual_x, cursor.virtual_y)
-
-        flex_children = []
-        for i, child in enumerate(self.children):
-            if child.options.flex:
-                flex_children.append(child)
-                continue
-            self.virtual_render_child(c, cursor, child, i, move_after_last_child=True)
-
-        if flex_children:
-            flex_weights = self.calculate_flex_weights(flex_children)
-            remaining_width = self.box_model.content_rect.width - self.box_model.content_children_rect.width
-            remaining_height = self.box_model.content_rect.height - self.box_model.content_children_rect.height
-
-            for i, child in enumerate(flex_children):
-                if self.options.flex_direction == "row":
-                    child.options.width = remaining_width * flex_weights[i]
-                elif self.options.flex_direction == "column":
-                    child.options.height = remaining_height * flex_weights[i]
-                self.virtual_render_child(c, cursor, child, i, move_after_last_child=False)
-
+        if self.children:
+            self.layout_children(c, cursor)
+        self.box_model.clamp(self.options.min_width, self.options.max_width, self.options.min_height, self.options.max_height)
         cursor.virtual_move_to(last_cursor.x, last_cursor.y)
+        self.commit_layout()
 
         return self.box_model.margin_rect
 
-    def calculate_flex_weights(self, flex_children):
-        total_flex = sum(child.options.flex for child in flex_children)
-        return [child.options.flex / total_flex for child in flex_children]
+    def gap_between(self, child, next_child) -> int:
+        if self.options.gap is not None:
+            return self.options.gap
+        return 16 if child.type == "text" and next_child.type == "text" else 0
+
+    def measure_child(self, c: SkiaCanvas, cursor: Cursor, child, axis: int = None, size: float = None) -> tuple[float, float]:
+        """Lay out a child, at its own size or with size on the main axis (0 = x, 1 = y)."""
+        child.flex_width = size if axis == 0 else None
+        child.flex_height = size if axis == 1 else None
+        cursor.virtual_move_to(self.box_model.content_rect.x, self.box_model.content_rect.y)
+        if render_profiler.enabled and child.id:
+            with render_profiler.subtree(child, "virtual_render"):
+                rect = child.virtual_render(c, cursor)
+        else:
+            rect = child.virtual_render(c, cursor)
+        if axis is None:
+            child.intrinsic_size = (rect.width, rect.height)
+        return rect.width, rect.height
+
+    def layout_children(self, c: SkiaCanvas, cursor: Cursor):
+        """
+        Flex layout: children are measured once at their own size (cached
+        per node), split into lines if wrapping, then only flex grow and
+        shrink children are measured again at their final size. Offsets
+        from the content box are kept for render, so render only arranges.
+        """
+        options = self.options
+        box_model = self.box_model
+        children = self.children
+        main, cross = (0, 1) if options.flex_direction == "row" else (1, 0)
+        content = box_model.content_rect
+        spacing = (
+            box_model.padding_spacing.left + box_model.padding_spacing.right + box_model.border_spacing.left + box_model.border_spacing.right,
+            box_model.padding_spacing.top + box_model.padding_spacing.bottom + box_model.border_spacing.top + box_model.border_spacing.bottom,
+        )
+        min_main, max_main = (options.min_width, options.max_width) if main == 0 else (options.min_height, options.max_height)
+        if self.layout_dimensions()[main]:
+            limit = (content.width, content.height)[main]
+        elif max_main:
+            limit = max_main - spacing[main]
+        else:
+            limit = None
+        wrap = options.flex_wrap == "wrap" and limit is not None
+
+        # measure pass, flex grow children wait for the remaining space
+        sizes = [None] * len(children)
+        # children sized by flex last time, whose own size is still cached
+        stale = set()
+        for i, child in enumerate(children):
+            if child.options.flex:
+                continue
+            if (child.flex_width is not None or child.flex_height is not None) and child.intrinsic_size and not child.layout_dirty:
+                sizes[i] = child.intrinsic_size
+                stale.add(i)
+            else:
+                sizes[i] = self.measure_child(c, cursor, child)
+
+        lines = [[]]
+        used = 0
+        for i, child in enumerate(children):
+            line = lines[-1]
+            child_main = sizes[i][main] if sizes[i] else 0
+            gap = self.gap_between(children[line[-1]], child) if line else 0
+            if wrap and line and used + gap + child_main > limit:
+                lines.append([])
+                line = lines[-1]
+                used = gap = 0
+            line.append(i)
+            used += gap + child_main
+
+        line_gap = options.gap or 0
+        children_main = children_cross = 0
+        placed_lines = []
+        for line in lines:
+            gaps = [0] + [self.gap_between(children[a], children[b]) for a, b in zip(line, line[1:])]
+            used = sum(sizes[i][main] for i in line if sizes[i]) + sum(gaps)
+            available = limit if limit is not None else max(used, (min_main or 0) - spacing[main])
+            free = available - used
+
+            growing = [i for i in line if sizes[i] is None]
+            if growing:
+                self.flex_grow(c, cursor, growing, sizes, free, main)
+                free = available - sum(sizes[i][main] for i in line) - sum(gaps)
+            elif free < 0 and not wrap:
+                shrinking = [i for i in line if children[i].options.flex_shrink and isinstance(children[i], UIBox)]
+                if shrinking:
+                    self.flex_shrink(c, cursor, shrinking, sizes, free, main)
+                    stale.difference_update(shrinking)
+                    free = available - sum(sizes[i][main] for i in line) - sum(gaps)
+
+            for i in line:
+                if i in stale:
+                    sizes[i] = self.measure_child(c, cursor, children[i])
+
+            count = len(line)
+            start = extra_gap = 0
+            if free > 0:
+                if options.justify_content == "space_between" and count > 1:
+                    extra_gap = free / (count - 1)
+                elif options.justify_content == "space_around":
+                    extra_gap = free / count
+                    start = extra_gap / 2
+                elif options.justify_content == "space_evenly":
+                    extra_gap = free / (count + 1)
+                    start = extra_gap
+            offsets = []
+            position = start
+            for k, i in enumerate(line):
+                position += gaps[k] + (extra_gap if k else 0)
+                offsets.append(position)
+                position += sizes[i][main]
+            line_main = available if extra_gap else position
+            line_cross = max(sizes[i][cross] for i in line)
+            placed_lines.append((line, offsets, line_main, line_cross, children_cross))
+            children_main = max(children_main, line_main)
+            children_cross += line_cross + (line_gap if len(placed_lines) < len(lines) else 0)
+
+        for line, offsets, line_main, line_cross, line_start in placed_lines:
+            shift = 0
+            if options.justify_content == "center":
+                shift = (children_main - line_main) // 2
+            elif options.justify_content == "flex_end":
+                shift = children_main - line_main
+            for i, offset in zip(line, offsets):
+                child_cross = sizes[i][cross]
+                if options.align_items == "center":
+                    cross_offset = line_cross // 2 - child_cross // 2
+                elif options.align_items == "flex_end":
+                    cross_offset = line_cross - child_cross
+                else:
+                    cross_offset = 0
+                child_offset = [0, 0]
+                child_offset[main] = shift + offset
+                child_offset[cross] = line_start + cross_offset
+                children[i].layout_offset = tuple(child_offset)
+
+        children_size = [0, 0]
+        children_size[main] = children_main
+        children_size[cross] = children_cross
+        # an explicit width or height stays fixed, children that don't fit overflow
+        if options.width and self.flex_width is None:
+            children_size[0] = min(children_size[0], content.width)
+        if options.height and self.flex_height is None:
+            children_size[1] = min(children_size[1], content.height)
+        box_model.accumulate_dimensions(Rect(content.x, content.y, *children_size))
+
+    def flex_frozen(self, items: list[int], targets: dict[int, float], main: int) -> list[int]:
+        """
+        Children whose border size missed their flex target, because of
+        min or max sizes or content. Like CSS, only the min violations are
+        frozen if the total violation is positive, only the max ones if it
+        is negative, and every child if it is zero.
+        """
+        violations = {}
+        for i in items:
+            border_rect = self.children[i].box_model.border_rect
+            violations[i] = (border_rect.width, border_rect.height)[main] - targets[i]
+        total = sum(violations.values())
+        if abs(total) < 0.5:
+            return list(items)
+        return [i for i in items if abs(violations[i]) >= 0.5 and (violations[i] > 0) == (total > 0)]
+
+    def flex_grow(self, c: SkiaCanvas, cursor: Cursor, growing: list[int], sizes: list, free: float, main: int):
+        """
+        Share free space between flex children by their flex. Children
+        clamped to a min or max size are frozen there, and the space they
+        took or left is shared again between the others.
+        """
+        children = self.children
+        growing = list(growing)
+        while growing:
+            share = max(0, free) / sum(children[i].options.flex for i in growing)
+            targets = {}
+            for i in growing:
+                targets[i] = share * children[i].options.flex
+                sizes[i] = self.measure_child(c, cursor, children[i], main, targets[i])
+            frozen = self.flex_frozen(growing, targets, main)
+            if len(frozen) == len(growing):
+                return
+            for i in frozen:
+                growing.remove(i)
+                free -= sizes[i][main]
+
+    def flex_shrink(self, c: SkiaCanvas, cursor: Cursor, shrinking: list[int], sizes: list, free: float, main: int):
+        """
+        Take overflow from flex_shrink children, by flex_shrink times their
+        size. Children that can't shrink that far are frozen, and the rest
+        of the overflow is taken from the others.
+        """
+        children = self.children
+        shrinking = list(shrinking)
+        base = {i: sizes[i][main] for i in shrinking}
+        # flex sizes are border box sizes, margins are outside
+        margins = {}
+        for i in shrinking:
+            box_model = children[i].box_model
+            margins[i] = (box_model.margin_rect.width - box_model.border_rect.width, box_model.margin_rect.height - box_model.border_rect.height)[main]
+        while shrinking:
+            total_shrink = sum(children[i].options.flex_shrink * base[i] for i in shrinking)
+            targets = {}
+            for i in shrinking:
+                target = base[i] + min(0, free) * children[i].options.flex_shrink * base[i] / total_shrink
+                targets[i] = max(1, target - margins[i])
+                sizes[i] = self.measure_child(c, cursor, children[i], main, targets[i])
+            frozen = self.flex_frozen(shrinking, targets, main)
+            if len(frozen) == len(shrinking):
+                return
+            for i in frozen:
+                shrinking.remove(i)
+                free -= sizes[i][main] - base[i]
 
     def draw_debug_number(self, c: SkiaCanvas, cursor: Cursor, new_color = False):
         if new_color:
@@ -528,95 +891,38 @@ class UIBox(UIWithChildren):
 
         return None
 
-    def move_cursor_to_align_axis_before_children_render(self, cursor: Cursor):
-        cursor.move_to(self.box_model.content_children_rect.x, self.box_model.content_children_rect.y)
-        if self.options.flex_direction == "row":
-            if self.options.align_items == "center":
-                cursor.move_to(cursor.x, cursor.y + self.box_model.content_children_rect.height // 2)
-            elif self.options.align_items == "flex_end":
-                cursor.move_to(cursor.x, cursor.y + self.box_model.content_children_rect.height)
-        else:
-            if self.options.align_items == "center":
-                cursor.move_to(cursor.x + self.box_model.content_children_rect.width // 2, cursor.y)
-            elif self.options.align_items == "flex_end":
-                cursor.move_to(cursor.x + self.box_model.content_children_rect.width, cursor.y)
-
-    def move_cursor_to_top_left_child_based_on_align_axis(self, cursor: Cursor, child):
-        if self.options.flex_direction == "row":
-            if self.options.align_items == "center":
-                cursor.move_to(cursor.x, cursor.y - child.box_model.margin_rect.height // 2)
-            elif self.options.align_items == "flex_end":
-                cursor.move_to(cursor.x, cursor.y - child.box_model.margin_rect.height)
-
-        elif self.options.flex_direction == "column":
-            if self.options.align_items == "center":
-                cursor.move_to(cursor.x - child.box_model.margin_rect.width // 2, cursor.y)
-            elif self.options.align_items == "flex_end":
-                cursor.move_to(cursor.x - child.box_model.margin_rect.width, cursor.y)
-
-    def move_cursor_from_top_left_child_to_next_child_along_align_axis(self, cursor: Cursor, child, rect: Rect, gap = 0):
-        if self.options.flex_direction == "row":
-            if self.options.align_items == "center":
-                cursor.move_to(cursor.x, cursor.y + child.box_model.margin_rect.height // 2)
-            elif self.options.align_items == "flex_end":
-                cursor.move_to(cursor.x, cursor.y + child.box_model.margin_rect.height)
-            cursor.move_to(cursor.x + rect.width + gap, cursor.y)
-        else:
-            if self.options.align_items == "center":
-                cursor.move_to(cursor.x + child.box_model.margin_rect.width // 2, cursor.y)
-            elif self.options.align_items == "flex_end":
-                cursor.move_to(cursor.x + child.box_model.margin_rect.width, cursor.y)
-            cursor.move_to(cursor.x, cursor.y + rect.height + gap)
-
     def render(self, c: SkiaCanvas, cursor: Cursor, builder_options: any):
-        global ids
-
         if view_state := self.debugger(c, cursor, True):
             return view_state
 
         self.box_model.prepare_render(cursor, self.options.flex_direction, self.options.align_items, self.options.justify_content)
         if self.id:
-            ids[self.id] = {
-                "box_model": self.box_model,
-                "options": self.options,
-                "builder_id": builder_options["id"]
-            }
+            register_element(builder_options, self.id, self.box_model, self.options, self)
 
         # self.debugger(c, cursor)
         self.render_borders(c, cursor)
         self.render_background(c, cursor)
         # if view_state := self.debugger(c, cursor, True):
         #     return view_state
-        self.move_cursor_to_align_axis_before_children_render(cursor)
         # self.debugger(c, cursor)
 
         last_cursor = Point2d(cursor.x, cursor.y)
-        for i, child in enumerate(self.children):
+        origin = self.box_model.content_children_rect
+        for child in self.children:
             if self.debugger_should_continue(c, cursor):
                 continue
 
-            self.move_cursor_to_top_left_child_based_on_align_axis(cursor, child)
+            # offsets were laid out in virtual_render
+            offset_x, offset_y = child.layout_offset
+            render_x, render_y = child.render_offset
+            cursor.move_to(origin.x + offset_x + render_x, origin.y + offset_y + render_y)
             # self.debugger(c, cursor, new_color=True)
 
-            child_last_cursor = Point2d(cursor.x, cursor.y)
-            rect = child.render(c, cursor, builder_options)
-            cursor.move_to(child_last_cursor.x, child_last_cursor.y)
-
-            if i == len(self.children) - 1:
-                break
-
-            # if self.debugger_should_continue(c, cursor):
-            #     continue
-
-            gap = self.options.gap or 0
-            if self.options.gap is None and child.type == "text" and self.children[i + 1].type == "text":
-                gap = 16
-
-            self.move_cursor_from_top_left_child_to_next_child_along_align_axis(cursor, child, rect, gap)
-            # self.debugger(c, cursor)
-
-        # if view_state := self.debugger(c, cursor, True):
-        #     return view_state
+            if render_profiler.enabled and child.id:
+                with render_profiler.subtree(child, "render"):
+                    child.render(c, cursor, builder_options)
+            else:
+                child.render(c, cursor, builder_options)
 
         cursor.move_to(last_cursor.x, last_cursor.y)
         # self.debugger(c, cursor)
@@ -629,7 +935,7 @@ class UIBox(UIWithChildren):
     def hide(self):
         raise NotImplementedError(f"div cannot use .hide() directly. Wrap it in a screen()[..] like this: \nmy_ui = None\n\n#show def\nglobal my_ui\n(screen, div, text) = actions.user.ui_elements(['screen', 'div', 'text'])\nmy_ui = screen()[\n  div()[\n    text('hello world')\n  ]\n]\nmy_ui.show()\n\n#hide def\nglobal my_ui\nmy_ui.hide()")
 
-class UIText:
+class UIText(UILayoutNode):
     def __init__(self, text: str, options: UITextOptions = None):
         self.options = options
         self.id = self.options.id
@@ -644,6 +950,7 @@ class UIText:
 
         if self.options.gap is None:
             self.options.gap = 16
+        self.update_structure_hash()
 
     def draw_debug_number(self, c: SkiaCanvas, cursor: Cursor, new_color = False):
         if new_color:
@@ -674,33 +981,39 @@ class UIText:
         return None
 
     def init_state(self, builder_options: dict[str, any]):
-        global ids, state, buttons
         render_now = True
         if self.id:
-            ids[self.id] = {
-                "box_model": self.box_model,
-                "options": self.options,
-                "builder_id": builder_options["id"]
-            }
+            register_element(builder_options, self.id, self.box_model, self.options, self)
+            buttons = builder_options["buttons"]
             if self.type == "button" and not buttons.get(self.id):
                 buttons[self.id] = {
                     "builder_id": builder_options["id"],
                     "is_hovering": False,
                     "on_click": self.options.on_click or (lambda: None)
                 }
-            if not state["text"].get(self.id):
-                state["text"][self.id] = self.text
+            text_state = builder_options["text"]
+            if not text_state.get(self.id):
+                text_state[self.id] = self.text
+            builder_options["text_ids"][self.id] = None
             render_now = False
         return render_now
 
+    def update_text(self, text: str):
+        """Change the laid out text. Only this node and its ancestors are measured again."""
+        text = str(text)
+        if text != self.text:
+            self.text = text
+            self.invalidate_layout()
+
     def virtual_render(self, c: SkiaCanvas, cursor: Cursor):
-        self.box_model = BoxModelLayout(cursor.virtual_x, cursor.virtual_y, self.options.margin, self.options.padding, self.options.border, self.options.width, self.options.height)
+        if rect := self.cached_layout(cursor):
+            return rect
+        self.box_model = BoxModelLayout(cursor.virtual_x, cursor.virtual_y, self.options.margin, self.options.padding, self.options.border, *self.layout_dimensions())
         cursor.virtual_move_to(self.box_model.content_children_rect.x, self.box_model.content_children_rect.y)
-        c.paint.textsize = self.options.font_size
-        c.paint.font.embolden = True if self.options.font_weight == "bold" else False
-        self.text_width = c.paint.measure_text(self.text)[1].width
-        self.text_height = c.paint.measure_text("E")[1].height
+        self.text_width, self.text_height = text_measure_cache.measure(c.paint, self.text, self.options.font_size, self.options.font_weight)
         self.box_model.accumulate_dimensions(Rect(cursor.virtual_x, cursor.virtual_y, self.text_width, self.text_height))
+        self.box_model.clamp(self.options.min_width, self.options.max_width, self.options.min_height, self.options.max_height)
+        self.commit_layout()
         return self.box_model.margin_rect
 
     def render_background(self, c: SkiaCanvas, cursor: Cursor):
@@ -716,8 +1029,6 @@ class UIText:
                 c.draw_rect(self.box_model.padding_rect)
 
     def render(self, c: SkiaCanvas, cursor: Cursor, builder_options: dict[str, any]):
-        global ids
-
         if view_state := self.debugger(c, cursor, True):
             return view_state
 
@@ -731,7 +1042,7 @@ class UIText:
 
         cursor.move_to(self.box_model.content_children_rect.x, self.box_model.content_children_rect.y)
         if self.id:
-            ids[self.id]["cursor"] = {
+            builder_options["ids"][self.id]["cursor"] = {
                 "x": cursor.x,
                 "y": cursor.y + self.text_height
             }
@@ -750,7 +1061,7 @@ class UIText:
     def hide(self):
         raise NotImplementedError(f"text cannot use .hide() directly. Wrap it in a screen()[..] like this: \nmy_ui = None\n\n#show def\nglobal my_ui\n(screen, div, text) = actions.user.ui_elements(['screen', 'div', 'text'])\nmy_ui = screen()[\n  div()[\n    text('hello world')\n  ]\n]\nmy_ui.show()\n\n#hide def\nglobal my_ui\nmy_ui.hide()")
 
-class UIInputText:
+class UIInputText(UILayoutNode):
     def __init__(self, options: UIInputTextOptions = None):
         self.options = options
         self.id = self.options.id
@@ -768,6 +1079,7 @@ class UIInputText:
 
         if self.options.gap is None:
             self.options.gap = 16
+        self.update_structure_hash()
 
     def draw_debug_number(self, c: SkiaCanvas, cursor: Cursor, new_color = False):
         if new_color:
@@ -779,14 +1091,17 @@ class UIInputText:
         c.draw_text(str(self.debug_number), cursor.x, cursor.y)
 
     def virtual_render(self, c: SkiaCanvas, cursor: Cursor):
-        self.box_model = BoxModelLayout(cursor.virtual_x, cursor.virtual_y, self.options.margin, self.options.padding, self.options.border, self.options.width, self.options.height)
+        if rect := self.cached_layout(cursor):
+            return rect
+        self.box_model = BoxModelLayout(cursor.virtual_x, cursor.virtual_y, self.options.margin, self.options.padding, self.options.border, *self.layout_dimensions())
         cursor.virtual_move_to(self.box_model.content_children_rect.x, self.box_model.content_children_rect.y)
         c.paint.textsize = self.options.font_size
         self.box_model.accumulate_dimensions(Rect(cursor.virtual_x, cursor.virtual_y, self.width, self.height))
+        self.commit_layout()
         return self.box_model.margin_rect
 
     def render(self, c: SkiaCanvas, cursor: Cursor, builder_options: dict[str, any]):
-        global ids, inputs, debug_current_step, render_step, debug_points, debug_numbers, debug_draw_step_by_step
+        global debug_current_step, render_step, debug_points, debug_numbers, debug_draw_step_by_step
 
         if debug_draw_step_by_step:
             render_step += 1
@@ -796,11 +1111,7 @@ class UIInputText:
         self.box_model.prepare_render(cursor, self.options.flex_direction, self.options.align_items, self.options.justify_content)
 
         if self.id:
-            ids[self.id] = {
-                "box_model": self.box_model,
-                "options": self.options,
-                "builder_id": builder_options["id"]
-            }
+            register_element(builder_options, self.id, self.box_model, self.options, self)
         cursor.move_to(self.box_model.padding_rect.x, self.box_model.padding_rect.y)
 
         if debug_points:
@@ -824,11 +1135,15 @@ class UIInputText:
 
         cursor.move_to(self.box_model.content_children_rect.x, self.box_model.content_children_rect.y)
         if self.id:
-            ids[self.id]["cursor"] = {
+            builder_options["ids"][self.id]["cursor"] = {
                 "x": cursor.x,
                 "y": cursor.y + self.height
             }
 
+        inputs = builder_options["inputs"]
+        if inputs.get(self.id):
+            # re-rendered e.g. after an update, replace the previous text area
+            inputs[self.id].hide()
         text_area = TextArea()
         text_area.theme = DarkThemeLabels(
             title_size=0,
@@ -869,6 +1184,75 @@ class UIInputText:
     def hide(self):
         raise NotImplementedError(f"text cannot use .hide() directly. Wrap it in a screen()[..] like this: \nmy_ui = None\n\n#show def\nglobal my_ui\n(screen, div, text) = actions.user.ui_elements(['screen', 'div', 'text'])\nmy_ui = screen()[\n  div()[\n    text('hello world')\n  ]\n]\nmy_ui.show()\n\n#hide def\nglobal my_ui\nmy_ui.hide()")
 
+class UIListView(UIBox):
+    """
+    Only the visible window of rows are children, so layout and paint
+    cost the same for 20 or 2000 items. Rows that stay in the window keep
+    their node and cached layout when scrolling. Rows rendered as plain
+    strings also reuse the text nodes that scrolled out of the window.
+    """
+    def __init__(self, items: Sequence, render_row: Callable = None, options: UIListViewOptions = None):
+        super().__init__(options)
+        self.type = "list_view"
+        self.items = items
+        self.render_row = render_row
+        self.offset = 0
+        # item index -> row node, for the visible window
+        self.rows = {}
+        self.fill_window()
+
+    @property
+    def max_offset(self) -> int:
+        return max(0, len(self.items) - self.options.visible_rows)
+
+    def build_row(self, index: int, recycled: list):
+        item = self.items[index]
+        row = self.render_row(item) if self.render_row else item
+        if not isinstance(row, str):
+            return row
+        for i, node in enumerate(recycled):
+            if isinstance(node, UIText) and not node.id:
+                recycled.pop(i)
+                node.update_text(row)
+                return node
+        return text(row, font_size=self.options.font_size, font_weight=self.options.font_weight, color=self.options.color)
+
+    def fill_window(self, keep_rows: bool = True) -> list:
+        """Build the rows of the visible window. Returns rows that left it."""
+        start = self.offset
+        end = min(len(self.items), start + self.options.visible_rows)
+        kept = {index: row for index, row in self.rows.items() if start <= index < end} if keep_rows else {}
+        recycled = [row for row in self.rows.values() if row not in kept.values()]
+        rows = {}
+        for index in range(start, end):
+            row = kept.get(index)
+            rows[index] = row if row is not None else self.build_row(index, recycled)
+        self.rows = rows
+        self.children = []
+        self.add_child(tuple(rows.values()))
+        self.update_structure_hash()
+        return recycled
+
+    def scroll_to(self, index: int) -> Optional[list]:
+        """Move the window to start at index. Returns rows that left it, None if it didn't move."""
+        offset = max(0, min(index, self.max_offset))
+        if offset == self.offset:
+            return None
+        self.offset = offset
+        return self.fill_window()
+
+    def set_items(self, items: Sequence, render_row: Callable = None) -> list:
+        """New data source, keeping the scroll position. Returns rows that left the window."""
+        self.items = items
+        self.render_row = render_row
+        self.offset = min(self.offset, self.max_offset)
+        return self.fill_window(keep_rows=False)
+
+    def render(self, c: SkiaCanvas, cursor: Cursor, builder_options: any):
+        if self.id:
+            builder_options["list_views"][self.id] = self
+        return super().render(c, cursor, builder_options)
+
 def draw_text_simple(c, text, options, x, y):
     c.paint.color = options.color
     c.paint.textsize = options.font_size
@@ -886,20 +1270,84 @@ class UIBuilder(UIBox):
         self.highlight_canvas = None
         self.blockable_canvases = []
         self.unhighlight_jobs = {}
+        self.scroll_jobs = {}
         self.highlight_color = options.get("highlight_color")
         self.hash = None
         self.is_mounted = False
+        self.blockable_dirty = False
+        self.button_grid = HitTestGrid()
+        self.hovered_id = None
+        # static repaint after an animation, layout and text canvases are unchanged
+        self.repaint_only = False
+        # an offset animation moved elements since the last static paint
+        self.offset_moved = False
+        # id -> colors at full opacity, while opacity is animated
+        self.tween_base_colors: dict[str, tuple] = {}
+        # id -> color
+        self.highlighted: dict[str, str] = {}
+        # ids fading out their highlight, so repeated fades don't restart it
+        self.fading_ids: dict[str, None] = {}
+        # id -> (shape, is_round_rect), built once per layout
+        self.highlight_shapes: dict[str, tuple] = {}
+        self.render_scheduler = RenderScheduler({
+            "dynamic": self.freeze_dynamic,
+            "highlight": self.freeze_highlight,
+            "text": self.freeze_dirty_texts,
+            "static": self.repaint_static,
+            "layout": self.relayout,
+        })
         opts = UIOptions(**options or {})
         super().__init__(opts)
         if not self.id:
             self.id = uuid.uuid4()
+        # elements of this builder by id, so teardown doesn't scan other builders
+        self.ids: dict[str, dict] = {}
+        self.text_state: dict[str, str] = {}
+        self.buttons: dict[str, dict] = {}
+        self.inputs: dict[str, TextArea] = {}
+        # stateful text ids of this builder, in render order
+        self.text_ids: dict[str, None] = {}
+        # text ids drawn on their own canvas instead of the dynamic canvas
+        self.text_canvas_ids: dict[str, None] = {}
+        self.text_canvases: dict[str, Canvas] = {}
+        # id -> position each text on the dynamic canvas was drawn at
+        self.dynamic_text_positions: dict[str, tuple] = {}
+        # id -> rect, text position and options the text canvas was painted with
+        self.text_canvas_keys: dict[str, tuple] = {}
+        self.dirty_text_ids: dict[str, None] = {}
+        self.list_views: dict[str, UIListView] = {}
         self.builder_options = {
-            "id": options.get("id") or self.id
+            "id": options.get("id") or self.id,
+            "ids": self.ids,
+            "text": self.text_state,
+            "buttons": self.buttons,
+            "inputs": self.inputs,
+            "text_ids": self.text_ids,
+            "list_views": self.list_views,
         }
 
     def on_draw_static(self, c: SkiaCanvas):
-        self.virtual_render(c, self.cursor)
-        self.render(c, self.cursor, self.builder_options)
+        # layout is cached per node, so this only measures nodes that changed
+        with render_profiler.phase(self.id, "virtual_render", self):
+            self.virtual_render(c, self.cursor)
+        with render_profiler.phase(self.id, "render"):
+            self.render(c, self.cursor, self.builder_options)
+        if self.repaint_only and self.dynamic_canvas:
+            self.repaint_only = False
+            if self.offset_moved:
+                # same layout, but moved elements take their text, hit test and highlight along
+                self.offset_moved = False
+                self.build_button_grid()
+                self.build_highlight_shapes()
+                self.update_text_canvases()
+                if self.dynamic_texts_moved():
+                    self.render_scheduler.request("dynamic")
+                if self.highlighted:
+                    self.render_scheduler.request("highlight")
+            return
+        self.repaint_only = False
+        self.build_button_grid()
+        self.build_highlight_shapes()
 
         if not self.dynamic_canvas:
             screen = get_screen(self.screen)
@@ -913,57 +1361,193 @@ class UIBuilder(UIBox):
         # dynamic canvas depends on static canvas first
         self.dynamic_canvas.freeze()
 
-    def on_draw_dynamic(self, c: SkiaCanvas):
-        global state
-        for id in list(state["text"]):
-            if id in ids:
-                if ids[id]["builder_id"] == self.id:
-                    options = ids[id]["options"]
-                    cursor = ids[id]["cursor"]
-                    draw_text_simple(c, state["text"][id], options, cursor["x"], cursor["y"])
-            else:
+        if self.blockable_dirty and self.is_mounted:
+            # buttons or inputs moved after an update
+            self.blockable_dirty = False
+            self.close_blockable_canvases()
+            with render_profiler.phase(self.id, "blockable"):
+                self.init_blockable_canvases()
+
+    def freeze_dynamic(self):
+        if self.dynamic_canvas:
+            self.dynamic_canvas.freeze()
+
+    def freeze_dirty_texts(self):
+        if self.dynamic_canvas and any(id not in self.text_canvases for id in self.dirty_text_ids):
+            # drawn on the dynamic canvas, or getting its own canvas there.
+            # That draw also repaints the dirty text canvases
+            self.dynamic_canvas.freeze()
+            return
+        for id in self.dirty_text_ids:
+            if canvas := self.text_canvases.get(id):
+                canvas.freeze()
+        self.dirty_text_ids.clear()
+
+    def freeze_highlight(self):
+        if self.highlight_canvas:
+            self.highlight_canvas.freeze()
+
+    def repaint_static(self):
+        """Paint the static canvas again without touching layout or the other canvases."""
+        if self.static_canvas:
+            self.repaint_only = True
+            self.static_canvas.freeze()
+
+    def render_stats(self) -> dict[str, dict]:
+        """Redraws requested vs redraws done per canvas"""
+        return self.render_scheduler.stats()
+
+    def text_rects(self) -> dict[str, tuple[float, float, float, float]]:
+        """
+        (x, y, width, height) of each stateful text canvas. They extend to
+        the right in case the text grows, up to the next text on the same
+        line or the edge of the UI, and below for descenders since line
+        height is measured from "E".
+        """
+        right = self.box_model.content_rect.x + self.box_model.content_rect.width
+        padding_rects = {}
+        for id in self.text_ids:
+            element = self.ids.get(id)
+            if not element:
                 print(f"Could not update state on ID {id}. ID not found.")
+                continue
+            padding_rects[id] = element["box_model"].padding_rect
+        rects = {}
+        for id, rect in padding_rects.items():
+            limit = right
+            for other in padding_rects.values():
+                if rect.x + rect.width <= other.x < limit and other.y < rect.y + rect.height and rect.y < other.y + other.height:
+                    limit = other.x
+            descender = self.ids[id]["options"].font_size // 3
+            rects[id] = (rect.x, rect.y, max(rect.width, limit - rect.x), rect.height + descender)
+        return rects
+
+    def on_draw_dynamic(self, c: SkiaCanvas):
+        """
+        Stateful texts are drawn here, except those that changed, which
+        get their own canvas over their rect up to TEXT_CANVAS_LIMIT, so
+        set_text only repaints that rect instead of the whole screen. This
+        runs after every layout, so text canvases are kept, and only moved
+        or repainted when their text, rect or options changed.
+        """
+        with render_profiler.phase(self.id, "dynamic"):
+            self.dynamic_text_positions.clear()
+            for id in self.text_ids:
+                if id in self.text_canvas_ids:
+                    continue
+                element = self.ids.get(id)
+                if not element:
+                    print(f"Could not update state on ID {id}. ID not found.")
+                    continue
+                cursor = element["cursor"]
+                draw_text_simple(c, self.text_state[id], element["options"], cursor["x"], cursor["y"])
+                self.dynamic_text_positions[id] = (cursor["x"], cursor["y"])
+            self.update_text_canvases()
 
         self.on_fully_rendered()
 
+    def update_text_canvases(self):
+        """Create, move or repaint text canvases whose text, rect or options changed."""
+        rects = {id: rect for id, rect in self.text_rects().items() if id in self.text_canvas_ids}
+        for id in [id for id in self.text_canvases if id not in rects]:
+            self.close_text_canvas(id)
+        for id, rect in rects.items():
+            element = self.ids[id]
+            cursor = element["cursor"]
+            key = (rect, cursor["x"], cursor["y"], element["node"].options_hash)
+            canvas = self.text_canvases.get(id)
+            if not canvas:
+                canvas = Canvas.from_rect(Rect(*rect))
+                canvas.register("draw", lambda c, id=id: self.on_draw_text(c, id))
+                self.text_canvases[id] = canvas
+            elif self.text_canvas_keys[id][0] != rect:
+                canvas.rect = Rect(*rect)
+            elif self.text_canvas_keys[id] == key and id not in self.dirty_text_ids:
+                continue
+            self.text_canvas_keys[id] = key
+            canvas.freeze()
+        self.dirty_text_ids.clear()
+
+    def on_draw_text(self, c: SkiaCanvas, id: str):
+        element = self.ids.get(id)
+        if element and id in self.text_state:
+            with render_profiler.phase(self.id, "text"):
+                cursor = element["cursor"]
+                draw_text_simple(c, self.text_state[id], element["options"], cursor["x"], cursor["y"])
+
+    def close_text_canvas(self, id: str):
+        if canvas := self.text_canvases.pop(id, None):
+            canvas.hide()
+            canvas.close()
+        self.text_canvas_keys.pop(id, None)
+
+    def dynamic_texts_moved(self) -> bool:
+        """Whether a text drawn on the dynamic canvas has moved since, e.g. with an offset animation."""
+        for id, position in self.dynamic_text_positions.items():
+            element = self.ids.get(id)
+            if element and (element["cursor"]["x"], element["cursor"]["y"]) != position:
+                return True
+        return False
+
+    def use_text_canvas(self, id: str):
+        """Move a changing stateful text to its own canvas, while under TEXT_CANVAS_LIMIT."""
+        if id in self.text_ids and id not in self.text_canvas_ids and len(self.text_canvas_ids) < TEXT_CANVAS_LIMIT:
+            self.text_canvas_ids[id] = None
+
+    def close_text_canvases(self):
+        for canvas in self.text_canvases.values():
+            canvas.hide()
+            canvas.close()
+        self.text_canvases = {}
+        self.text_canvas_keys = {}
+
     def on_fully_rendered(self):
         if not self.is_mounted:
             self.is_mounted = True
 
-            self.init_blockable_canvases()
+            with render_profiler.phase(self.id, "blockable"):
+                self.init_blockable_canvases()
 
             if self.on_mount:
                 self.on_mount()
 
             cron.after("10ms", lambda: event_fire_on_mount(self.id))
 
-    def on_draw_highlight(self, c: SkiaCanvas):
-        global state
-        for id in list(state["highlighted"]):
-            if id in ids:
-                if ids[id]["builder_id"] == self.id:
-                    box_model = ids[id]["box_model"]
-                    c.paint.color = state["highlighted"][id]
-                    c.paint.style = c.paint.Style.FILL
-
-                    if 'options' in ids[id] and hasattr(ids[id]['options'], 'border_radius'):
-                        border_radius = ids[id]['options'].border_radius
-                        c.draw_rrect(RoundRect.from_rect(box_model.padding_rect, x=border_radius, y=border_radius))
-                    else:
-                        c.draw_rect(box_model.padding_rect)
+    def build_highlight_shapes(self):
+        """Highlight shapes for every id of this builder, so highlighting doesn't build them each draw"""
+        self.highlight_shapes = {}
+        for id, element in self.ids.items():
+            rect = element["box_model"].padding_rect
+            border_radius = getattr(element["options"], "border_radius", 0)
+            if border_radius:
+                self.highlight_shapes[id] = (RoundRect.from_rect(rect, x=border_radius, y=border_radius), True)
             else:
-                print(f"Could not highlight ID {id}. ID not found.")
+                self.highlight_shapes[id] = (rect, False)
+
+    def on_draw_highlight(self, c: SkiaCanvas):
+        with render_profiler.phase(self.id, "highlight"):
+            c.paint.style = c.paint.Style.FILL
+            for id, color in self.highlighted.items():
+                shape = self.highlight_shapes.get(id)
+                if shape is None:
+                    print(f"Could not highlight ID {id}. ID not found.")
+                    continue
+                c.paint.color = color
+                if shape[1]:
+                    c.draw_rrect(shape[0])
+                else:
+                    c.draw_rect(shape[0])
 
     def init_blockable_canvases(self):
         """
         If we have at least one button or input, then we will consider the whole content area as blockable.
         If we have an inputs, then everything should be blockable except for those inputs.
         """
-        if buttons or inputs:
+        if self.buttons or self.inputs:
             full_rect = self.box_model.content_children_rect
-            if inputs:
+            if self.inputs:
                 bottom_rect = None
-                for input in list(inputs.values()):
+                for input in list(self.inputs.values()):
                     current_rect = bottom_rect or full_rect
 
                     top_rect = Rect(current_rect.x, current_rect.y, current_rect.width, input.rect.y - current_rect.y)
@@ -986,35 +1570,22 @@ class UIBuilder(UIBox):
                 blockable_canvas.freeze()
 
     def generate_hash_from_tree(self):
-        def collect_options_and_children(obj):
-            tree = {}
-
-            if hasattr(obj, 'options'):
-                tree['options'] = {k: v for k, v in vars(obj.options).items() if not callable(v)}
-
-            if hasattr(obj, 'children'):
-                tree['children'] = [
-                    collect_options_and_children(child) for child in obj.children
-                ]
-
-            return tree
-
-        state_to_serialize = collect_options_and_children(self)
-        serialized_self = pickle.dumps(state_to_serialize)
-        self.hash = hashlib.md5(serialized_self).hexdigest()
+        """Structural hash of options and children, already kept up to date while building the tree."""
+        self.hash = self.structure_hash
 
     def hash_and_prevent_duplicate_render(self):
         global hash_id_map
         self.generate_hash_from_tree()
 
-        if hash_id_map.get(self.hash):
+        # showing the same builder again re-renders it in place
+        if hash_id_map.get(self.hash) and hash_id_map[self.hash] != self.id:
             builder = builders_core.get(hash_id_map[self.hash])
             getattr(builder, "hide", lambda: None)()
 
         hash_id_map[self.hash] = self.id
 
     def show(self, on_mount: callable = None):
-        global state, debug_current_step, render_step, debug_start_step, debug_draw_step_by_step
+        global debug_current_step, render_step, debug_start_step, debug_draw_step_by_step
 
         self.hash_and_prevent_duplicate_render()
 
@@ -1050,64 +1621,412 @@ class UIBuilder(UIBox):
             # Other: highlight_canvas triggered manually
             self.static_canvas.freeze()
 
+    def build_button_grid(self):
+        """Index button rects once per layout, for hit testing on mouse events"""
+        self.button_grid.clear()
+        for id in self.buttons:
+            if id in self.ids:
+                self.button_grid.insert(id, self.ids[id]["box_model"].padding_rect)
+        if self.hovered_id and self.hovered_id not in self.buttons:
+            self.hovered_id = None
+
+    def set_hovered(self, id: str):
+        if self.hovered_id == id:
+            return
+        if self.hovered_id in self.buttons:
+            self.buttons[self.hovered_id]["is_hovering"] = False
+            self.unhighlight(self.hovered_id)
+        self.hovered_id = id
+        if id:
+            self.buttons[id]["is_hovering"] = True
+            self.highlight(id)
+
     def on_mouse(self, e):
         if e.event == "mousemove":
-            for id, button in list(buttons.items()):
-                if button["builder_id"] == self.id:
-                    rect = ids[id]["box_model"].padding_rect
-                    hovering = rect.contains(e.gpos)
-                    if state["highlighted"].get(id) != hovering:
-                        if hovering:
-                            self.highlight(id)
-                        else:
-                            self.unhighlight(id)
+            # only does work when entering or leaving a button
+            self.set_hovered(self.button_grid.query(e.gpos.x, e.gpos.y))
         elif e.event == "mousedown":
-            for id, button in list(buttons.items()):
-                if button["builder_id"] == self.id:
-                    rect = ids[id]["box_model"].padding_rect
-                    if rect.contains(e.gpos):
-                        button["on_click"]()
+            id = self.button_grid.query(e.gpos.x, e.gpos.y)
+            if id and id in self.buttons:
+                self.buttons[id]["on_click"]()
 
     def get_ids(self):
-        return ids
+        return self.ids
 
     def set_text(self, id: str, text: str):
-        global state
-
-        state["text"][id] = text
-        if self.dynamic_canvas:
-            self.dynamic_canvas.freeze()
+        if self.text_state.get(id) == text and id in self.text_ids:
+            return
+        self.text_state[id] = text
+        if id in self.text_ids:
+            self.use_text_canvas(id)
+            self.dirty_text_ids[id] = None
+            self.render_scheduler.request("text")
+        elif self.dynamic_canvas:
+            self.render_scheduler.request("dynamic")
 
     def highlight(self, id: str, color: str = None):
-        global state
-        if id in ids:
-            state["highlighted"][id] = color or self.highlight_color or "FFFFFF88"
-            self.highlight_canvas.freeze()
-
-    def unhighlight(self, id: str):
-        global state
-        if id in ids and id in state["highlighted"]:
-            state["highlighted"].pop(id)
+        if id in self.ids:
+            tween_ticker.cancel(self.id, id, "highlight")
+            self.fading_ids.pop(id, None)
+            color = color or self.highlight_color or "FFFFFF88"
+            if self.highlighted.get(id) == color:
+                return
+            self.highlighted[id] = color
+            if self.highlight_canvas:
+                self.render_scheduler.request("highlight")
+
+    def unhighlight(self, id: str, fade_ms: int = 0):
+        if id in self.ids and id in self.highlighted:
+            if fade_ms:
+                if id in self.fading_ids:
+                    # let the running fade finish instead of restarting it
+                    return
+                color = self.highlighted[id]
+                self.fading_ids[id] = None
+                self.animate(id, "highlight", with_alpha(color, 0), fade_ms, on_done=lambda: self.unhighlight(id))
+                return
+            tween_ticker.cancel(self.id, id, "highlight")
+            self.fading_ids.pop(id, None)
+            self.highlighted.pop(id)
 
             if self.unhighlight_jobs.get(id):
                 cron.cancel(self.unhighlight_jobs[id][0])
                 self.unhighlight_jobs[id][1]()
                 self.unhighlight_jobs[id] = None
 
-            self.highlight_canvas.freeze()
+            if self.highlight_canvas:
+                self.render_scheduler.request("highlight")
 
     def highlight_briefly(self, id: str, color: str = None, duration: int = 150):
-        if id in ids:
+        if id in self.ids:
             self.highlight(id, color)
             pending_unhighlight = lambda: self.unhighlight(id)
             self.unhighlight_jobs[id] = (cron.after(f"{duration}ms", pending_unhighlight), pending_unhighlight)
 
+    def flash(self, id: str, color: str = None, duration: int = 300):
+        """Highlight and fade out, e.g. on a key press. Runs on the shared animation ticker, not its own cron job."""
+        if id in self.ids:
+            self.highlight(id, color)
+            self.unhighlight(id, fade_ms=duration)
+
+    def animate(self, id: str, prop: str, to, duration: int = 300, easing: str = "ease_out", on_done: Callable = None) -> bool:
+        """
+        Animate a property of an element from its current value. prop is
+        one of highlight, background_color, opacity, offset or width.
+        Returns False if the id isn't shown.
+        ```py
+        my_ui.animate("box", "opacity", 0.2, 500)
+        my_ui.animate("box", "offset", (0, -20))
+        ```
+        """
+        if prop not in TWEEN_PROPERTIES:
+            raise ValueError(f"Can't animate {prop}. Animated properties are: {', '.join(TWEEN_PROPERTIES)}")
+        if easing not in EASINGS:
+            raise ValueError(f"Unknown easing {easing}. Easings are: {', '.join(EASINGS)}")
+        element = self.ids.get(id)
+        if not element or not self.static_canvas:
+            return False
+        options = element["options"]
+        if prop == "highlight":
+            start = self.highlighted.get(id) or with_alpha(to, 0)
+        elif prop == "background_color":
+            start = options.background_color or with_alpha(to, 0)
+        elif prop == "opacity":
+            start = options.opacity if options.opacity is not None else 1.0
+        elif prop == "offset":
+            start = element["node"].render_offset
+            to = tuple(to)
+        else:
+            start = options.width or element["box_model"].border_rect.width
+        tween_ticker.start(Tween(self, id, prop, start, to, duration, easing, tween_ticker.now(), on_done))
+        return True
+
+    def set_style(self, id: str, props: dict) -> bool:
+        """
+        Change options of an element. Colors only repaint the static
+        canvas, other options lay out again. Returns False if the id isn't
+        shown.
+        """
+        element = self.ids.get(id)
+        if not element:
+            print(f"Could not set style on ID {id}. ID not found.")
+            return False
+        props = get_props(props, None)
+        box_model_props = [key for key in props if key.startswith(("margin", "padding")) or key in BOX_MODEL_OPTIONS]
+        if box_model_props:
+            raise ValueError(f"Can't set {', '.join(box_model_props)} on a shown element. Use update() with a new tree instead.")
+        node = element["node"]
+        if all(key in PAINT_OPTIONS for key in props):
+            # same size, so the cached layout stays valid
+            for key, value in props.items():
+                setattr(node.options, key, value)
+            node.hash_options()
+            node.update_structure_hash()
+            if id in self.text_ids:
+                self.dirty_text_ids[id] = None
+                self.render_scheduler.request("text")
+            self.render_scheduler.request("static")
+        else:
+            node.update_options(**props)
+            self.render_scheduler.request("layout")
+        return True
+
+    def stop_animation(self, id: str, prop: str = None):
+        """Stop animating an element where it is."""
+        tween_ticker.cancel(self.id, id, prop)
+        if prop in (None, "highlight"):
+            self.fading_ids.pop(id, None)
+
+    def apply_tween(self, id: str, prop: str, value) -> Optional[tuple[str, ...]]:
+        """Set an animated value. Returns the canvases to redraw, or None if the element is gone."""
+        element = self.ids.get(id)
+        if not element or not self.static_canvas:
+            return None
+        options = element["options"]
+        if prop == "highlight":
+            self.highlighted[id] = value
+            return ("highlight",)
+        if prop == "offset":
+            # layout is unchanged, render moves the element and its children
+            element["node"].render_offset = value
+            self.offset_moved = True
+            return ("static",)
+        if prop == "width":
+            element["node"].update_options(width=value)
+            return ("layout",)
+        if prop == "background_color":
+            options.background_color = value
+        else:
+            if id not in self.tween_base_colors:
+                opacity = options.opacity or 1.0
+                self.tween_base_colors[id] = tuple(
+                    scale_alpha(color, 1 / opacity) if color else None
+                    for color in (options.background_color, options.border_color, options.color)
+                )
+            background_color, border_color, color = self.tween_base_colors[id]
+            options.opacity = value
+            options.background_color = background_color and scale_alpha(background_color, value)
+            options.border_color = border_color and scale_alpha(border_color, value)
+            options.color = color and scale_alpha(color, value)
+        if id in self.text_ids:
+            # its text is drawn on its own canvas or the dynamic canvas
+            self.dirty_text_ids[id] = None
+            return ("static", "text")
+        return ("static",)
+
+    def redraw_tweened(self, names: dict[str, None]):
+        """Redraw each canvas touched by this frame's animations once."""
+        if "layout" in names:
+            # relayout paints static and places text canvases
+            self.render_scheduler.request("layout")
+            names = [name for name in names if name not in ("layout", "static", "text")]
+        for name in names:
+            self.render_scheduler.request(name)
+
+    def close_blockable_canvases(self):
+        for canvas in self.blockable_canvases:
+            canvas.unregister("mouse", self.on_mouse)
+            canvas.hide()
+            canvas.close()
+        self.blockable_canvases = []
+
+    def update(self, new_tree: "UIBuilder") -> dict[str, int]:
+        """
+        Diff a new tree against this mounted one and patch it in place,
+        instead of hiding and showing a new one. Nodes are matched by id,
+        otherwise by type and position. Unchanged nodes keep their cached
+        layout, and highlight and text state of surviving ids is kept.
+        Returns the number of nodes added, removed, patched and text changes.
+        ```py
+        my_ui = screen()[div()[text("a")]]
+        my_ui.show()
+        my_ui.update(screen()[div()[text("a"), text("b")]])
+        ```
+        """
+        # the new tree is only a description, it never gets shown
+        if builders_core.get(new_tree.id) is new_tree:
+            builders_core.pop(new_tree.id)
+        builders_core[self.id] = self
+        changes = {"added": 0, "removed": 0, "patched": 0, "text": 0, "layout": 0}
+
+        if new_tree.options.id != self.options.id:
+            new_tree.options.id = self.options.id
+            new_tree.hash_options()
+        if self.options_hash != new_tree.options_hash:
+            self.options = new_tree.options
+            self.highlight_color = new_tree.highlight_color
+            self.hash_options()
+            self.invalidate_layout()
+            changes["patched"] += 1
+            changes["layout"] += 1
+        self.reconcile_children(self, new_tree, changes)
+
+        hash_id_map.pop(self.hash, None)
+        self.generate_hash_from_tree()
+        hash_id_map[self.hash] = self.id
+
+        if not self.static_canvas:
+            return changes
+
+        if changes["layout"]:
+            self.relayout()
+        elif changes["text"]:
+            self.render_scheduler.request("text")
+        return changes
+
+    def relayout(self):
+        """Lay out and paint again after nodes changed in place."""
+        if not self.static_canvas:
+            return
+        self.cursor = Cursor(get_screen(self.screen))
+        self.repaint_only = False
+        self.blockable_dirty = bool(self.buttons or self.inputs or self.blockable_canvases)
+        self.static_canvas.freeze()
+        self.render_scheduler.request("highlight")
+
+    def scroll_list_to(self, id: str, index: int) -> bool:
+        """Scroll a list_view so index is its first visible row. Returns False if it didn't move."""
+        list_view = self.list_views.get(id)
+        if not list_view:
+            print(f"Could not scroll ID {id}. list_view not found.")
+            return False
+        removed = list_view.scroll_to(index)
+        if removed is None:
+            return False
+        changes = {"removed": 0}
+        for row in removed:
+            self.remove_node(row, changes)
+        hash_id_map.pop(self.hash, None)
+        self.generate_hash_from_tree()
+        hash_id_map[self.hash] = self.id
+        self.relayout()
+        return True
+
+    def scroll_list(self, id: str, rows: int = 1) -> bool:
+        list_view = self.list_views.get(id)
+        return self.scroll_list_to(id, list_view.offset + rows) if list_view else False
+
+    def scroll_list_start(self, id: str, rows: int = 1, interval_ms: int = 100):
+        """Keep scrolling e.g. while a noise is held, until scroll_list_stop or the end of the list."""
+        self.scroll_list_stop(id)
+        def tick():
+            if not self.scroll_list(id, rows):
+                self.scroll_list_stop(id)
+        if self.scroll_list(id, rows):
+            self.scroll_jobs[id] = cron.interval(f"{interval_ms}ms", tick)
+
+    def scroll_list_stop(self, id: str):
+        if job := self.scroll_jobs.pop(id, None):
+            cron.cancel(job)
+
+    def reconcile_children(self, old_parent, new_parent, changes: dict[str, int]):
+        old_by_key = {
+            (child.id or (child.type, i)): child
+            for i, child in enumerate(old_parent.children)
+        }
+        children = []
+        for i, new_child in enumerate(new_parent.children):
+            old_child = old_by_key.pop(new_child.id or (new_child.type, i), None)
+            if old_child is not None and (type(old_child) is not type(new_child) or isinstance(new_child, UIInputText)):
+                self.remove_node(old_child, changes)
+                old_child = None
+            if old_child is None:
+                new_child.parent = old_parent
+                children.append(new_child)
+                changes["added"] += 1
+            else:
+                self.patch_node(old_child, new_child, changes)
+                children.append(old_child)
+
+        for old_child in old_by_key.values():
+            self.remove_node(old_child, changes)
+
+        if len(children) != len(old_parent.children) or any(a is not b for a, b in zip(children, old_parent.children)):
+            old_parent.invalidate_layout()
+            changes["layout"] += 1
+        old_parent.children = children
+        old_parent.structure_hash = hash((old_parent.options_hash, tuple(child.structure_hash for child in children)))
+
+    def patch_list_view(self, old: UIListView, new: UIListView, changes: dict[str, int]):
+        """Keep the scroll position of a list_view, with the new items."""
+        if old.items == new.items and old.render_row is None and new.render_row is None:
+            return
+        for row in old.set_items(new.items, new.render_row):
+            self.remove_node(row, changes)
+        changes["layout"] += 1
+        old.invalidate_layout()
+
+    def patch_node(self, old, new, changes: dict[str, int]):
+        if old.options_hash != new.options_hash:
+            old.options = new.options
+            old.options_hash = new.options_hash
+            old.id = new.id
+            if isinstance(old, UIBox):
+                old.highlight_color = new.highlight_color
+            else:
+                old.type = new.type
+            if old.id in self.buttons:
+                self.buttons[old.id]["on_click"] = new.options.on_click or (lambda: None)
+            old.invalidate_layout()
+            changes["patched"] += 1
+            changes["layout"] += 1
+
+        if isinstance(old, UIText) and old.text != new.text:
+            if old.id and old.id in self.text_state:
+                # stateful text behaves like set_text
+                if self.text_state[old.id] != new.text:
+                    self.text_state[old.id] = new.text
+                    self.use_text_canvas(old.id)
+                    self.dirty_text_ids[old.id] = None
+                    changes["text"] += 1
+            else:
+                old.update_text(new.text)
+                changes["text"] += 1
+                changes["layout"] += 1
+
+        if isinstance(old, UIListView):
+            self.patch_list_view(old, new, changes)
+        elif isinstance(old, UIWithChildren):
+            self.reconcile_children(old, new, changes)
+        else:
+            old.structure_hash = new.structure_hash
+
+    def remove_node(self, node, changes: dict[str, int]):
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            stack.extend(getattr(current, "children", ()))
+            if current.id:
+                if current.id in self.inputs:
+                    self.inputs.pop(current.id).hide()
+                if self.unhighlight_jobs.get(current.id):
+                    cron.cancel(self.unhighlight_jobs.pop(current.id)[0])
+                self.ids.pop(current.id, None)
+                if id_builder_map.get(current.id) == self.id:
+                    id_builder_map.pop(current.id)
+                self.text_ids.pop(current.id, None)
+                self.text_canvas_ids.pop(current.id, None)
+                self.close_text_canvas(current.id)
+                self.buttons.pop(current.id, None)
+                if self.list_views.pop(current.id, None):
+                    self.scroll_list_stop(current.id)
+                self.highlighted.pop(current.id, None)
+                self.fading_ids.pop(current.id, None)
+                self.highlight_shapes.pop(current.id, None)
+                self.text_state.pop(current.id, None)
+        node.parent = None
+        changes["removed"] += 1
+
     def hide(self, destroy=True):
         """Hide and destroy the UI builder."""
-        global ids, state, buttons, inputs
-
         event_fire_on_unmount(self.id)
         self.is_mounted = False
+        self.render_scheduler.cancel()
+        tween_ticker.cancel(self.id)
+        self.tween_base_colors.clear()
+        self.fading_ids.clear()
+        for id in list(self.scroll_jobs):
+            self.scroll_list_stop(id)
 
         if self.static_canvas:
             self.static_canvas.unregister("draw", self.on_draw_static)
@@ -1127,30 +2046,33 @@ class UIBuilder(UIBox):
             self.highlight_canvas.close()
             self.highlight_canvas = None
 
-        if self.blockable_canvases:
-            for canvas in self.blockable_canvases:
-                canvas.unregister("mouse", self.on_mouse)
-                canvas.hide()
-                canvas.close()
-            self.blockable_canvases = []
+        self.close_blockable_canvases()
+        self.close_text_canvases()
+        self.dirty_text_ids.clear()
+        self.dynamic_text_positions.clear()
 
-        for id in list(inputs):
-            inputs[id].hide()
+        for input in self.inputs.values():
+            input.hide()
 
         if destroy:
-            remove_ids = [id for id in ids if ids[id]["builder_id"] == self.id]
-
-            for id in remove_ids:
-                state["highlighted"].pop(id, None)
-                state["text"].pop(id, None)
-                ids.pop(id, None)
+            for id in self.ids:
+                if id_builder_map.get(id) == self.id:
+                    id_builder_map.pop(id)
+            self.ids.clear()
+            self.text_state.clear()
+            self.text_ids.clear()
+            self.text_canvas_ids.clear()
+            self.list_views.clear()
+            self.highlighted.clear()
+            self.highlight_shapes.clear()
 
             builders_core.pop(self.id, None)
             hash_id_map.pop(self.hash, None)
             self.hash = None
 
-        buttons.clear()
-        inputs.clear()
+        # only this builder's, other builders keep theirs
+        self.buttons.clear()
+        self.inputs.clear()
 
 @dataclass
 class UIProps:
@@ -1171,6 +2093,8 @@ class UIProps:
     color: str
     flex: int
     flex_direction: str
+    flex_shrink: int
+    flex_wrap: str
     font_size: int
     font_weight: str
     gap: int
@@ -1184,6 +2108,10 @@ class UIProps:
     margin_right: int
     margin_bottom: int
     margin_left: int
+    max_height: int
+    max_width: int
+    min_height: int
+    min_width: int
     on_change: callable
     on_click: callable
     opacity: float
@@ -1194,6 +2122,7 @@ class UIProps:
     padding_left: int
     screen: int
     value: str
+    visible_rows: int
     width: int
 
 VALID_PROPS = {f.name for f in fields(UIProps)}
@@ -1240,14 +2169,135 @@ def get_props(props, additional_props):
 
     return all_props
 
+class UIStyle(Mapping):
+    """
+    Props validated once, and resolved once per element type into an
+    options template that is never handed out. Each element gets a copy
+    of the template with its own props set on it.
+    """
+    def __init__(self, props: dict, name: str = None):
+        self.name = name
+        self.props = MappingProxyType(dict(props))
+        self.templates: dict[type, UIOptions] = {}
+
+    def __getitem__(self, key):
+        return self.props[key]
+
+    def __iter__(self):
+        return iter(self.props)
+
+    def __len__(self):
+        return len(self.props)
+
+    def __repr__(self):
+        return f"UIStyle({self.name!r}, {dict(self.props)})"
+
+    def template(self, options_cls: type) -> UIOptions:
+        template = self.templates.get(options_cls)
+        if template is None:
+            template = self.templates[options_cls] = options_cls(**self.props)
+        return template
+
+    def needs_resolve(self, options_cls: type, key: str) -> bool:
+        if key in options_cls.DERIVED_PROPS or key.startswith(("margin", "padding")) or key in BOX_MODEL_OPTIONS:
+            return True
+        # colors get the style's opacity appended
+        return key in PAINT_OPTIONS and self.props.get("opacity") is not None
+
+    def resolve(self, options_cls: type, overrides: dict = None) -> UIOptions:
+        if overrides:
+            overrides = get_props(overrides, None)
+            if any(self.needs_resolve(options_cls, key) for key in overrides):
+                return options_cls(**{**self.props, **overrides})
+        template = self.template(options_cls)
+        options = options_cls.__new__(options_cls)
+        options.__dict__.update(template.__dict__)
+        if overrides:
+            options.__dict__.update(overrides)
+        return options
+
+def style(props=None, name: str = None, **additional_props) -> UIStyle:
+    """
+    A reusable style, validated once. Elements built with it skip
+    validating and resolving the style's props again. With a name, it
+    can also be used by name.
+    ```py
+    noise = style(name="noise", flex_direction="row", width=150, padding=8)
+    div(noise, id="pop")
+    div("noise", id="hiss", width=200)
+    noise_active = style(noise, background_color="333333")
+    ```
+    """
+    if isinstance(props, str):
+        props = get_style(props)
+    new_style = UIStyle(get_props(props or {}, additional_props), name)
+    if name:
+        style_classes[name] = new_style
+    return new_style
+
+def get_style(name: str) -> UIStyle:
+    if name not in style_classes:
+        raise ValueError(f"Style {name} not found. Create it first with style(name={name!r}, ...)")
+    return style_classes[name]
+
+def resolve_options(options_cls: type, props, additional_props: dict) -> UIOptions:
+    """Options for a new element from a dict of props, a style, or a style name."""
+    if isinstance(props, str):
+        props = get_style(props)
+    if isinstance(props, UIStyle):
+        return props.resolve(options_cls, additional_props)
+    return options_cls(**get_props(props, additional_props))
+
+def batch() -> RenderBatch:
+    """
+    Apply several changes, with each affected canvas redrawn once at the end.
+    ```py
+    with batch() as changes:
+        my_ui.set_text("gear", "3")
+        my_ui.unhighlight("left")
+        my_ui.highlight("right")
+    changes.stats() # {"requested": 3, "redraws": 2, "saved": 1}
+    ```
+    """
+    return render_batch
+
+def check_batch_changes(changes: list):
+    """Raise ValueError for the first change that isn't a valid [action, id, *args]."""
+    if not isinstance(changes, (list, tuple)):
+        raise ValueError(f"Batch changes must be a list of [action, id, *args], not {type(changes).__name__}")
+    for index, change in enumerate(changes):
+        if not isinstance(change, (list, tuple)) or len(change) < 2:
+            raise ValueError(f"Batch change {index} must be [action, id, *args], not {change!r}")
+        action, id, *args = change
+        if action not in BATCH_ACTIONS:
+            raise ValueError(f"Can't batch {action}. Batch actions are: {', '.join(BATCH_ACTIONS)}")
+        if not isinstance(id, str):
+            raise ValueError(f"Batch change {index} needs an id string, not {id!r}")
+        try:
+            inspect.signature(getattr(UIBuilder, action)).bind(None, id, *args)
+        except TypeError as error:
+            raise ValueError(f"Batch change {index} {change!r}: {error}") from None
+
+def apply_batch(changes: list) -> dict:
+    """
+    Check every change first, so an invalid one applies none of them,
+    then apply them all in one batch. Returns redraws requested, done and
+    saved.
+    ```py
+    apply_batch([["set_text", "gear", "3"], ["highlight", "right"]])
+    ```
+    """
+    check_batch_changes(changes)
+    with batch() as changes_batch:
+        for action, id, *args in changes:
+            builder_child_id_action(id, action, *args)
+    return changes_batch.stats()
+
 def builder_child_id_action(id: str, action: str, *args):
     """Perform an action on the builder associated with the given id."""
-    global builders_core, ids, state
-    if id in ids:
-        builder_id = ids[id].get("builder_id")
-        builder = builders_core.get(builder_id)
-        if builder:
-            getattr(builder, action)(id, *args)
+    builder = get_builder_for_id(id)
+    if builder:
+        getattr(builder, action)(id, *args)
 
 class UIElementsProxy:
     def __init__(self, func):
@@ -1291,13 +2341,12 @@ def screen(*args, **additional_props):
     """
     global builders_core
     props = None
-    if len(args) == 1 and isinstance(args[0], dict):
+    if len(args) == 1 and isinstance(args[0], (dict, UIStyle)):
         props = args[0]
     elif len(args) == 1:
         props = { "screen": args[0] }
     elif len(args) > 1:
-        props = args[1]
-        props["screen"] = args[0]
+        props = {**args[1], "screen": args[0]}
 
     ref_screen: Screen = get_screen(props.get("screen") if props else None)
 
@@ -1311,19 +2360,19 @@ def screen(*args, **additional_props):
     return builder
 
 def div(props=None, **additional_props):
-    options = get_props(props, additional_props)
-    box_options = UIOptions(**options)
+    box_options = resolve_options(UIOptions, props, additional_props)
     return UIBox(box_options)
 
 def text(text_str: str, props=None, **additional_props):
-    options = get_props(props, additional_props)
-    text_options = UITextOptions(**options)
+    text_options = resolve_options(UITextOptions, props, additional_props)
     return UIText(text_str, text_options)
 
 def css(props=None, **additional_props):
     return get_props(props, additional_props)
 
 def button(text_str: str, props=None, **additional_props):
+    if isinstance(props, str):
+        props = get_style(props)
     default_props = {
         "id": str(uuid.uuid4()),
         "type": "button",
@@ -1339,9 +2388,22 @@ def button(text_str: str, props=None, **additional_props):
         **additional_props
     )
 
+def list_view(items: Sequence, render_row: Callable = None, props=None, **additional_props):
+    """
+    A scrollable list that only lays out and paints its visible rows.
+    render_row(item) returns an element, or a string for a text row.
+    Without render_row, items are strings. Give it an id to scroll it.
+    ```py
+    screen()[
+        list_view(commands, id="commands", visible_rows=20, font_size=14)
+    ]
+    actions.user.ui_elements_list_scroll("commands", 20)
+    ```
+    """
+    return UIListView(items, render_row, resolve_options(UIListViewOptions, props, additional_props))
+
 def input_text(props=None, **additional_props):
-    options = get_props(props, additional_props)
-    opts = UIInputTextOptions(**options)
+    opts = resolve_options(UIInputTextOptions, props, additional_props)
     if not opts.id:
         raise ValueError("input_text must have an id prop so that it can be targeted with actions.user.ui_elements_get_value(id)")
     return UIInputText(opts)
@@ -1352,3 +2414,5 @@ screen = UIElementsProxy(screen)
 css = UIElementsProxy(css)
 button = UIElementsProxy(button)
 input_text = UIElementsNoChildrenProxy(input_text)
+list_view = UIElementsNoChildrenProxy(list_view)
+style = UIElementsProxy(style)
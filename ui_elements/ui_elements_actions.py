@@ -8,12 +8,18 @@ from .ui_elements import (
     css,
     button,
     input_text,
-    inputs,
+    list_view,
+    style,
+    get_input,
     builders_core,
+    apply_batch,
     builder_child_id_action,
     event_register_on_lifecycle,
     event_unregister_on_lifecycle
 )
+from .src.ui_elements_measure import text_measure_cache
+from .src.ui_elements_profiler import render_profiler
+from .src.ui_elements_profiler_overlay import show_profiler_overlay, hide_profiler_overlay
 
 mod = Module()
 
@@ -22,7 +28,7 @@ class Actions:
     def ui_elements(elements: List[str]) -> tuple[callable]:
         """
         This acts like an import for the components you want to use.
-        div, text, screen, button, input_text.
+        div, text, screen, button, input_text, list_view, style.
 
         Usage:
         ```py
@@ -61,7 +67,9 @@ class Actions:
             'button': button,
             'input': input_text,
             'input_text': input_text,
-            'text_input': input_text
+            'text_input': input_text,
+            'list_view': list_view,
+            'style': style,
         }
         return tuple(element_mapping[element] for element in elements)
 
@@ -92,14 +100,67 @@ class Actions:
         """highlight based on id"""
         builder_child_id_action(id, "highlight", color)
 
-    def ui_elements_unhighlight(id: str):
-        """unhighlight based on id"""
-        builder_child_id_action(id, "unhighlight")
+    def ui_elements_unhighlight(id: str, fade_ms: int = 0):
+        """unhighlight based on id, optionally fading out over fade_ms. A running fade isn't restarted"""
+        builder_child_id_action(id, "unhighlight", fade_ms)
 
     def ui_elements_highlight_briefly(id: str, color: str = None):
         """highlight briefly based on id"""
         builder_child_id_action(id, "highlight_briefly", color)
 
+    def ui_elements_flash(id: str, color: str = None, duration_ms: int = 300):
+        """highlight based on id and fade out over duration_ms"""
+        builder_child_id_action(id, "flash", color, duration_ms)
+
+    def ui_elements_set_style(id: str, props: dict):
+        """Change options of an element based on id e.g. {"background_color": "FF0000"}. Colors only repaint, other options lay out again"""
+        builder_child_id_action(id, "set_style", props)
+
+    def ui_elements_batch(changes: list) -> dict:
+        """
+        Apply many changes, with each affected canvas redrawn once at the end.
+        Each change is [action, id, *args], action being set_text, highlight,
+        unhighlight, highlight_briefly, flash, set_style, animate or stop_animation.
+        Returns redraws requested, done and saved. Every change is checked
+        first, and an invalid one raises ValueError with nothing applied.
+        ```py
+        actions.user.ui_elements_batch([
+            ["set_text", "gear", "3"],
+            ["unhighlight", "stick_left"],
+            ["highlight", "stick_right"],
+        ])
+        ```
+        """
+        return apply_batch(changes)
+
+    def ui_elements_animate(id: str, property: str, value: any, duration_ms: int = 300, easing: str = "ease_out"):
+        """
+        Animate a property of an element based on id, from its current value to value.
+        property: highlight, background_color, opacity, offset (x, y) or width.
+        easing: linear, ease_in, ease_out or ease_in_out.
+        """
+        builder_child_id_action(id, "animate", property, value, duration_ms, easing)
+
+    def ui_elements_animate_stop(id: str, property: str = None):
+        """Stop animating an element based on id, optionally only one property"""
+        builder_child_id_action(id, "stop_animation", property)
+
+    def ui_elements_list_scroll(id: str, rows: int = 1):
+        """Scroll a list_view by rows based on id. Negative rows scroll up"""
+        builder_child_id_action(id, "scroll_list", rows)
+
+    def ui_elements_list_scroll_to(id: str, index: int):
+        """Scroll a list_view so the item at index is the first visible row"""
+        builder_child_id_action(id, "scroll_list_to", index)
+
+    def ui_elements_list_scroll_start(id: str, rows: int = 1, interval_ms: int = 100):
+        """Keep scrolling a list_view until ui_elements_list_scroll_stop or the end of the list e.g. while a noise is held"""
+        builder_child_id_action(id, "scroll_list_start", rows, interval_ms)
+
+    def ui_elements_list_scroll_stop(id: str):
+        """Stop scrolling a list_view started with ui_elements_list_scroll_start"""
+        builder_child_id_action(id, "scroll_list_stop")
+
     def ui_elements_get(id: str) -> UIBuilder:
         """
         Get the UI builder with the given ID. Only for
@@ -112,9 +173,46 @@ class Actions:
             print(f"UI builder with ID {id} not found.")
             return None
 
+    def ui_elements_render_stats(id: str = None) -> dict:
+        """
+        Redraws requested, done and saved per canvas, for the builder with
+        the given ID or for all builders. State changes within a frame are
+        coalesced into one redraw per canvas.
+        """
+        if id is not None:
+            builder = builders_core.get(id)
+            return builder.render_stats() if builder else None
+        return {builder_id: builder.render_stats() for builder_id, builder in builders_core.items()}
+
+    def ui_elements_measure_stats() -> dict:
+        """Hits, misses and size of the text measurement cache shared by all ui_elements"""
+        return text_measure_cache.stats()
+
+    def ui_elements_profiler_start(show_overlay: bool = True):
+        """
+        Start timing render phases per builder and per subtree with an id,
+        optionally with an overlay panel showing the results.
+        """
+        render_profiler.start()
+        if show_overlay:
+            show_profiler_overlay()
+
+    def ui_elements_profiler_stop():
+        """Stop the profiler and hide its overlay. Stats are kept until the next start."""
+        render_profiler.stop()
+        hide_profiler_overlay()
+
+    def ui_elements_profiler_stats(id: str = None) -> dict:
+        """
+        Time per render phase (virtual_render, render, dynamic, text, highlight,
+        blockable), node and measure_text counts, for the builder with the given
+        ID or for all builders, and per subtree with an id.
+        """
+        return render_profiler.stats(id)
+
     def ui_elements_get_value(id: str) -> str:
         """Get value of an input based on id"""
-        input = inputs.get(id)
+        input = get_input(id)
         if input:
             return input.value
         return None